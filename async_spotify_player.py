@@ -0,0 +1,157 @@
+import asyncio
+
+from focus_background import SpotifyPlayer
+
+
+def _resolved(result):
+    """Wrap a gather() result so build_login_status can call it like a fetch"""
+    def get():
+        if isinstance(result, BaseException):
+            raise result
+        return result
+    return get
+
+
+# =========================
+# ASYNC SPOTIFY PLAYER
+# =========================
+
+class AsyncSpotifyPlayer:
+    """
+    Coroutine counterpart of SpotifyPlayer for use inside an asyncio loop.
+
+    Each blocking call runs on the default executor over the wrapped player's
+    pooled session, so it can share the loop with the Lyria streaming session.
+    Independent calls are issued together with asyncio.gather, making a cue
+    cost roughly the slowest call instead of the sum of all of them.
+    """
+
+    def __init__(self, player=None, **kwargs):
+        self.player = player or SpotifyPlayer(**kwargs)
+
+    # -------------------------
+    # AUTHENTICATION
+    # -------------------------
+
+    async def authenticate(self):
+        await asyncio.to_thread(self.player.authenticate)
+
+    # -------------------------
+    # TEST LOGIN STATUS
+    # -------------------------
+
+    async def test_login_status(self, refresh_devices=False):
+        """
+        Fetch the profile and the device list concurrently
+        The device list is fetched even for free accounts; it is simply unused
+        Returns: dict with status information
+        """
+        print("\n🔍 Testing Spotify login status...")
+
+        if not self.player.access_token:
+            return {
+                "logged_in": False,
+                "error": "No access token available. Need to authenticate first."
+            }
+
+        profile, devices = await asyncio.gather(
+            asyncio.to_thread(self.player.http.get, f"{self.player.API_BASE}/me"),
+            asyncio.to_thread(self.player.devices.get_devices, refresh_devices),
+            return_exceptions=True,
+        )
+
+        return self.player.build_login_status(_resolved(profile), _resolved(devices))
+
+    async def verify_prerequisites(self, device_timeout=10.0):
+        """
+        Check login, Premium and a playback device, waiting for the device
+        while the login check runs. Never prompts, so it can share the loop
+        with the Lyria session; the interactive retry stays in the sync CLI
+        Returns: True if ready, False otherwise
+        """
+        print("\n" + "=" * 50)
+        print("VERIFYING PREREQUISITES")
+        print("=" * 50)
+
+        status, device_id = await asyncio.gather(
+            self.test_login_status(),
+            self.wait_for_device(timeout=device_timeout),
+        )
+
+        if not status["logged_in"]:
+            print(f"\n❌ Not logged in: {status.get('error', 'Unknown error')}")
+            return False
+        print("\n✓ Login verified")
+
+        if not status.get("has_premium", False):
+            print("\n⚠️  WARNING: You have a FREE Spotify account")
+            print("   Spotify Premium is required to control playback via API.")
+            return False
+        print("✓ Premium account confirmed")
+
+        if device_id is None:
+            print("\n⚠️  No active Spotify devices found!")
+            print("   Open Spotify, play any song, then try again.")
+            return False
+        print("✓ Playback device ready")
+
+        print("\n" + "=" * 50)
+        print("✓ ALL PREREQUISITES MET - Ready to play!")
+        print("=" * 50 + "\n")
+        return True
+
+    # -------------------------
+    # DEVICES / SEARCH / PLAYBACK
+    # -------------------------
+
+    async def get_active_device(self):
+        return await asyncio.to_thread(self.player.get_active_device)
+
+    async def wait_for_device(self, timeout=3.0, poll_interval=0.5):
+        return await asyncio.to_thread(self.player.wait_for_device, timeout, poll_interval)
+
+    async def search_playlist(self, query, limit=5):
+        return await asyncio.to_thread(self.player.search_playlist, query, limit)
+
+    async def start_playback(self, device_id, playlist_uri):
+        return await asyncio.to_thread(self.player.start_playback, device_id, playlist_uri)
+
+    async def open_in_spotify_app(self, playlist_uri):
+        return await asyncio.to_thread(self.player.open_in_spotify_app, playlist_uri)
+
+    # -------------------------
+    # PLAY
+    # -------------------------
+
+    async def play_query(self, query, selection=0):
+        """
+        Search and resolve the device concurrently, then start playback
+        Returns: True if music was started (via API or the Spotify app)
+        """
+        playlists, device_id = await asyncio.gather(
+            self.search_playlist(query),
+            self.get_active_device(),
+        )
+
+        playlists = [p for p in playlists if p]
+        if not playlists:
+            print("No playlists found.")
+            return False
+
+        selected_playlist = playlists[min(selection, len(playlists) - 1)]
+
+        if not device_id:
+            print("\n⚠️  No device found. Opening in Spotify app instead...")
+            return await self.open_in_spotify_app(selected_playlist["uri"])
+
+        if await self.start_playback(device_id, selected_playlist["uri"]):
+            print("✓ Playback started successfully!")
+            return True
+
+        print("\nFalling back to opening in Spotify app...")
+        return await self.open_in_spotify_app(selected_playlist["uri"])
+
+    async def close(self):
+        if self.player.refresher:
+            self.player.refresher.stop()
+        await asyncio.to_thread(self.player.http.close)
@@ -0,0 +1,180 @@
+import threading
+
+import numpy as np
+
+
+# =========================
+# PCM RING BUFFER
+# =========================
+
+class PcmRingBuffer:
+    """
+    Fixed-size, preallocated ring of PCM frames shared by one producer thread
+    and one audio callback.
+
+    write() blocks while the ring is full (backpressure on the decoder);
+    read_into() never blocks and copies whatever is available straight into
+    the caller's output array, so the callback never allocates.
+    """
+
+    def __init__(self, capacity, channels, dtype=np.float32):
+        self.capacity = int(capacity)
+        self.channels = channels
+        self.data = np.zeros((self.capacity, channels), dtype=dtype)
+        self.read_pos = 0
+        self.size = 0
+        self.closed = False
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+        self.drained = threading.Condition(self.lock)
+        self.counters = {"frames_written": 0, "frames_read": 0, "underruns": 0, "underrun_frames": 0}
+
+    # -------------------------
+    # PRODUCER
+    # -------------------------
+
+    def write(self, frames, timeout=None):
+        """
+        Copy `frames` into the ring, waiting for space as needed
+        Returns: number of frames written (short only if closed or timed out)
+        """
+        written = 0
+        total = len(frames)
+
+        with self.lock:
+            while written < total:
+                while self.size == self.capacity and not self.closed:
+                    if not self.not_full.wait(timeout):
+                        return written
+                if self.closed:
+                    return written
+
+                count = min(total - written, self.capacity - self.size)
+                start = (self.read_pos + self.size) % self.capacity
+                first = min(count, self.capacity - start)
+                self.data[start:start + first] = frames[written:written + first]
+                if count > first:
+                    self.data[:count - first] = frames[written + first:written + count]
+
+                self.size += count
+                written += count
+                self.counters["frames_written"] += count
+
+        return written
+
+    # -------------------------
+    # CONSUMER
+    # -------------------------
+
+    def read_into(self, out):
+        """
+        Fill `out` with up to len(out) frames without blocking
+        Returns: number of frames copied
+        """
+        with self.lock:
+            count = min(len(out), self.size)
+            first = min(count, self.capacity - self.read_pos)
+            out[:first] = self.data[self.read_pos:self.read_pos + first]
+            if count > first:
+                out[first:count] = self.data[:count - first]
+
+            self.read_pos = (self.read_pos + count) % self.capacity
+            self.size -= count
+            self.counters["frames_read"] += count
+            if count:
+                self.not_full.notify()
+            if self.size == 0:
+                self.drained.notify_all()
+
+        return count
+
+    def mix_tail(self, frames):
+        """
+        Crossfade the first frames of `frames` over the newest buffered frames:
+        the old audio fades out while the new audio fades in
+        Returns: number of frames mixed (the caller writes the rest as usual)
+        """
+        with self.lock:
+            count = min(len(frames), self.size)
+            if count == 0:
+                return 0
+
+            index = (self.read_pos + self.size - count + np.arange(count)) % self.capacity
+            fade_in = np.linspace(0.0, 1.0, count, dtype=np.float32)[:, None]
+            self.data[index] = self.data[index] * (1 - fade_in) + frames[:count] * fade_in
+            return count
+
+    def record_underrun(self, frames):
+        with self.lock:
+            self.counters["underruns"] += 1
+            self.counters["underrun_frames"] += frames
+
+    # -------------------------
+    # STATE
+    # -------------------------
+
+    def clear(self):
+        """Drop buffered frames (e.g. on skip)"""
+        with self.lock:
+            self.read_pos = 0
+            self.size = 0
+            self.not_full.notify_all()
+            self.drained.notify_all()
+
+    def truncate(self, frames):
+        """Keep only the oldest `frames` buffered frames, dropping the rest"""
+        with self.lock:
+            if self.size > frames:
+                self.size = max(int(frames), 0)
+                self.not_full.notify_all()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.not_full.notify_all()
+            self.drained.notify_all()
+
+    def wait_empty(self, timeout=None):
+        """Block until the consumer has drained everything (or the ring is closed)"""
+        with self.lock:
+            return self.drained.wait_for(lambda: self.size == 0 or self.closed, timeout)
+
+    @property
+    def available(self):
+        with self.lock:
+            return self.size
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["buffered"] = self.size
+        return stats
+
+
+# =========================
+# CALLBACK OUTPUT
+# =========================
+
+class RingBufferOutput:
+    """
+    sounddevice callback that drains a PcmRingBuffer.
+
+    Missing frames are filled with silence and counted as an underrun
+    (unless the producer has finished or playback is paused).
+    """
+
+    def __init__(self, ring):
+        self.ring = ring
+        self.paused = False
+        self.finished = False
+
+    def __call__(self, outdata, frames, time_info, status):
+        if self.paused:
+            outdata.fill(0)
+            return
+
+        copied = self.ring.read_into(outdata)
+        if copied < frames:
+            outdata[copied:] = 0
+            if not self.finished:
+                self.ring.record_underrun(frames - copied)
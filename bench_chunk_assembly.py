@@ -0,0 +1,115 @@
+"""
+Allocation benchmark for the Lyria chunk-assembly path.
+
+Feeds simulated network chunks (odd sizes, so edges split samples and
+frames) through ChunkAssembler into a PcmRingBuffer, and through the naive
+np.frombuffer/astype/gain path for comparison. tracemalloc reports the
+peak and net memory allocated while streaming.
+
+    python bench_chunk_assembly.py --chunks 5000 --chunk-bytes 3841 --gain 0.8
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from audio_pipeline import PcmRingBuffer
+from pcm_arena import INT16_SCALE, ChunkAssembler
+
+
+def make_chunks(count, chunk_bytes, seed=0):
+    rng = np.random.default_rng(seed)
+    data = rng.integers(-32768, 32767, size=(count * chunk_bytes) // 2 + 1, dtype=np.int16).tobytes()
+    return [data[i * chunk_bytes:(i + 1) * chunk_bytes] for i in range(count)]
+
+
+# =========================
+# STREAMING PATHS
+# =========================
+
+def stream_assembled(ring, channels, gain):
+    assembler = ChunkAssembler(channels, gain=gain)
+    out = np.empty((ring.capacity, channels), dtype=np.float32)
+
+    def feed(data):
+        ring.write(assembler.push(data))
+        ring.read_into(out)
+
+    return feed
+
+
+def stream_naive(ring, channels, gain):
+    out = np.empty((ring.capacity, channels), dtype=np.float32)
+    carry = [b""]
+
+    def feed(data):
+        data = carry[0] + data
+        usable = len(data) - len(data) % (2 * channels)
+        carry[0] = data[usable:]
+        frames = np.frombuffer(data[:usable], dtype=np.int16).reshape(-1, channels)
+        ring.write(frames.astype(np.float32) * (gain * INT16_SCALE))
+        ring.read_into(out)
+
+    return feed
+
+
+# =========================
+# BENCHMARK
+# =========================
+
+def run_benchmark(chunks=2000, chunk_bytes=3841, channels=2, gain=0.8, path="assembled"):
+    """
+    Stream `chunks` chunks through one path under tracemalloc
+    Returns: dict with peak/net bytes, bytes per chunk and throughput
+    """
+    data = make_chunks(chunks, chunk_bytes)
+    ring = PcmRingBuffer(4 * (chunk_bytes // (2 * channels) + 1), channels)
+    factory = stream_assembled if path == "assembled" else stream_naive
+    feed = factory(ring, channels, gain)
+
+    # Warm up so one-time setup (arena growth, numpy caches) is not counted
+    for chunk in data[:10]:
+        feed(chunk)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    for chunk in data:
+        feed(chunk)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "path": path,
+        "chunks": chunks,
+        "chunk_bytes": chunk_bytes,
+        "peak_bytes": peak - baseline,
+        "net_bytes": current - baseline,
+        "peak_per_chunk_bytes": (peak - baseline) / float(chunk_bytes),
+        "chunks_per_s": chunks / elapsed if elapsed else 0.0,
+    }
+
+
+# =========================
+# RUN
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Allocation benchmark for Lyria chunk assembly")
+    parser.add_argument("--chunks", type=int, default=5000, help="chunks to stream")
+    parser.add_argument("--chunk-bytes", type=int, default=3841, help="bytes per chunk (odd splits samples)")
+    parser.add_argument("--channels", type=int, default=2, help="interleaved channels")
+    parser.add_argument("--gain", type=float, default=0.8, help="gain applied during conversion")
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print(f"{'path':>10} {'chunks':>8} {'peak B':>10} {'net B':>8} {'peak/chunk':>11} {'chunks/s':>12}")
+    print("=" * 72)
+    for path in ("naive", "assembled"):
+        r = run_benchmark(args.chunks, args.chunk_bytes, args.channels, args.gain, path)
+        print(f"{r['path']:>10} {r['chunks']:>8} {r['peak_bytes']:>10} {r['net_bytes']:>8} "
+              f"{r['peak_per_chunk_bytes']:>11.3f} {r['chunks_per_s']:>12.0f}")
@@ -0,0 +1,141 @@
+"""
+End-to-end cue latency benchmark against the local fake Spotify server.
+
+Runs SpotifyPlayer.cue() from 1-500 concurrent simulated users and reports
+latency percentiles, throughput, connection reuse and scheduler queueing.
+No network access is needed.
+
+    python bench_cue_latency.py --users 1,10,100,500 --cues 5 --latency 0.02
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from fake_spotify_server import FakeSpotifyConfig, FakeSpotifyServer
+from focus_background import CUE_PRESETS, SpotifyPlayer
+from rate_limiter import RequestScheduler
+from token_store import TokenStore
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+# =========================
+# BENCHMARK
+# =========================
+
+def run_benchmark(users, cues_per_user=5, config=None, rate=1000.0, burst=1000):
+    """
+    Run `users` concurrent players, each issuing `cues_per_user` cues
+    Returns: dict with latency percentiles (ms), throughput and counters
+    """
+    server = FakeSpotifyServer(config or FakeSpotifyConfig()).start()
+    scheduler = RequestScheduler(rate=rate, burst=burst, backoff_base=0.05)
+    moods = list(CUE_PRESETS)
+    latencies = []
+    failures = 0
+    lock = threading.Lock()
+    players = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for i in range(users):
+            store = TokenStore(os.path.join(tmp_dir, f"token-{i}.json"))
+            store.save(f"bench-token-{i}", None)
+            player = SpotifyPlayer(
+                "bench-client", "bench-secret", "http://localhost:8888/callback",
+                pool_size=2, token_store=store, scheduler=scheduler,
+            )
+            players.append(server.configure(player))
+
+        barrier = threading.Barrier(users + 1)
+
+        def user(index, player):
+            nonlocal failures
+            barrier.wait()
+            for n in range(cues_per_user):
+                mood = moods[(index + n) % len(moods)]
+                result = player.cue(mood, intensity=(n % 3) / 2, device_timeout=0.5,
+                                    open_app_fallback=False)
+                with lock:
+                    latencies.append(result["timings"]["total"])
+                    if not result["success"]:
+                        failures += 1
+
+        threads = [
+            threading.Thread(target=user, args=(i, p), daemon=True)
+            for i, p in enumerate(players)
+        ]
+        for thread in threads:
+            thread.start()
+
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    connections = {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+    for player in players:
+        for key, value in player.http.connection_stats().items():
+            connections[key] += value
+        player.http.close()
+    server.stop()
+
+    latencies.sort()
+    scheduler_stats = scheduler.stats()
+    return {
+        "users": users,
+        "cues": len(latencies),
+        "failures": failures,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "connections": connections,
+        "rate_limited": scheduler_stats["rate_limited"],
+        "queue_delay_avg_ms": scheduler_stats["queue_delay_avg"] * 1000,
+        "server_hits": dict(server.hits),
+    }
+
+
+# =========================
+# RUN
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cue latency benchmark against a local fake Spotify API")
+    parser.add_argument("--users", default="1,10,100,500", help="comma-separated concurrency levels")
+    parser.add_argument("--cues", type=int, default=5, help="cues per user")
+    parser.add_argument("--latency", type=float, default=0.02, help="server latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="extra random latency (s)")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--failure-ratio", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--rate", type=float, default=1000.0, help="client token-bucket rate (req/s)")
+    args = parser.parse_args()
+
+    print("=" * 96)
+    print(f"{'users':>6} {'cues':>6} {'fail':>5} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'cues/s':>8} {'reused':>8} {'429s':>5} {'queue ms':>9}")
+    print("=" * 96)
+
+    for users in [int(u) for u in args.users.split(",") if u]:
+        config = FakeSpotifyConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            rate_limit_ratio=args.rate_limit_ratio,
+            failure_ratio=args.failure_ratio,
+            retry_after=0.05,
+        )
+        r = run_benchmark(users, args.cues, config, rate=args.rate, burst=int(args.rate))
+        print(f"{r['users']:>6} {r['cues']:>6} {r['failures']:>5} {r['p50_ms']:>8.1f} "
+              f"{r['p90_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f} "
+              f"{r['throughput']:>8.1f} {r['connections']['connections_reused']:>8} "
+              f"{r['rate_limited']:>5} {r['queue_delay_avg_ms']:>9.2f}")
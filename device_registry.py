@@ -0,0 +1,77 @@
+import threading
+import time
+
+
+# =========================
+# DEVICE REGISTRY
+# =========================
+
+class DeviceRegistry:
+    """
+    Short-lived cache of /me/player/devices shared by every step of a cue.
+
+    `fetch` is called at most once per `ttl` seconds; concurrent callers
+    wait for the in-flight fetch instead of issuing their own.
+    """
+
+    def __init__(self, fetch, ttl=10.0):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.devices = None
+        self.fetched_at = 0.0
+        self.lock = threading.Lock()
+        self.counters = {"fetches": 0, "hits": 0, "invalidations": 0}
+
+    # -------------------------
+    # DEVICES
+    # -------------------------
+
+    def get_devices(self, refresh=False):
+        """
+        Return the cached device list, fetching it if missing or older than ttl
+        refresh=True forces a new fetch
+        """
+        with self.lock:
+            fresh = (
+                self.devices is not None
+                and time.monotonic() - self.fetched_at < self.ttl
+            )
+            if fresh and not refresh:
+                self.counters["hits"] += 1
+                return list(self.devices)
+
+            devices = self.fetch()
+            self.devices = devices
+            self.fetched_at = time.monotonic()
+            self.counters["fetches"] += 1
+            return list(devices)
+
+    def invalidate(self):
+        """Drop the cached list, e.g. after a playback call rejected the device"""
+        with self.lock:
+            self.devices = None
+            self.counters["invalidations"] += 1
+
+    # -------------------------
+    # SELECTION
+    # -------------------------
+
+    def select_device(self, refresh=False):
+        """
+        Pick a device id from the cached list
+        Returns: the active device, otherwise the first available, or None
+        """
+        devices = self.get_devices(refresh=refresh)
+
+        if not devices:
+            return None
+
+        for device in devices:
+            if device.get("is_active"):
+                return device["id"]
+
+        return devices[0]["id"]
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
@@ -0,0 +1,232 @@
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+
+
+# =========================
+# FAKE SPOTIFY CONFIG
+# =========================
+
+class FakeSpotifyConfig:
+    """
+    Knobs for the local Spotify stand-in.
+
+    latency          seconds added to every request
+    jitter           extra random latency in [0, jitter)
+    rate_limit_ratio fraction of API requests answered with 429
+    failure_ratio    fraction of API requests answered with 503
+    retry_after      Retry-After header sent with 429 responses
+    devices          list returned by /me/player/devices
+    product          "premium" or "free" for /me
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit_ratio=0.0, failure_ratio=0.0,
+                 retry_after=1, devices=None, product="premium"):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.failure_ratio = failure_ratio
+        self.retry_after = retry_after
+        self.devices = devices if devices is not None else [
+            {"id": "fake-device", "name": "Fake Speaker", "type": "Computer", "is_active": True}
+        ]
+        self.product = product
+
+
+# =========================
+# FAKE SPOTIFY HANDLER
+# =========================
+
+class FakeSpotifyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def dispatch(self, method):
+        server = self.server
+        config = server.config
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        body = self.rfile.read(length) if length else b""
+
+        server.record(method, url.path)
+
+        delay = config.latency + (random.random() * config.jitter if config.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+        if url.path == "/authorize":
+            return self.authorize(parse_qs(url.query))
+        if url.path == "/api/token":
+            return self.token(parse_qs(body.decode()))
+
+        if not url.path.startswith("/v1/"):
+            return self.send_json(404, {"error": {"status": 404, "message": "Not found"}})
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self.send_json(401, {"error": {"status": 401, "message": "No token provided"}})
+
+        roll = random.random()
+        if roll < config.rate_limit_ratio:
+            return self.send_json(
+                429,
+                {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                headers={"Retry-After": str(config.retry_after)},
+            )
+        if roll < config.rate_limit_ratio + config.failure_ratio:
+            return self.send_json(503, {"error": {"status": 503, "message": "Service unavailable"}})
+
+        route = (method, url.path[len("/v1"):])
+        if route == ("GET", "/me"):
+            return self.send_json(200, {
+                "display_name": "Fake User",
+                "email": "fake@example.com",
+                "product": config.product,
+            })
+        if route == ("GET", "/me/player/devices"):
+            return self.send_json(200, {"devices": config.devices})
+        if route == ("GET", "/search"):
+            return self.search(parse_qs(url.query))
+        if route == ("PUT", "/me/player/play"):
+            return self.play(parse_qs(url.query))
+
+        return self.send_json(404, {"error": {"status": 404, "message": "Not found"}})
+
+    # -------------------------
+    # ENDPOINTS
+    # -------------------------
+
+    def authorize(self, query):
+        redirect_uri = query.get("redirect_uri", [""])[0]
+        location = f"{redirect_uri}?{urlencode({'code': 'fake-auth-code'})}"
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def token(self, form):
+        grant_type = form.get("grant_type", [""])[0]
+        if grant_type not in ("authorization_code", "refresh_token"):
+            return self.send_json(400, {"error": "unsupported_grant_type"})
+
+        payload = {
+            "access_token": f"fake-access-{random.getrandbits(32):08x}",
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        }
+        if grant_type == "authorization_code":
+            payload["refresh_token"] = "fake-refresh"
+        self.send_json(200, payload)
+
+    def search(self, query):
+        q = query.get("q", [""])[0]
+        search_type = query.get("type", ["playlist"])[0]
+        limit = int(query.get("limit", ["5"])[0])
+        items = [
+            {
+                "name": f"{q.title()} #{i + 1}",
+                "uri": f"spotify:{search_type}:{zlib.crc32(f'{q}:{i}'.encode()):010d}",
+                "owner": {"display_name": "Fake Curator"},
+                "tracks": {"total": 50},
+            }
+            for i in range(limit)
+        ]
+        self.send_json(200, {f"{search_type}s": {"items": items}})
+
+    def play(self, query):
+        device_id = query.get("device_id", [None])[0]
+        known = {d["id"] for d in self.server.config.devices}
+        if device_id and device_id not in known:
+            return self.send_json(404, {"error": {"status": 404, "message": "Device not found"}})
+
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Suppress server logs
+        pass
+
+
+# =========================
+# FAKE SPOTIFY SERVER
+# =========================
+
+class FakeSpotifyServer(ThreadingHTTPServer):
+    """
+    Local stand-in for accounts.spotify.com and api.spotify.com.
+
+    Start it with start(), then point a SpotifyPlayer at it with configure().
+    Request counts per (method, path) are kept in `hits`.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, config=None, host="localhost", port=0):
+        super().__init__((host, port), FakeSpotifyHandler)
+        self.config = config or FakeSpotifyConfig()
+        self.hits = {}
+        self.hits_lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, method, path):
+        with self.hits_lock:
+            key = (method, path)
+            self.hits[key] = self.hits.get(key, 0) + 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def configure(self, player):
+        """Point a SpotifyPlayer's endpoints at this server"""
+        player.AUTH_URL = f"{self.base_url}/authorize"
+        player.TOKEN_URL = f"{self.base_url}/api/token"
+        player.API_BASE = f"{self.base_url}/v1"
+        return player
+
+
+if __name__ == "__main__":
+    server = FakeSpotifyServer(port=8889)
+    print(f"Fake Spotify API at {server.base_url}")
+    print("Press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\nExiting...")
@@ -4,10 +4,17 @@ import requests
 import webbrowser
 import threading
 import time
+from pathlib import Path
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from urllib.parse import urlparse, parse_qs
 from dotenv import load_dotenv
 
+from spotify_http import SpotifySession
+from token_store import TokenStore, TokenRefresher
+from search_cache import SearchCache
+from device_registry import DeviceRegistry
+from rate_limiter import PRIORITY_BACKGROUND, PRIORITY_CUE
+
 
 # =========================
 # CALLBACK HANDLER
@@ -32,6 +39,31 @@ class CallbackHandler(BaseHTTPRequestHandler):
         pass
 
 
+# =========================
+# CUE PRESETS
+# =========================
+
+# Search queries per mood, ordered from gentlest to most intense.
+# cue() maps intensity 0.0-1.0 onto this list.
+CUE_PRESETS = {
+    "focus": [
+        "lofi beats focus",
+        "study music concentration",
+        "deep focus instrumental",
+    ],
+    "calm": [
+        "sleep sounds rain",
+        "calm piano",
+        "peaceful ambient",
+    ],
+    "energize": [
+        "acoustic morning",
+        "upbeat indie",
+        "workout motivation",
+    ],
+}
+
+
 # =========================
 # SPOTIFY PLAYER
 # =========================
@@ -41,17 +73,32 @@ class SpotifyPlayer:
     TOKEN_URL = "https://accounts.spotify.com/api/token"
     API_BASE = "https://api.spotify.com/v1"
 
-    def __init__(self, client_id, client_secret, redirect_uri):
+    def __init__(self, client_id, client_secret, redirect_uri, pool_size=10, timeout=10.0,
+                 token_store=None, search_cache=None, device_ttl=10.0, scheduler=None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
         self.access_token = None
+        self.tokens = token_store or TokenStore()
+        self.refresher = None
+        self.search_cache = search_cache or SearchCache()
+        self.devices = DeviceRegistry(self.fetch_devices, ttl=device_ttl)
+        self.http = SpotifySession(
+            token_getter=lambda: self.access_token,
+            pool_size=pool_size,
+            timeout=timeout,
+            scheduler=scheduler,
+        )
 
     # -------------------------
     # AUTHENTICATION
     # -------------------------
 
     def authenticate(self):
+        # Reuse the cached token (or renew it) before falling back to the browser
+        if self.load_cached_token():
+            return
+
         scope = "user-read-playback-state user-modify-playback-state user-read-email user-read-private"
 
         auth_url = (
@@ -80,34 +127,86 @@ class SpotifyPlayer:
 
         server.server_close()
 
+        self.request_token({
+            "grant_type": "authorization_code",
+            "code": CallbackHandler.auth_code,
+            "redirect_uri": self.redirect_uri,
+        })
+        print("✓ Authorization successful!\n")
+        self.start_token_refresher()
+
+    def load_cached_token(self):
+        """
+        Use the token store instead of the interactive flow when possible
+        Returns: True if a usable access token is now loaded
+        """
+        token = self.tokens.access_token()
+
+        if not token and self.tokens.refresh_token:
+            try:
+                self.refresh_access_token(priority=PRIORITY_CUE)
+                token = self.access_token
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️  Could not refresh cached token: {e}")
+                return False
+
+        if not token:
+            return False
+
+        self.access_token = token
+        self.start_token_refresher()
+        return True
+
+    def refresh_access_token(self, priority=PRIORITY_BACKGROUND):
+        self.request_token({
+            "grant_type": "refresh_token",
+            "refresh_token": self.tokens.refresh_token,
+        }, priority=priority)
+
+    def request_token(self, data, priority=PRIORITY_CUE):
+        """Exchange a grant at the token endpoint and persist the result"""
         auth_header = base64.b64encode(
             f"{self.client_id}:{self.client_secret}".encode()
         ).decode()
 
-        response = requests.post(
+        response = self.http.post(
             self.TOKEN_URL,
+            auth=False,
             headers={
                 "Authorization": f"Basic {auth_header}",
                 "Content-Type": "application/x-www-form-urlencoded",
             },
-            data={
-                "grant_type": "authorization_code",
-                "code": CallbackHandler.auth_code,
-                "redirect_uri": self.redirect_uri,
-            },
+            data=data,
+            priority=priority,
         )
 
         response.raise_for_status()
-        self.access_token = response.json()["access_token"]
-        print("✓ Authorization successful!\n")
+        payload = response.json()
+
+        self.tokens.save(
+            payload["access_token"],
+            payload.get("refresh_token"),
+            payload.get("expires_in", 3600),
+        )
+        self.access_token = payload["access_token"]
+
+    def start_token_refresher(self):
+        if self.refresher and self.refresher.is_alive():
+            return
+        if not self.tokens.refresh_token:
+            return
+
+        self.refresher = TokenRefresher(self.tokens, self.refresh_access_token)
+        self.refresher.start()
 
     # -------------------------
     # TEST LOGIN STATUS
     # -------------------------
 
-    def test_login_status(self):
+    def test_login_status(self, refresh_devices=False):
         """
         Test if user is properly logged in and authenticated
+        refresh_devices=True bypasses the cached device list
         Returns: dict with status information
         """
         print("\n🔍 Testing Spotify login status...")
@@ -117,13 +216,20 @@ class SpotifyPlayer:
                 "logged_in": False,
                 "error": "No access token available. Need to authenticate first."
             }
-        
+
+        return self.build_login_status(
+            lambda: self.http.get(f"{self.API_BASE}/me"),
+            lambda: self.devices.get_devices(refresh=refresh_devices),
+        )
+
+    def build_login_status(self, get_profile, get_devices):
+        """
+        Turn the /me response and the device list into a login status dict
+        Both arguments are callables so async callers can pass pre-fetched results
+        """
         try:
             # Test 1: Get current user profile
-            response = requests.get(
-                f"{self.API_BASE}/me",
-                headers={"Authorization": f"Bearer {self.access_token}"},
-            )
+            response = get_profile()
             
             if response.status_code == 401:
                 return {
@@ -150,13 +256,7 @@ class SpotifyPlayer:
                 }
             
             # Test 3: Check for available devices
-            devices_response = requests.get(
-                f"{self.API_BASE}/me/player/devices",
-                headers={"Authorization": f"Bearer {self.access_token}"},
-            )
-            
-            devices_response.raise_for_status()
-            devices = devices_response.json()["devices"]
+            devices = get_devices()
             
             print(f"  Active devices: {len(devices)}")
             
@@ -229,7 +329,7 @@ class SpotifyPlayer:
             
             if retry == 'y':
                 print("\n   Checking again...")
-                time.sleep(2)
+                self.wait_for_device(timeout=10.0)
                 status = self.test_login_status()
                 
                 if status.get("device_count", 0) == 0:
@@ -253,57 +353,60 @@ class SpotifyPlayer:
     # -------------------------
 
     def get_active_device(self):
-        response = requests.get(
-            f"{self.API_BASE}/me/player/devices",
-            headers={"Authorization": f"Bearer {self.access_token}"},
-        )
-
-        response.raise_for_status()
-        devices = response.json()["devices"]
+        # Prefer active device, otherwise use first available
+        return self.devices.select_device()
 
-        if not devices:
-            return None
+    def fetch_devices(self):
+        response = self.http.get(f"{self.API_BASE}/me/player/devices")
 
-        # Prefer active device, otherwise use first available
-        for device in devices:
-            if device.get('is_active'):
-                return device["id"]
-        
-        return devices[0]["id"]
+        response.raise_for_status()
+        return response.json()["devices"]
 
     # -------------------------
     # SEARCH PLAYLIST
     # -------------------------
 
-    def search_playlist(self, query):
-        response = requests.get(
+    def search_playlist(self, query, limit=5):
+        key = SearchCache.make_key(query, "playlist", limit)
+        return self.search_cache.get_or_fetch(
+            key,
+            lambda: self.fetch_search(query, "playlist", limit),
+            revalidate=lambda: self.fetch_search(query, "playlist", limit, PRIORITY_BACKGROUND),
+        )
+
+    def fetch_search(self, query, search_type, limit, priority=PRIORITY_CUE):
+        response = self.http.get(
             f"{self.API_BASE}/search",
-            headers={"Authorization": f"Bearer {self.access_token}"},
             params={
                 "q": query,
-                "type": "playlist",
-                "limit": 5,
+                "type": search_type,
+                "limit": limit,
             },
+            priority=priority,
         )
 
         response.raise_for_status()
-        return response.json()["playlists"]["items"]
+        return response.json()[f"{search_type}s"]["items"]
 
     # -------------------------
     # START PLAYBACK
     # -------------------------
 
     def start_playback(self, device_id, playlist_uri):
-        response = requests.put(
+        response = self.http.put(
             f"{self.API_BASE}/me/player/play",
-            headers={"Authorization": f"Bearer {self.access_token}"},
             params={"device_id": device_id},
             json={"context_uri": playlist_uri},
         )
 
         if response.status_code == 204:
             return True
-        elif response.status_code == 403:
+
+        if response.status_code in (403, 404):
+            # Device went away or was rejected; the next lookup must re-fetch
+            self.devices.invalidate()
+
+        if response.status_code == 403:
             print("\n⚠️  Error: Premium account required for playback control")
             return False
         else:
@@ -324,6 +427,119 @@ class SpotifyPlayer:
         webbrowser.open(spotify_url)
         return True
 
+    # -------------------------
+    # WAIT FOR DEVICE
+    # -------------------------
+
+    def wait_for_device(self, timeout=3.0, poll_interval=0.5):
+        """
+        Poll the device list until a device shows up or `timeout` seconds pass
+        Returns: device id or None
+        """
+        deadline = time.monotonic() + timeout
+        device_id = self.devices.select_device()
+
+        while device_id is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(poll_interval, remaining))
+            device_id = self.devices.select_device(refresh=True)
+
+        return device_id
+
+    # -------------------------
+    # HEADLESS CUE
+    # -------------------------
+
+    def cue(self, mood="focus", intensity=0.5, device_timeout=3.0, open_app_fallback=True):
+        """
+        Start music for `mood` without any prompts (for automated triggers)
+        Uses the cached token only; never opens the browser login
+        Returns: dict with success, method, query, playlist, device_id and
+                 per-stage timings in seconds
+        """
+        if mood not in CUE_PRESETS:
+            raise ValueError(f"Unknown mood '{mood}'. Choose from: {', '.join(CUE_PRESETS)}")
+
+        queries = CUE_PRESETS[mood]
+        intensity = min(max(float(intensity), 0.0), 1.0)
+        query = queries[min(int(intensity * len(queries)), len(queries) - 1)]
+
+        result = {
+            "success": False,
+            "method": None,
+            "query": query,
+            "playlist": None,
+            "device_id": None,
+            "error": None,
+            "timings": {},
+        }
+        timings = result["timings"]
+        cue_start = stage_start = time.perf_counter()
+
+        def finish():
+            timings["total"] = time.perf_counter() - cue_start
+            return result
+
+        def lap(stage):
+            nonlocal stage_start
+            now = time.perf_counter()
+            timings[stage] = now - stage_start
+            stage_start = now
+
+        # Step 1: Token (cached or refreshed, no browser)
+        if not self.access_token and not self.load_cached_token():
+            lap("auth")
+            result["error"] = "Not authenticated. Run the interactive login once first."
+            return finish()
+        lap("auth")
+
+        # Step 2: Playlist (served from the search cache when warm)
+        try:
+            playlists = [p for p in self.search_playlist(query) if p]
+        except requests.exceptions.RequestException as e:
+            lap("search")
+            result["error"] = f"Search failed: {e}"
+            return finish()
+        lap("search")
+
+        if not playlists:
+            result["error"] = f"No playlists found for '{query}'"
+            return finish()
+
+        playlist = playlists[0]
+        result["playlist"] = {"name": playlist.get("name"), "uri": playlist["uri"]}
+
+        # Step 3: Device (bounded wait instead of asking the user)
+        try:
+            device_id = self.wait_for_device(timeout=device_timeout)
+        except requests.exceptions.RequestException as e:
+            device_id = None
+            result["error"] = f"Device lookup failed: {e}"
+        lap("device")
+        result["device_id"] = device_id
+
+        # Step 4: Playback
+        if device_id:
+            try:
+                started = self.start_playback(device_id, playlist["uri"])
+            except requests.exceptions.RequestException as e:
+                started = False
+                result["error"] = f"Playback failed: {e}"
+            if started:
+                lap("playback")
+                result.update(success=True, method="api", error=None)
+                return finish()
+        lap("playback")
+
+        if open_app_fallback:
+            result.update(success=self.open_in_spotify_app(playlist["uri"]), method="app")
+        elif result["error"] is None:
+            result["error"] = "No device available for playback"
+
+        return finish()
+
     # -------------------------
     # MAIN LOGIC
     # -------------------------
@@ -420,7 +636,8 @@ if __name__ == "__main__":
     player = SpotifyPlayer(
         client_id=CLIENT_ID,
         client_secret=CLIENT_SECRET,
-        redirect_uri=REDIRECT_URI
+        redirect_uri=REDIRECT_URI,
+        search_cache=SearchCache(path=Path.home() / ".musicqueue" / "search_cache.json"),
     )
 
     try:
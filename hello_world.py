@@ -1,9 +1,7 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 
-class HelloWorldHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        page = """\
+PAGE = """\
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -16,14 +14,27 @@ class HelloWorldHandler(BaseHTTPRequestHandler):
 </body>
 </html>
 """
+
+
+class HelloWorldHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_page(send_body=True)
+
+    def do_HEAD(self):
+        self.send_page(send_body=False)
+
+    def send_page(self, send_body=True):
+        body = PAGE.encode("utf-8")
         self.send_response(200)
         self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(page.encode("utf-8"))
+        if send_body:
+            self.wfile.write(body)
 
 
 if __name__ == "__main__":
-    server = HTTPServer(("localhost", 8000), HelloWorldHandler)
+    server = ThreadingHTTPServer(("localhost", 8000), HelloWorldHandler)
     print("Serving Hello Woererwrwerwerwerld at http://localhost:8000")
     print("Press Ctrl+C to stop")
     server.serve_forever()
\ No newline at end of file
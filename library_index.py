@@ -0,0 +1,264 @@
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.flac', '.m4a', '.aac', '.wma', '.ogg', '.opus', '.mp4', '.m4b'}
+
+DEFAULT_INDEX_PATH = Path.home() / ".musicqueue" / "library_index.json"
+
+
+# =========================
+# LIBRARY INDEX
+# =========================
+
+class LibraryIndex:
+    """
+    Persistent index of every audio file under one music directory.
+
+    A scan walks the tree once with os.scandir, matching all extensions in a
+    single pass. Each directory's entry keeps its mtime, its audio files
+    (size, mtime) and its subdirectories. On later scans a directory whose
+    mtime is unchanged is only stat'ed, not listed. Adding, removing or
+    renaming an entry updates the parent directory's mtime, so those changes
+    are still picked up. In-place rewrites of a file that keep its name do not
+    touch the directory mtime and are only seen on a full rescan (force=True).
+    """
+
+    VERSION = 1
+
+    def __init__(self, root, path=None):
+        self.root = os.path.abspath(root)
+        self.path = Path(path) if path else DEFAULT_INDEX_PATH
+        self.dirs = {}
+        self.lock = threading.RLock()
+        self.last_scan = {"dirs_listed": 0, "dirs_reused": 0, "files": 0}
+        self.last_changes = {"added": [], "removed": []}
+        self.load()
+
+    # -------------------------
+    # SCAN
+    # -------------------------
+
+    def scan(self, force=False):
+        """
+        Walk the library, re-listing only directories whose mtime changed
+        The file-level diff is left in `last_changes`
+        Returns: dict with dirs_listed, dirs_reused and files
+        """
+        with self.lock:
+            return self._scan(force)
+
+    def _scan(self, force):
+        dirs = {}
+        listed = reused = 0
+        added = []
+        stack = [self.root]
+
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+
+            old_entry = self.dirs.get(directory)
+            if force or old_entry is None or old_entry["mtime_ns"] != mtime_ns:
+                entry = self.list_directory(directory, mtime_ns)
+                self.diff_files(directory, old_entry, entry, added, [])
+                listed += 1
+            else:
+                entry = old_entry
+                reused += 1
+
+            dirs[directory] = entry
+            stack.extend(os.path.join(directory, name) for name in entry["subdirs"])
+
+        removed = [
+            path
+            for directory, old_entry in self.dirs.items()
+            for path in self.removed_files(directory, old_entry, dirs.get(directory))
+        ]
+
+        self.dirs = dirs
+        self.last_changes = {"added": added, "removed": removed}
+        self.last_scan = {
+            "dirs_listed": listed,
+            "dirs_reused": reused,
+            "files": sum(len(entry["files"]) for entry in dirs.values()),
+        }
+        return self.last_scan
+
+    def refresh(self, directories):
+        """
+        Re-list just `directories` (e.g. from filesystem events), walking any
+        new subdirectories and dropping vanished ones
+        Returns: dict with added [(path, size, mtime_ns)] and removed [path]
+        """
+        with self.lock:
+            return self._refresh(directories)
+
+    def _refresh(self, directories):
+        added = []
+        removed = []
+
+        for directory in sorted(set(directories), key=len):
+            directory = os.path.abspath(directory)
+            if directory != self.root and not directory.startswith(self.root + os.sep):
+                continue
+
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                removed.extend(self.drop_tree(directory))
+                continue
+
+            old_entry = self.dirs.get(directory)
+            entry = self.list_directory(directory, mtime_ns)
+            self.diff_files(directory, old_entry, entry, added, removed)
+            self.dirs[directory] = entry
+
+            old_subdirs = set(old_entry["subdirs"]) if old_entry else set()
+            for name in old_subdirs - set(entry["subdirs"]):
+                removed.extend(self.drop_tree(os.path.join(directory, name)))
+            for name in entry["subdirs"]:
+                subdir = os.path.join(directory, name)
+                if subdir not in self.dirs:
+                    added.extend(self.add_tree(subdir))
+
+        self.last_changes = {"added": added, "removed": removed}
+        return self.last_changes
+
+    def add_tree(self, directory):
+        """List a directory that is new to the index and everything below it"""
+        added = []
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                continue
+            entry = self.list_directory(current, mtime_ns)
+            self.diff_files(current, self.dirs.get(current), entry, added, [])
+            self.dirs[current] = entry
+            stack.extend(os.path.join(current, name) for name in entry["subdirs"])
+        return added
+
+    def drop_tree(self, directory):
+        """Remove a directory and its descendants from the index"""
+        prefix = directory + os.sep
+        removed = []
+        for current in [d for d in self.dirs if d == directory or d.startswith(prefix)]:
+            entry = self.dirs.pop(current)
+            removed.extend(os.path.join(current, name) for name in entry["files"])
+        return removed
+
+    @staticmethod
+    def diff_files(directory, old_entry, new_entry, added, removed):
+        old_files = old_entry["files"] if old_entry else {}
+        for name, (size, mtime_ns) in new_entry["files"].items():
+            if old_files.get(name) != [size, mtime_ns]:
+                added.append((os.path.join(directory, name), size, mtime_ns))
+        for name in old_files:
+            if name not in new_entry["files"]:
+                removed.append(os.path.join(directory, name))
+
+    @staticmethod
+    def removed_files(directory, old_entry, new_entry):
+        if new_entry is None:
+            return [os.path.join(directory, name) for name in old_entry["files"]]
+        if new_entry is old_entry:
+            return []
+        return [
+            os.path.join(directory, name)
+            for name in old_entry["files"]
+            if name not in new_entry["files"]
+        ]
+
+    @staticmethod
+    def list_directory(directory, mtime_ns):
+        files = {}
+        subdirs = []
+
+        try:
+            with os.scandir(directory) as entries:
+                for item in entries:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            subdirs.append(item.name)
+                        elif os.path.splitext(item.name)[1].lower() in AUDIO_EXTENSIONS and item.is_file():
+                            st = item.stat()
+                            files[item.name] = [st.st_size, st.st_mtime_ns]
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+
+        return {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+
+    # -------------------------
+    # QUERIES
+    # -------------------------
+
+    def tracks(self):
+        """All indexed audio files as sorted Paths"""
+        with self.lock:
+            return sorted(
+                Path(directory, name)
+                for directory, entry in self.dirs.items()
+                for name in entry["files"]
+            )
+
+    def entries(self):
+        """(path, size, mtime_ns) for every indexed audio file"""
+        with self.lock:
+            return [
+                (os.path.join(directory, name), size, mtime_ns)
+                for directory, entry in self.dirs.items()
+                for name, (size, mtime_ns) in entry["files"].items()
+            ]
+
+    def directories(self):
+        with self.lock:
+            return list(self.dirs)
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(entry["files"]) for entry in self.dirs.values())
+
+    # -------------------------
+    # LOAD / SAVE
+    # -------------------------
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") == self.VERSION and data.get("root") == self.root:
+            self.dirs = data.get("dirs", {})
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(
+                {"version": self.VERSION, "root": self.root, "dirs": self.dirs},
+                separators=(",", ":"),
+            )
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".index-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
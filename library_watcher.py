@@ -0,0 +1,251 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+    | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+# =========================
+# INOTIFY
+# =========================
+
+class Inotify:
+    """Minimal ctypes binding to Linux inotify (no third-party dependency)"""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "libc has no inotify support")
+
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def read_events(self):
+        """Yield (wd, mask, name) for every pending event"""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            yield wd, mask, os.fsdecode(name)
+
+    def close(self):
+        os.close(self.fd)
+
+
+# =========================
+# LIBRARY WATCHER
+# =========================
+
+class LibraryWatcher:
+    """
+    Keeps a LibraryIndex current from filesystem events.
+
+    On Linux every indexed directory gets an inotify watch. Events only mark
+    their directory dirty. Once the tree has been quiet for `debounce` seconds
+    (or `max_delay` has passed during a long copy), each dirty directory is
+    re-listed once, the index is saved, and `on_change(changes)` gets the
+    file-level diff. Without inotify (other platforms, watch limit reached)
+    the index is re-scanned every `poll_interval` seconds, which only lists
+    directories whose mtime changed.
+    """
+
+    def __init__(self, index, on_change=None, debounce=1.0, max_delay=10.0,
+                 poll_interval=30.0, use_inotify=True):
+        self.index = index
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+
+        self.mode = None
+        self.inotify = None
+        self.watches = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.counters = {"events": 0, "batches": 0, "added": 0, "removed": 0}
+
+    # -------------------------
+    # START / STOP
+    # -------------------------
+
+    def start(self):
+        if self.use_inotify:
+            try:
+                self.inotify = Inotify()
+                for directory in self.index.directories():
+                    self.watch(directory)
+                self.mode = "inotify"
+            except OSError as e:
+                print(f"⚠️  inotify unavailable ({e}); falling back to polling")
+                self.close_inotify()
+
+        if self.mode is None:
+            self.mode = "polling"
+
+        target = self.run_inotify if self.mode == "inotify" else self.run_polling
+        self.thread = threading.Thread(target=target, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.close_inotify()
+
+    def close_inotify(self):
+        if self.inotify:
+            self.inotify.close()
+        self.inotify = None
+        self.watches = {}
+
+    def watch(self, directory):
+        wd = self.inotify.add_watch(directory)
+        self.watches[wd] = directory
+
+    # -------------------------
+    # INOTIFY LOOP
+    # -------------------------
+
+    def run_inotify(self):
+        dirty = set()
+        rescan = False
+        first_event = last_event = None
+
+        while not self.stop_event.is_set():
+            timeout = 0.5
+            if last_event is not None:
+                timeout = max(min(last_event + self.debounce, first_event + self.max_delay)
+                              - time.monotonic(), 0)
+
+            ready, _, _ = select.select([self.inotify.fd], [], [], timeout)
+
+            if ready:
+                for wd, mask, _name in self.inotify.read_events():
+                    self.counters["events"] += 1
+                    if mask & IN_Q_OVERFLOW:
+                        rescan = True
+                        continue
+                    if mask & IN_IGNORED:
+                        self.watches.pop(wd, None)
+                        continue
+
+                    directory = self.watches.get(wd)
+                    if directory is None:
+                        continue
+                    if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                        dirty.add(os.path.dirname(directory))
+                    else:
+                        dirty.add(directory)
+
+                now = time.monotonic()
+                first_event = first_event or now
+                last_event = now
+                if now - first_event < self.max_delay:
+                    continue
+
+            if last_event is None:
+                continue
+
+            # Quiet for `debounce` seconds (or max_delay reached): apply the batch
+            self.apply(dirty, rescan)
+            dirty = set()
+            rescan = False
+            first_event = last_event = None
+
+    def apply(self, dirty, rescan=False):
+        if rescan:
+            self.index.scan()
+            changes = self.index.last_changes
+        else:
+            changes = self.index.refresh(dirty)
+
+        if self.inotify:
+            watched = set(self.watches.values())
+            new_dirs = []
+            for directory in self.index.directories():
+                if directory not in watched:
+                    try:
+                        self.watch(directory)
+                        new_dirs.append(directory)
+                    except OSError as e:
+                        print(f"⚠️  Could not watch {directory}: {e}")
+
+            # Files may have landed in a new directory before its watch existed
+            if new_dirs:
+                late = self.index.refresh(new_dirs)
+                changes = {
+                    "added": changes["added"] + late["added"],
+                    "removed": changes["removed"] + late["removed"],
+                }
+
+        self.publish(changes)
+
+    # -------------------------
+    # POLLING FALLBACK
+    # -------------------------
+
+    def run_polling(self):
+        while not self.stop_event.wait(self.poll_interval):
+            stats = self.index.scan()
+            if stats["dirs_listed"]:
+                self.publish(self.index.last_changes)
+
+    def publish(self, changes):
+        if not changes["added"] and not changes["removed"]:
+            return
+
+        self.counters["batches"] += 1
+        self.counters["added"] += len(changes["added"])
+        self.counters["removed"] += len(changes["removed"])
+        self.index.save()
+
+        if self.on_change:
+            try:
+                self.on_change(changes)
+            except Exception as e:
+                print(f"⚠️  Library change handler failed: {e}")
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+
+from audio_features import analyze_catalog
+
+
+# ReplayGain 2.0 reference level
+REFERENCE_LUFS = -18.0
+MAX_BOOST_DB = 12.0
+
+
+def album_key(path, album=None):
+    """Tracks group by album tag within a folder; untagged tracks group by folder"""
+    folder = os.path.dirname(path)
+    return f"{folder}\x00{album}" if album else folder
+
+
+def limit_gain(gain_db, peak, headroom_db=0.0):
+    """
+    Cap gains so the loudest sample stays below full scale
+    Works on scalars or arrays; a missing peak (NaN) leaves the gain as is
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ceiling = -headroom_db - 20 * np.log10(peak)
+    gain_db = np.minimum(gain_db, MAX_BOOST_DB)
+    return np.where(np.isnan(ceiling), gain_db, np.minimum(gain_db, ceiling))
+
+
+def compute_gains(rows, reference=REFERENCE_LUFS):
+    """
+    Track and album gains from (path, album, duration, loudness, peak) rows,
+    vectorized over the whole library. Album loudness is the duration-weighted
+    power mean of its tracks; album peak is the loudest track peak.
+    Returns: list of (path, album_key, track_gain, track_peak, album_gain, album_peak)
+    """
+    if not rows:
+        return []
+
+    paths = [row["path"] for row in rows]
+    keys = [album_key(row["path"], row["album"]) for row in rows]
+    loudness = np.array([row["loudness"] for row in rows], dtype=np.float64)
+    peaks = np.array([row["peak"] if row["peak"] is not None else np.nan for row in rows])
+    durations = np.array([row["duration"] or 1.0 for row in rows], dtype=np.float64)
+
+    albums, album_index = np.unique(keys, return_inverse=True)
+    power = np.bincount(album_index, weights=durations * 10 ** (loudness / 10), minlength=len(albums))
+    total = np.bincount(album_index, weights=durations, minlength=len(albums))
+    album_loudness = 10 * np.log10(power / total)
+
+    album_peaks = np.full(len(albums), -np.inf)
+    np.fmax.at(album_peaks, album_index, peaks)
+    album_peaks[np.isinf(album_peaks)] = np.nan
+
+    track_gain = limit_gain(reference - loudness, peaks)
+    album_gain = limit_gain(reference - album_loudness, album_peaks)[album_index]
+    album_peak = album_peaks[album_index]
+
+    def value(x):
+        return None if np.isnan(x) else float(x)
+
+    return [
+        (paths[i], keys[i], value(track_gain[i]), value(peaks[i]), value(album_gain[i]), value(album_peak[i]))
+        for i in range(len(paths))
+    ]
+
+
+def update_gains(catalog, workers=None, reference=REFERENCE_LUFS):
+    """
+    Analyze new or changed tracks (decoding only those), then recompute
+    track and album gains for the library
+    Returns: analyze_catalog stats plus tracks and albums with gains
+    """
+    stats = analyze_catalog(catalog, workers=workers)
+    gains = compute_gains(catalog.loudness_rows(), reference)
+    catalog.store_gains(gains)
+    stats["tracks"] = len(gains)
+    stats["albums"] = len({row[1] for row in gains})
+    return stats
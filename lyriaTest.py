@@ -1,10 +1,11 @@
 import asyncio
 import os
 import warnings
-import numpy as np
-import sounddevice as sd
 from google import genai
-from google.genai import types
+
+from lyria_cache import LyriaCache, RecordingSession
+from lyria_controller import LyriaController
+from lyria_stream import StreamingPlayer
 
 warnings.filterwarnings('ignore', message='.*experimental.*', module='google.genai')
 
@@ -13,45 +14,47 @@ client = genai.Client(
     http_options={'api_version': 'v1alpha'}
 )
 
+PROMPTS = [('elevator music', 1.0)]
+CONFIG = {'bpm': 90, 'temperature': 1.0}
+
+
+async def steer(session, player):
+    # One warm session: later mood changes are steered, not reconnected
+    controller = LyriaController(session, player)
+
+    # 1. Send initial musical concept, set the vibe and drop the beat
+    await controller.start(PROMPTS, **CONFIG)
+
+    # 2. Steer live: stress rising, then settling (crossfaded, no reconnect)
+    for stress in (0.2, 0.6, 0.9, 0.4):
+        await asyncio.sleep(7.5)
+        controller.steer_for_stress(stress)
+        print(f"🎵 Steering for stress {stress:.1f}")
+
+    await controller.stop()
+    print(f"✓ Controller stats: {controller.stats()}")
+
+
 async def main():
-    stream = sd.OutputStream(samplerate=48000, channels=1, dtype='int16')
-    stream.start()
-
-    async def receive_audio(session):
-        """Background task to process incoming audio chunks."""
-        while True:
-            async for message in session.receive():
-                if message.server_content.audio_chunks:
-                    for chunk in message.server_content.audio_chunks:
-                        audio_array = np.frombuffer(chunk.data, dtype=np.int16)
-                        stream.write(audio_array)
-            await asyncio.sleep(10**-12)
-
-    async with (
-        client.aio.live.music.connect(model='models/lyria-realtime-exp') as session,
-        asyncio.TaskGroup() as tg,
-    ):
-        # 1. Start listening for audio
-        tg.create_task(receive_audio(session))
-
-        # 2. Send initial musical concept
-        await session.set_weighted_prompts(
-            prompts=[types.WeightedPrompt(text='elevator music', weight=1.0)]
-        )
-
-        # 3. Set the vibe (BPM, Temperature)
-        await session.set_music_generation_config(
-            config=types.LiveMusicGenerationConfig(bpm=90, temperature=1.0)
-        )
-
-        # 4. Drop the beat
-        await session.play()
-
-        # Keep the session alive
-        await asyncio.sleep(30)
-
-    stream.stop()
-    stream.close()
+    # Callback output fed from a bounded jitter buffer: the receiver awaits
+    # space instead of spinning, and the device never blocks the event loop
+    player = StreamingPlayer().start()
+    cache = LyriaCache()
+
+    # Settings heard before start instantly from disk, with no API calls
+    replay = cache.lookup(PROMPTS, CONFIG)
+    if replay is not None:
+        print("✓ Replaying cached audio (no API calls)")
+        await steer(replay, player)
+    else:
+        async with client.aio.live.music.connect(model='models/lyria-realtime-exp') as session:
+            recording = RecordingSession(session, cache)
+            await steer(recording, player)
+            await recording.close()
+
+    print(f"✓ Stream stats: {player.stats()}")
+    print(f"✓ Cache stats: {cache.stats()}")
+    player.close()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,446 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from lyria_stream import LYRIA_CHANNELS, LYRIA_SAMPLERATE
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".musicqueue" / "lyria_cache"
+
+
+def audio_message(data):
+    """Wrap PCM bytes the way session.receive() delivers them"""
+    return SimpleNamespace(server_content=SimpleNamespace(audio_chunks=[SimpleNamespace(data=data)]))
+
+
+def _field(item, name):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def normalize_prompts(prompts):
+    """(text, weight) pairs from tuples, dicts or WeightedPrompt objects"""
+    pairs = []
+    for prompt in prompts:
+        if isinstance(prompt, (tuple, list)):
+            text, weight = prompt
+        else:
+            text, weight = _field(prompt, "text"), _field(prompt, "weight")
+        pairs.append((str(text), round(float(weight), 3)))
+    return sorted(pairs)
+
+
+def normalize_config(config):
+    if config is None:
+        return {}
+    if hasattr(config, "model_dump"):
+        config = config.model_dump(exclude_none=True)
+    return {k: (v.value if hasattr(v, "value") else v) for k, v in sorted(dict(config).items())
+            if v is not None}
+
+
+def cache_key(prompts, config):
+    """
+    Content address for one generation setting
+    Returns: sha256 hex of the normalized prompts, weights and config
+    """
+    payload = json.dumps([normalize_prompts(prompts), normalize_config(config)],
+                         sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# =========================
+# LYRIA CACHE
+# =========================
+
+class LyriaCache:
+    """
+    Size-bounded, content-addressed store of generated Lyria audio.
+
+    Each setting (prompts + weights + config) maps to one raw int16 PCM file
+    named by cache_key(). Recordings are appended chunk by chunk to a .part
+    file and renamed into place when finished, so a crash never leaves a
+    truncated segment behind. A JSON manifest tracks size and last use;
+    the least recently used segments are evicted past `max_bytes`.
+    """
+
+    def __init__(self, root=None, max_bytes=512 * 1024 * 1024, min_seconds=5.0,
+                 samplerate=LYRIA_SAMPLERATE, channels=LYRIA_CHANNELS):
+        self.root = Path(root) if root else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.samplerate = samplerate
+        self.channels = channels
+        self.frame_bytes = 2 * channels
+        self.min_bytes = int(min_seconds * samplerate) * self.frame_bytes
+        self.lock = threading.Lock()
+        self.entries = self.load()
+        self.counters = {"hits": 0, "misses": 0, "recorded": 0, "evictions": 0}
+
+    # -------------------------
+    # MANIFEST
+    # -------------------------
+
+    @property
+    def manifest_path(self):
+        return self.root / "manifest.json"
+
+    def segment_path(self, key):
+        return self.root / f"{key}.pcm"
+
+    def load(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        # Drop entries whose segment vanished (e.g. cleaned up by hand)
+        return {key: entry for key, entry in data.items() if self.segment_path(key).exists()}
+
+    def save(self):
+        with self.lock:
+            data = dict(self.entries)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".manifest-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.manifest_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    # -------------------------
+    # LOOKUP / RECORD
+    # -------------------------
+
+    def lookup(self, prompts, config):
+        """
+        Find a finished recording for this setting and mark it recently used
+        Returns: ReplaySource, or None on a miss
+        """
+        key = cache_key(prompts, config)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            entry["last_used"] = time.time()
+            self.counters["hits"] += 1
+        self.save()
+        return ReplaySource(self, key)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def recorder(self, prompts, config):
+        return SegmentRecorder(self, cache_key(prompts, config), prompts, config)
+
+    def commit(self, key, part_path, size, prompts, config):
+        """Move a finished recording into place, then enforce the size bound"""
+        usable = size - size % self.frame_bytes
+        if usable < self.min_bytes:
+            os.remove(part_path)
+            return False
+
+        if usable != size:
+            os.truncate(part_path, usable)
+        os.replace(part_path, self.segment_path(key))
+        with self.lock:
+            self.entries[key] = {
+                "bytes": usable,
+                "seconds": usable / float(self.frame_bytes * self.samplerate),
+                "prompts": normalize_prompts(prompts),
+                "config": normalize_config(config),
+                "last_used": time.time(),
+            }
+            self.counters["recorded"] += 1
+        self.evict(keep=key)
+        self.save()
+        return True
+
+    def evict(self, keep=None):
+        """Remove least recently used segments until the cache fits in max_bytes"""
+        with self.lock:
+            total = sum(entry["bytes"] for entry in self.entries.values())
+            for key in sorted(self.entries, key=lambda k: self.entries[k]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                total -= self.entries.pop(key)["bytes"]
+                self.counters["evictions"] += 1
+                try:
+                    os.remove(self.segment_path(key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["segments"] = len(self.entries)
+            stats["bytes"] = sum(entry["bytes"] for entry in self.entries.values())
+        return stats
+
+
+# =========================
+# RECORDING
+# =========================
+
+class SegmentRecorder:
+    """Appends received PCM chunks for one setting to a .part file"""
+
+    def __init__(self, cache, key, prompts, config):
+        self.cache = cache
+        self.key = key
+        self.prompts = prompts
+        self.config = config
+        self.size = 0
+        cache.root.mkdir(parents=True, exist_ok=True)
+        fd, self.part_path = tempfile.mkstemp(dir=cache.root, prefix=f".{key[:12]}-", suffix=".part")
+        self.file = os.fdopen(fd, "wb")
+
+    def write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+
+    def finish(self):
+        """
+        Close the recording and store it if long enough
+        Returns: True if the segment was added to the cache
+        """
+        self.file.close()
+        return self.cache.commit(self.key, self.part_path, self.size, self.prompts, self.config)
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.part_path)
+        except FileNotFoundError:
+            pass
+
+
+class RecordingSession:
+    """
+    Wraps a live session and records everything it sends into a LyriaCache.
+
+    Each prompt or config change closes the current segment and starts a new
+    one under the new key, so every segment is the audio of one setting.
+    File writes go through a bounded queue drained on a worker thread, so a
+    slow disk delays the receiver only once the queue is full and never
+    stalls the event loop.
+    """
+
+    def __init__(self, session, cache, queue_size=64):
+        self.session = session
+        self.cache = cache
+        self.prompts = []
+        self.config = {}
+        self.recorder = None
+        self.pending = asyncio.Queue(maxsize=queue_size)
+        self.writer = None
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def submit(self, recorder, method, *args):
+        """Queue a recorder call ("write" or "finish"), in order, for the writer task"""
+        if self.writer is None:
+            self.writer = asyncio.create_task(self.drain())
+        await self.pending.put((recorder, method, args))
+
+    async def drain(self):
+        while True:
+            batch = [await self.pending.get()]
+            while not self.pending.empty():
+                batch.append(self.pending.get_nowait())
+            try:
+                await asyncio.to_thread(_run_batch, batch)
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+
+    async def restart_recording(self):
+        if self.recorder is not None:
+            await self.submit(self.recorder, "finish")
+        self.recorder = await asyncio.to_thread(self.cache.recorder, self.prompts, self.config)
+
+    async def set_weighted_prompts(self, prompts):
+        self.prompts = prompts
+        await self.restart_recording()
+        await self.session.set_weighted_prompts(prompts=prompts)
+
+    async def set_music_generation_config(self, config):
+        self.config = config
+        await self.restart_recording()
+        await self.session.set_music_generation_config(config=config)
+
+    async def receive(self):
+        async for message in self.session.receive():
+            content = message.server_content
+            if self.recorder is not None and content and content.audio_chunks:
+                for chunk in content.audio_chunks:
+                    await self.submit(self.recorder, "write", chunk.data)
+            yield message
+
+    async def close(self):
+        """Store the segment in progress once every queued write has landed"""
+        if self.recorder is not None:
+            await self.submit(self.recorder, "finish")
+            self.recorder = None
+        await self.pending.join()
+        if self.writer is not None:
+            self.writer.cancel()
+            self.writer = None
+
+
+def _run_batch(batch):
+    """Run queued recorder calls in order; a failed call discards only its own segment"""
+    for recorder, method, args in batch:
+        if recorder.file.closed:
+            continue  # finished, or aborted after an earlier failure
+        try:
+            getattr(recorder, method)(*args)
+        except Exception as e:
+            print(f"⚠️  Recording {method} failed, discarding segment: {e}")
+            recorder.abort()
+
+
+# =========================
+# REPLAY
+# =========================
+
+class ReplaySource:
+    """
+    Session-shaped source that plays a cached segment from a memory map.
+
+    receive() yields chunk_frames-sized memoryviews straight out of the
+    mapped file (no read() copies) and loops the segment. Steering calls
+    switch to another cached segment when one exists for the new setting.
+    """
+
+    def __init__(self, cache, key, chunk_frames=4800, loop=True):
+        self.cache = cache
+        self.chunk_frames = chunk_frames
+        self.loop = loop
+        self.prompts = []
+        self.config = {}
+        self.pending_key = None
+        self.api_calls = 0
+        self.open(key)
+
+    def open(self, key):
+        self.key = key
+        self.frames = np.memmap(self.cache.segment_path(key), dtype=np.int16, mode="r").reshape(
+            -1, self.cache.channels)
+        self.position = 0
+
+    async def set_weighted_prompts(self, prompts):
+        self.prompts = prompts
+        self.pending_key = cache_key(self.prompts, self.config)
+
+    async def set_music_generation_config(self, config):
+        self.config = config
+        self.pending_key = cache_key(self.prompts, self.config)
+
+    async def play(self):
+        pass
+
+    async def reset_context(self):
+        pass
+
+    async def receive(self):
+        while True:
+            if self.pending_key and self.pending_key != self.key and self.pending_key in self.cache:
+                self.open(self.pending_key)
+            self.pending_key = None
+
+            if self.position >= len(self.frames):
+                if not self.loop:
+                    return
+                self.position = 0
+
+            block = self.frames[self.position:self.position + self.chunk_frames]
+            self.position += len(block)
+            yield audio_message(memoryview(block).cast("B"))
+            await asyncio.sleep(0)
+
+
+# =========================
+# FAKE SESSION
+# =========================
+
+class FakeLiveMusicSession:
+    """
+    Offline stand-in for client.aio.live.music.connect(): a deterministic
+    tone whose pitch follows the prompts and whose pulse follows the bpm.
+    `api_calls` counts every method a real session would send upstream.
+    """
+
+    def __init__(self, chunk_frames=4800, max_chunks=None, samplerate=LYRIA_SAMPLERATE,
+                 channels=LYRIA_CHANNELS):
+        self.chunk_frames = chunk_frames
+        self.max_chunks = max_chunks
+        self.samplerate = samplerate
+        self.channels = channels
+        self.prompts = []
+        self.config = {}
+        self.playing = False
+        self.api_calls = 0
+        self.sent_chunks = 0
+        self.phase = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def set_weighted_prompts(self, prompts):
+        self.api_calls += 1
+        self.prompts = normalize_prompts(prompts)
+
+    async def set_music_generation_config(self, config):
+        self.api_calls += 1
+        self.config = normalize_config(config)
+
+    async def play(self):
+        self.api_calls += 1
+        self.playing = True
+
+    async def reset_context(self):
+        self.api_calls += 1
+
+    def synthesize(self):
+        text = "|".join(t for t, _ in self.prompts)
+        pitch = 110.0 * (1 + zlib.crc32(text.encode("utf-8")) % 8)
+        bpm = float(self.config.get("bpm", 90))
+
+        t = (self.phase + np.arange(self.chunk_frames)) / float(self.samplerate)
+        pulse = 0.6 + 0.4 * (np.sin(2 * np.pi * bpm / 60.0 * t) > 0)
+        tone = (0.3 * pulse * np.sin(2 * np.pi * pitch * t) * 32767).astype(np.int16)
+        self.phase += self.chunk_frames
+        return np.repeat(tone[:, None], self.channels, axis=1).tobytes()
+
+    async def receive(self):
+        while self.max_chunks is None or self.sent_chunks < self.max_chunks:
+            if not self.playing:
+                await asyncio.sleep(0.01)
+                continue
+            self.sent_chunks += 1
+            yield audio_message(self.synthesize())
+            await asyncio.sleep(0)
@@ -0,0 +1,181 @@
+import asyncio
+
+try:
+    from google.genai import types
+except ImportError:  # optional: only needed to talk to the real Lyria API
+    types = None
+
+
+# Prompt blend used by steer_for_stress(): calm takes over as stress rises
+STRESS_PROMPTS = {
+    "calm": "slow ambient pads, soft piano, gentle rain",
+    "focus": "lofi beats, warm keys, steady groove",
+}
+STRESS_BPM = (96, 64)  # bpm at stress 0.0 and 1.0
+
+# Config fields Lyria only picks up after reset_context()
+RESET_FIELDS = ("bpm", "scale")
+
+
+def weighted_prompts(prompts):
+    """Build WeightedPrompt objects (plain dicts when google-genai is not installed)"""
+    if types is None:
+        return [{"text": text, "weight": weight} for text, weight in prompts]
+    return [types.WeightedPrompt(text=text, weight=weight) for text, weight in prompts]
+
+
+def generation_config(config):
+    if types is None:
+        return dict(config)
+    return types.LiveMusicGenerationConfig(**config)
+
+
+# =========================
+# LYRIA CONTROLLER
+# =========================
+
+class LyriaController:
+    """
+    Steers one long-lived Lyria RealTime session instead of reconnecting
+    for every change of mood.
+
+    submit() queues a prompt and/or config update from anywhere on the event
+    loop. A worker applies them at most once per `min_interval` seconds; all
+    updates that arrive in between are coalesced (latest prompts win, config
+    fields are merged). Each applied update starts a crossfade in the
+    player's jitter buffer so the new music replaces the buffered tail
+    within `crossfade_seconds`.
+    """
+
+    def __init__(self, session, player, min_interval=1.0, crossfade_seconds=0.5):
+        self.session = session
+        self.player = player
+        self.min_interval = min_interval
+        self.crossfade_frames = int(crossfade_seconds * player.samplerate)
+
+        self.prompts = []
+        self.config = {}
+        self.updates = asyncio.Queue()
+        self.last_applied = None
+        self.tasks = []
+        self.counters = {"submitted": 0, "applied": 0, "coalesced": 0, "context_resets": 0}
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+
+    async def start(self, prompts, **config):
+        """Send the initial prompts/config, start playback, receiving and steering"""
+        self.prompts = list(prompts)
+        self.config = dict(config)
+        await self.session.set_weighted_prompts(prompts=weighted_prompts(self.prompts))
+        await self.session.set_music_generation_config(config=generation_config(self.config))
+        await self.session.play()
+        self.last_applied = asyncio.get_running_loop().time()
+
+        self.tasks = [
+            asyncio.create_task(self.player.receive(self.session)),
+            asyncio.create_task(self.run()),
+        ]
+        return self
+
+    async def stop(self):
+        """Apply anything still queued, then stop steering and receiving"""
+        if not self.tasks:
+            return
+        receiver, worker = self.tasks
+        self.updates.put_nowait(None)
+        await worker
+        receiver.cancel()
+        await asyncio.gather(receiver, return_exceptions=True)
+        self.tasks = []
+
+    # -------------------------
+    # UPDATES
+    # -------------------------
+
+    def submit(self, prompts=None, **config):
+        """
+        Queue an update; `prompts` is a list of (text, weight), config fields
+        are LiveMusicGenerationConfig fields (bpm, temperature, density, ...)
+        """
+        self.counters["submitted"] += 1
+        self.updates.put_nowait({"prompts": prompts, "config": config})
+
+    def steer_for_stress(self, stress):
+        """Blend calm/focus prompts and slow the tempo as stress (0-1) rises"""
+        stress = min(max(float(stress), 0.0), 1.0)
+        fast, slow = STRESS_BPM
+        self.submit(
+            prompts=[(STRESS_PROMPTS["calm"], round(stress, 2) or 0.01),
+                     (STRESS_PROMPTS["focus"], round(1 - stress, 2) or 0.01)],
+            bpm=int(round(fast + (slow - fast) * stress)),
+        )
+
+    def coalesce(self, update):
+        """
+        Merge every update already waiting in the queue into `update`
+        Returns: (update, stop) where stop is True if stop() was requested
+        """
+        while True:
+            try:
+                pending = self.updates.get_nowait()
+            except asyncio.QueueEmpty:
+                return update, False
+            if pending is None:
+                return update, True
+
+            self.counters["coalesced"] += 1
+            if pending["prompts"] is not None:
+                update["prompts"] = pending["prompts"]
+            update["config"] = {**update["config"], **pending["config"]}
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            update = await self.updates.get()
+            if update is None:
+                return
+
+            # Rate limit: wait out the interval, then take whatever piled up meanwhile
+            if self.last_applied is not None:
+                delay = self.last_applied + self.min_interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            update, stop = self.coalesce(update)
+            await self.apply(update)
+            self.last_applied = loop.time()
+            if stop:
+                return
+
+    async def apply(self, update):
+        """Send one merged update to the session and crossfade into the new audio"""
+        changed = False
+
+        if update["prompts"] is not None and list(update["prompts"]) != self.prompts:
+            self.prompts = list(update["prompts"])
+            await self.session.set_weighted_prompts(prompts=weighted_prompts(self.prompts))
+            changed = True
+
+        config = {**self.config, **update["config"]}
+        if config != self.config:
+            needs_reset = any(config.get(f) != self.config.get(f) for f in RESET_FIELDS)
+            self.config = config
+            # The config is replaced as a whole, so always send every field
+            await self.session.set_music_generation_config(config=generation_config(config))
+            if needs_reset and hasattr(self.session, "reset_context"):
+                await self.session.reset_context()
+                self.counters["context_resets"] += 1
+            changed = True
+
+        if changed:
+            self.counters["applied"] += 1
+            self.player.buffer.begin_crossfade(self.crossfade_frames)
+        return changed
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["prompts"] = list(self.prompts)
+        stats["config"] = dict(self.config)
+        return stats
@@ -0,0 +1,203 @@
+import asyncio
+
+import numpy as np
+
+from audio_pipeline import PcmRingBuffer, RingBufferOutput
+from pcm_arena import ChunkAssembler
+from playback_engine import open_output_stream
+
+
+# Lyria RealTime sends raw 16-bit PCM at 48 kHz, stereo
+LYRIA_SAMPLERATE = 48000
+LYRIA_CHANNELS = 2
+
+
+# =========================
+# JITTER BUFFER
+# =========================
+
+class JitterBuffer(RingBufferOutput):
+    """
+    Bounded buffer between an asyncio receiver and an audio callback.
+
+    put() is a coroutine: when the ring is full it awaits an asyncio.Event
+    that the callback sets (via loop.call_soon_threadsafe) after draining,
+    so a fast network never grows memory and a waiting receiver burns no CPU.
+
+    The callback (this object) never blocks. It plays silence until
+    `prefill` frames have arrived, and after an underrun it waits for
+    `prefill` frames again instead of stuttering chunk by chunk.
+
+    begin_crossfade() drops buffered audio beyond a short tail and blends
+    the next frames put() over that tail, so a change upstream is heard
+    within one crossfade period instead of one buffer period.
+    """
+
+    def __init__(self, capacity, channels=LYRIA_CHANNELS, prefill=0, dtype=np.float32):
+        super().__init__(PcmRingBuffer(capacity, channels, dtype=dtype))
+        self.prefill = min(int(prefill), self.ring.capacity)
+        self.primed = self.prefill == 0
+        self.loop = None
+        self.space = None
+        self.waiting = False
+        self.fade_frames = 0
+
+    # -------------------------
+    # PRODUCER (event loop)
+    # -------------------------
+
+    async def put(self, frames):
+        """
+        Queue `frames`, awaiting space while the buffer is full
+        Returns: number of frames queued (short only if the buffer was closed)
+        """
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+            self.space = asyncio.Event()
+
+        written = 0
+        if self.fade_frames:
+            written = self.ring.mix_tail(frames[:self.fade_frames])
+            self.fade_frames = 0
+
+        try:
+            while written < len(frames) and not self.ring.closed:
+                self.space.clear()
+                self.waiting = True
+                written += self.ring.write(frames[written:], timeout=0)
+                if written < len(frames):
+                    await self.space.wait()
+        finally:
+            self.waiting = False
+
+        if not self.primed and self.ring.available >= self.prefill:
+            self.primed = True
+        return written
+
+    def begin_crossfade(self, frames):
+        """Keep `frames` of the old audio and fade the next `frames` put() over it"""
+        self.ring.truncate(frames)
+        self.fade_frames = int(frames)
+
+    def finish(self):
+        """No more audio is coming: play out what is left, even below prefill"""
+        self.finished = True
+        self.primed = True
+
+    def close(self):
+        self.ring.close()
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.space.set)
+
+    # -------------------------
+    # CONSUMER (audio thread)
+    # -------------------------
+
+    def __call__(self, outdata, frames, time_info, status):
+        if self.paused or not self.primed:
+            outdata.fill(0)
+            return
+
+        copied = self.ring.read_into(outdata)
+        if copied < frames:
+            outdata[copied:] = 0
+            if not self.finished:
+                self.ring.record_underrun(frames - copied)
+                self.primed = self.prefill == 0
+
+        if copied and self.waiting:
+            self.loop.call_soon_threadsafe(self.space.set)
+
+    def stats(self):
+        stats = self.ring.stats()
+        stats["primed"] = self.primed
+        return stats
+
+
+# =========================
+# STREAMING PLAYER
+# =========================
+
+class StreamingPlayer:
+    """
+    Plays a live PCM stream (e.g. a Lyria RealTime session) without
+    blocking the event loop.
+
+    receive() pulls chunks from the session, converts them to float32 with
+    gain through a ChunkAssembler (no per-chunk allocation) and awaits space
+    in the jitter buffer; a sounddevice callback stream drains it on the
+    audio thread.
+    """
+
+    def __init__(self, samplerate=LYRIA_SAMPLERATE, channels=LYRIA_CHANNELS, buffer_seconds=2.0,
+                 prefill_seconds=0.25, blocksize=0, latency="low", gain=1.0, output_factory=None):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.latency = latency
+        self.output_factory = output_factory or open_output_stream
+        self.buffer = JitterBuffer(int(buffer_seconds * samplerate), channels,
+                                   prefill=int(prefill_seconds * samplerate))
+        self.assembler = ChunkAssembler(channels, gain=gain)
+        self.stream = None
+
+    # -------------------------
+    # OUTPUT
+    # -------------------------
+
+    def start(self):
+        self.stream = self.output_factory(self.samplerate, self.channels, self.blocksize,
+                                          self.latency, self.buffer)
+        self.stream.start()
+        return self
+
+    def set_gain(self, gain):
+        self.assembler.set_gain(gain)
+
+    def pause(self):
+        self.buffer.paused = True
+
+    def resume(self):
+        self.buffer.paused = False
+
+    async def drain(self, timeout=None):
+        """Let the callback play out what is buffered, without blocking the loop"""
+        self.buffer.finish()
+        await asyncio.to_thread(self.buffer.ring.wait_empty, timeout)
+
+    def close(self):
+        self.buffer.close()
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+    def stats(self):
+        stats = dict(self.assembler.counters)
+        stats.update(self.buffer.stats())
+        return stats
+
+    # -------------------------
+    # INPUT
+    # -------------------------
+
+    async def feed(self, data):
+        """Queue one chunk of interleaved int16 PCM bytes (it may split a sample or frame)"""
+        return await self.buffer.put(self.assembler.push(data))
+
+    async def receive(self, session):
+        """
+        Feed every audio chunk the session sends until it closes
+        Each receive() iterator covers one turn; an empty one means the session is over
+        """
+        while not self.buffer.ring.closed:
+            received = False
+            async for message in session.receive():
+                received = True
+                content = message.server_content
+                if content and content.audio_chunks:
+                    for chunk in content.audio_chunks:
+                        await self.feed(chunk.data)
+            if not received:
+                break
+        self.buffer.finish()
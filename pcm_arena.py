@@ -0,0 +1,98 @@
+import numpy as np
+
+
+# Lyria RealTime sends interleaved signed 16-bit little-endian PCM
+SAMPLE_BYTES = 2
+INT16_SCALE = 1.0 / 32768.0
+
+
+# =========================
+# CHUNK ASSEMBLER
+# =========================
+
+class ChunkAssembler:
+    """
+    Turns network chunks of int16 PCM bytes into float32 frames without
+    allocating per chunk.
+
+    Bytes are copied once into a preallocated bytearray (via memoryview).
+    Any trailing partial sample or frame stays there as carry for the next
+    chunk. Whole frames are converted to float32, with gain applied in the
+    same pass, into a second preallocated arena. push() returns a view into
+    that arena; it stays valid until the next push().
+
+    The arenas only grow when a chunk larger than any seen before arrives.
+    """
+
+    def __init__(self, channels=2, capacity_frames=8192, gain=1.0):
+        self.channels = channels
+        self.frame_bytes = SAMPLE_BYTES * channels
+        self.carry = 0
+        self.set_gain(gain)
+        self.counters = {"chunks": 0, "frames": 0, "bytes": 0, "grows": 0}
+        self._allocate(capacity_frames)
+
+    def _allocate(self, frames):
+        raw = bytearray((frames + 1) * self.frame_bytes)
+        if self.carry:
+            raw[:self.carry] = self.raw[:self.carry]
+
+        self.capacity = frames
+        self.raw = raw
+        self.view = memoryview(raw)
+        self.samples = np.frombuffer(raw, dtype=np.int16)
+        self.output = np.empty((frames, self.channels), dtype=np.float32)
+        self.flat_output = self.output.reshape(-1)
+
+    def set_gain(self, gain):
+        self.gain = gain
+        self.scale = np.float32(gain * INT16_SCALE)
+
+    # -------------------------
+    # ASSEMBLY
+    # -------------------------
+
+    def push(self, data):
+        """
+        Add one chunk of PCM bytes
+        Returns: float32 (frames, channels) view of every whole frame now available
+        """
+        size = len(data)
+        total = self.carry + size
+        if total > len(self.raw):
+            self.counters["grows"] += 1
+            self._allocate(total // self.frame_bytes)
+
+        self.view[self.carry:total] = data
+
+        frames = total // self.frame_bytes
+        used = frames * self.frame_bytes
+        count = frames * self.channels
+        # Cast, then scale in place: a mixed-type multiply would allocate a cast buffer
+        out = self.flat_output[:count]
+        np.copyto(out, self.samples[:count], casting="unsafe")
+        np.multiply(out, self.scale, out=out)
+
+        # Keep the split sample/frame at the front for the next chunk
+        self.carry = total - used
+        if self.carry:
+            self.view[:self.carry] = self.view[used:total]
+
+        self.counters["chunks"] += 1
+        self.counters["frames"] += frames
+        self.counters["bytes"] += size
+        return self.output[:frames]
+
+    def reset(self):
+        """Drop any carried partial frame (e.g. when the stream restarts)"""
+        self.carry = 0
+
+
+def apply_gain(frames, gain):
+    """
+    Scale float frames in place
+    Returns: the same array
+    """
+    if gain != 1.0:
+        np.multiply(frames, np.float32(gain), out=frames)
+    return frames
@@ -0,0 +1,292 @@
+import threading
+
+import numpy as np
+
+from audio_pipeline import PcmRingBuffer, RingBufferOutput
+
+try:
+    import soundfile as sf
+except ImportError:  # optional: needed to decode local files
+    sf = None
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # optional: missing package or PortAudio library
+    sd = None
+
+
+def playback_available():
+    return sf is not None and sd is not None
+
+
+def open_output_stream(samplerate, channels, blocksize, latency, callback, dtype="float32"):
+    """Default output: one sounddevice callback stream (the stack lyriaTest.py uses)"""
+    return sd.OutputStream(samplerate=samplerate, channels=channels, dtype=dtype,
+                           blocksize=blocksize, latency=latency, callback=callback)
+
+
+# =========================
+# TRACK DECODER
+# =========================
+
+class TrackDecoder:
+    """
+    Incremental decoder for one file, converted to the engine's output format.
+
+    Frames are read from disk a block at a time (never the whole file), mapped
+    to `channels` and linearly resampled to `samplerate` when the file differs.
+    `gain_db` (e.g. a ReplayGain value) is applied in place on each block.
+    """
+
+    def __init__(self, path, samplerate, channels, gain_db=0.0):
+        if sf is None:
+            raise RuntimeError("soundfile is required to decode local files (pip install soundfile)")
+
+        self.path = path
+        self.file = sf.SoundFile(path)
+        self.channels = channels
+        self.ratio = self.file.samplerate / float(samplerate)
+        self.pending = np.zeros((0, channels), dtype=np.float32)
+        self.phase = 0.0
+        self.eof = False
+        self.gain = np.float32(10 ** (gain_db / 20.0)) if gain_db else None
+
+    def _read_source(self, frames):
+        data = self.file.read(frames, dtype="float32", always_2d=True)
+        if len(data) < frames:
+            self.eof = True
+
+        source_channels = data.shape[1]
+        if source_channels == self.channels:
+            return data
+        if source_channels == 1:
+            return np.repeat(data, self.channels, axis=1)
+        if source_channels > self.channels:
+            if self.channels == 1:
+                return data.mean(axis=1, keepdims=True)
+            return data[:, :self.channels]
+        return np.concatenate(
+            [data, np.repeat(data[:, -1:], self.channels - source_channels, axis=1)], axis=1
+        )
+
+    def read(self, frames):
+        """
+        Return up to `frames` output frames as float32 (frames, channels)
+        An empty array means the track has ended
+        """
+        block = self._read_converted(frames)
+        if self.gain is not None and len(block):
+            np.multiply(block, self.gain, out=block)
+        return block
+
+    def _read_converted(self, frames):
+        if self.ratio == 1.0:
+            return self._read_source(frames) if not self.eof else self.pending[:0]
+
+        needed = int(np.ceil(self.phase + frames * self.ratio)) + 1
+        while len(self.pending) < needed and not self.eof:
+            self.pending = np.concatenate([self.pending, self._read_source(needed - len(self.pending))])
+
+        positions = self.phase + np.arange(frames) * self.ratio
+        positions = positions[positions < len(self.pending) - 1]
+        if len(positions) == 0:
+            return self.pending[:0]
+
+        index = positions.astype(np.int64)
+        frac = (positions - index)[:, None].astype(np.float32)
+        out = self.pending[index] * (1 - frac) + self.pending[index + 1] * frac
+
+        next_position = positions[-1] + self.ratio
+        consumed = int(next_position)
+        self.pending = self.pending[consumed:]
+        self.phase = next_position - consumed
+        return out
+
+    def close(self):
+        self.file.close()
+
+
+# =========================
+# PLAYBACK ENGINE
+# =========================
+
+class PlaybackEngine:
+    """
+    Gapless player for a PlaybackQueue on one long-lived audio output.
+
+    A decoder thread fills a preallocated PcmRingBuffer holding
+    `buffer_seconds` of audio. A sounddevice callback stream drains it.
+    The decoder moves on to the next track (already opened by preload())
+    as soon as the current one runs out, so the next track's first frames
+    are in the ring before the current track's last frames play. Only the
+    current and next track are open at any time.
+
+    `blocksize` and `latency` go to the output stream; smaller values lower
+    latency, larger ones survive slow CPUs. Underruns are counted in stats().
+    `gain_for(path)` returns a dB gain (or None) applied while decoding,
+    e.g. TrackCatalog.gain for loudness normalization.
+    """
+
+    def __init__(self, queue, samplerate=44100, channels=2, blocksize=2048, latency="high",
+                 buffer_seconds=2.0, output_factory=None, on_track_start=None, gain_for=None):
+        self.queue = queue
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.latency = latency
+        self.output_factory = output_factory or open_output_stream
+        self.on_track_start = on_track_start
+        self.gain_for = gain_for
+
+        self.ring = PcmRingBuffer(int(buffer_seconds * samplerate), channels)
+        self.output = RingBufferOutput(self.ring)
+        self.prefill = min(blocksize * 4, self.ring.capacity)
+
+        self.current = None
+        self.upcoming = None
+        self.stream = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.skip_event = threading.Event()
+        self.counters = {"tracks_played": 0, "tracks_skipped": 0, "decode_errors": 0, "frames": 0}
+
+    # -------------------------
+    # CONTROLS
+    # -------------------------
+
+    def play(self):
+        """
+        Open the output stream here, on the caller's thread, so a missing
+        device raises to the caller instead of killing the decoder thread
+        """
+        self.stream = self.output_factory(self.samplerate, self.channels, self.blocksize,
+                                          self.latency, self.output)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def pause(self):
+        self.output.paused = True
+
+    def resume(self):
+        self.output.paused = False
+
+    def skip(self):
+        self.skip_event.set()
+        # Drop what is buffered for the old track so the skip is heard at once
+        self.ring.clear()
+
+    def stop(self):
+        self.stop_event.set()
+        self.ring.close()
+        if self.thread:
+            self.thread.join()
+
+    def wait(self, timeout=None):
+        """Block until the queue has finished playing"""
+        if self.thread:
+            self.thread.join(timeout)
+
+    @property
+    def now_playing(self):
+        return self.current.path if self.current else None
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats.update(self.ring.stats())
+        return stats
+
+    # -------------------------
+    # DECODER MANAGEMENT
+    # -------------------------
+
+    def open_decoder(self, path):
+        try:
+            gain_db = self.gain_for(path) if self.gain_for else None
+            return TrackDecoder(path, self.samplerate, self.channels, gain_db=gain_db or 0.0)
+        except Exception as e:
+            print(f"⚠️  Cannot decode {path}: {e}")
+            self.counters["decode_errors"] += 1
+            return None
+
+    def next_decoder(self):
+        """Advance the queue to the next decodable track, reusing the preloaded one"""
+        while True:
+            path = self.queue.advance()
+            if path is None:
+                return None
+
+            decoder = None
+            if self.upcoming is not None and self.upcoming.path == path:
+                decoder = self.upcoming
+            elif self.upcoming is not None:
+                self.upcoming.close()
+            self.upcoming = None
+
+            decoder = decoder or self.open_decoder(path)
+            if decoder is not None:
+                return decoder
+
+    def preload(self):
+        """Open the next queued track so it can be decoded the moment this one ends"""
+        upcoming = self.queue.peek()
+        if self.upcoming is None and upcoming:
+            self.upcoming = self.open_decoder(upcoming[0])
+
+    def start_track(self, decoder):
+        self.current = decoder
+        if decoder is None:
+            return
+        self.counters["tracks_played"] += 1
+        if self.on_track_start:
+            self.on_track_start(decoder.path)
+
+    # -------------------------
+    # DECODER LOOP
+    # -------------------------
+
+    def run(self):
+        stream = self.stream
+        started = False
+
+        try:
+            self.start_track(self.next_decoder())
+
+            while self.current is not None and not self.stop_event.is_set():
+                self.preload()
+
+                if self.skip_event.is_set():
+                    self.skip_event.clear()
+                    self.counters["tracks_skipped"] += 1
+                    self.current.close()
+                    self.start_track(self.next_decoder())
+                    continue
+
+                block = self.current.read(self.blocksize)
+                if len(block) == 0:
+                    self.current.close()
+                    self.start_track(self.next_decoder())
+                    continue
+
+                self.counters["frames"] += self.ring.write(block)
+
+                if not started and self.ring.available >= self.prefill:
+                    stream.start()
+                    started = True
+
+            # Let the callback play out what is still buffered
+            self.output.finished = True
+            if not self.stop_event.is_set():
+                if not started:
+                    stream.start()
+                    started = True
+                self.ring.wait_empty()
+        finally:
+            self.output.finished = True
+            for decoder in (self.current, self.upcoming):
+                if decoder is not None:
+                    decoder.close()
+            self.current = self.upcoming = None
+            if started:
+                stream.stop()
+            stream.close()
@@ -0,0 +1,81 @@
+import random
+import threading
+from collections import deque
+
+
+# =========================
+# PLAYBACK QUEUE
+# =========================
+
+class PlaybackQueue:
+    """
+    Ordered list of tracks to play, with skip, shuffle and a bounded lookahead.
+
+    Only paths are held here; the playback engine opens at most the current
+    track and the next `lookahead` tracks, whatever the queue length.
+    """
+
+    def __init__(self, tracks=(), lookahead=1):
+        self.upcoming = deque(str(t) for t in tracks)
+        self.current = None
+        self.lookahead = lookahead
+        self.lock = threading.Lock()
+
+    # -------------------------
+    # EDITING
+    # -------------------------
+
+    def enqueue(self, tracks):
+        with self.lock:
+            self.upcoming.extend(str(t) for t in tracks)
+
+    def enqueue_next(self, track):
+        """Put a track directly after the current one"""
+        with self.lock:
+            self.upcoming.appendleft(str(track))
+
+    def shuffle(self, seed=None):
+        """Shuffle the tracks that have not started yet"""
+        with self.lock:
+            items = list(self.upcoming)
+            random.Random(seed).shuffle(items)
+            self.upcoming = deque(items)
+
+    def replace(self, tracks):
+        """Swap the upcoming tracks for a new ranking in one step (the current track keeps playing)"""
+        with self.lock:
+            self.upcoming = deque(str(t) for t in tracks)
+
+    def clear(self):
+        with self.lock:
+            self.upcoming.clear()
+
+    # -------------------------
+    # PLAYBACK ORDER
+    # -------------------------
+
+    def advance(self):
+        """
+        Move to the next track
+        Returns: the new current track, or None when the queue is exhausted
+        """
+        with self.lock:
+            self.current = self.upcoming.popleft() if self.upcoming else None
+            return self.current
+
+    def skip(self, count=1):
+        """Drop the next `count - 1` upcoming tracks and advance past the current one"""
+        with self.lock:
+            for _ in range(min(count - 1, len(self.upcoming))):
+                self.upcoming.popleft()
+            self.current = self.upcoming.popleft() if self.upcoming else None
+            return self.current
+
+    def peek(self):
+        """The next `lookahead` tracks, without consuming them"""
+        with self.lock:
+            return [self.upcoming[i] for i in range(min(self.lookahead, len(self.upcoming)))]
+
+    def __len__(self):
+        with self.lock:
+            return len(self.upcoming)
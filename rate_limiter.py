@@ -0,0 +1,176 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+PRIORITY_CUE = 0
+PRIORITY_BACKGROUND = 10
+
+# Methods that are safe to resend after a 5xx (RFC 9110 idempotent methods)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+
+# =========================
+# REQUEST SCHEDULER
+# =========================
+
+class RequestScheduler:
+    """
+    Client-side pacing for Spotify Web API calls.
+
+    A token bucket (`rate` requests/second, bursts up to `burst`) is shared by
+    every request of one app. Waiters are served lowest priority value first,
+    so cue requests overtake background refreshes. A 429 pauses the whole
+    bucket for its Retry-After; 5xx responses are retried with jittered
+    exponential backoff unless the caller marks the request non-idempotent.
+    """
+
+    def __init__(self, rate=5.0, burst=10, max_retries=4, backoff_base=0.5,
+                 backoff_max=30.0, max_retry_after=60.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.metrics = {
+            "requests": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "retries": 0,
+            "queue_delay_total": 0.0,
+            "queue_delay_max": 0.0,
+        }
+
+    # -------------------------
+    # TOKEN BUCKET
+    # -------------------------
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority=PRIORITY_CUE):
+        """
+        Block until this caller is first in line and a token is available
+        Returns: seconds spent queueing
+        """
+        enqueued = time.monotonic()
+        ticket = (priority, next(self.sequence))
+
+        with self.condition:
+            heapq.heappush(self.waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    if self.waiters[0] == ticket:
+                        if now < self.blocked_until:
+                            wait = self.blocked_until - now
+                        elif self.tokens >= 1:
+                            self.tokens -= 1
+                            break
+                        else:
+                            wait = (1 - self.tokens) / self.rate
+                        self.condition.wait(wait)
+                    else:
+                        self.condition.wait()
+            finally:
+                self.waiters.remove(ticket)
+                heapq.heapify(self.waiters)
+                self.condition.notify_all()
+
+            delay = time.monotonic() - enqueued
+            self.metrics["requests"] += 1
+            self.metrics["queue_delay_total"] += delay
+            self.metrics["queue_delay_max"] = max(self.metrics["queue_delay_max"], delay)
+
+        return delay
+
+    def pause(self, seconds):
+        """Hold every queued request for `seconds` (used for Retry-After)"""
+        with self.condition:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.condition.notify_all()
+
+    # -------------------------
+    # EXECUTE WITH RETRIES
+    # -------------------------
+
+    def execute(self, send, priority=PRIORITY_CUE, retry_server_errors=True):
+        """
+        Pace `send()` through the bucket and retry 429/5xx responses
+        retry_server_errors=False returns 5xx at once: the server may already
+        have acted on a non-idempotent request (e.g. consumed an auth code)
+        Returns: the final response (which may still be an error after max_retries)
+        """
+        attempt = 0
+
+        while True:
+            self.acquire(priority)
+            response = send()
+            status = response.status_code
+
+            if attempt >= self.max_retries or (status != 429 and status < 500):
+                return response
+            if status != 429 and not retry_server_errors:
+                return response
+
+            attempt += 1
+            with self.condition:
+                self.metrics["retries"] += 1
+
+            if status == 429:
+                with self.condition:
+                    self.metrics["rate_limited"] += 1
+                retry_after = self.parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is None:
+                    retry_after = self.backoff(attempt)
+                self.pause(min(retry_after, self.max_retry_after))
+            else:
+                with self.condition:
+                    self.metrics["server_errors"] += 1
+                time.sleep(self.backoff(attempt))
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def parse_retry_after(value):
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    # -------------------------
+    # METRICS
+    # -------------------------
+
+    def stats(self):
+        with self.condition:
+            stats = dict(self.metrics)
+            stats["queued"] = len(self.waiters)
+
+        stats["queue_delay_avg"] = (
+            stats["queue_delay_total"] / stats["requests"] if stats["requests"] else 0.0
+        )
+        return stats
@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+# =========================
+# SEARCH CACHE
+# =========================
+
+class SearchCache:
+    """
+    TTL + LRU memo for Spotify search results.
+
+    Fresh entries (younger than `ttl`) are served directly. Entries inside the
+    `stale_ttl` grace window are still served, but trigger one background
+    re-fetch so the next cue sees fresh results. Anything older is a miss.
+    """
+
+    def __init__(self, max_entries=128, ttl=6 * 3600, stale_ttl=7 * 86400, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.path = Path(path) if path else None
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.refreshing = set()
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "evictions": 0}
+
+        if self.path:
+            self.load()
+
+    @staticmethod
+    def make_key(query, search_type="playlist", limit=5):
+        """Normalize case and whitespace so equivalent queries share an entry"""
+        return (" ".join(query.lower().split()), search_type, int(limit))
+
+    # -------------------------
+    # LOOKUP
+    # -------------------------
+
+    def get_or_fetch(self, key, fetch, revalidate=None):
+        """
+        Return the cached value for `key`, calling `fetch()` on a miss
+        Stale entries are returned immediately and refreshed in the background
+        with `revalidate()` (defaults to `fetch`)
+        """
+        now = time.time()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                age = now - stored_at
+
+                if age < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return value
+
+                if age < self.ttl + self.stale_ttl:
+                    self.entries.move_to_end(key)
+                    self.counters["stale_hits"] += 1
+                    if key not in self.refreshing:
+                        self.refreshing.add(key)
+                        threading.Thread(
+                            target=self._revalidate, args=(key, revalidate or fetch), daemon=True
+                        ).start()
+                    return value
+
+            self.counters["misses"] += 1
+
+        value = fetch()
+        self.put(key, value)
+        return value
+
+    def _revalidate(self, key, fetch):
+        try:
+            value = fetch()
+        except Exception as e:
+            # Keep serving the stale entry; the next stale hit retries
+            print(f"⚠️  Background search refresh failed: {e}")
+            return
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+        with self.lock:
+            self.counters["refreshes"] += 1
+        self.put(key, value)
+
+    def put(self, key, value, stored_at=None):
+        with self.lock:
+            self.entries[key] = (stored_at or time.time(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+        if self.path:
+            self.save()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    # -------------------------
+    # STATS
+    # -------------------------
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self.entries)
+
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    # -------------------------
+    # ON-DISK SNAPSHOT
+    # -------------------------
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        now = time.time()
+        with self.lock:
+            for query, search_type, limit, stored_at, value in rows:
+                if now - stored_at < self.ttl + self.stale_ttl:
+                    self.entries[(query, search_type, limit)] = (stored_at, value)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def save(self):
+        with self.lock:
+            rows = [[*key, stored_at, value] for key, (stored_at, value) in self.entries.items()]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".search-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(rows, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
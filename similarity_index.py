@@ -0,0 +1,238 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_SIMILARITY_PATH = Path.home() / ".musicqueue" / "similarity.npz"
+
+# Feature dimensions and the spread treated as "one step" in each, so that
+# distances mix bpm, LU and Hz sensibly. Fixed scales (not fitted z-scores)
+# keep stored vectors valid as tracks are inserted one at a time.
+DIMENSIONS = ("tempo", "loudness", "brightness", "energy")
+SCALES = np.array([20.0, 4.0, 1.0, 4.0], dtype=np.float32)
+DEFAULT_TEMPO = 100.0
+
+
+def feature_vector(features):
+    """
+    Map an audio_features row (tempo, loudness, centroid, rms) to index space
+    Returns: float32 vector of len(DIMENSIONS)
+    """
+    tempo = features["tempo"] or DEFAULT_TEMPO
+    loudness = features["loudness"] if features["loudness"] is not None else -70.0
+    centroid = max(features["centroid"] or 1.0, 1.0)
+    rms_db = 20 * np.log10(max(features["rms"] or 1e-6, 1e-6))
+    raw = np.array([tempo, loudness, np.log2(centroid), rms_db], dtype=np.float32)
+    return raw / SCALES
+
+
+def stress_target(stress):
+    """Target point for a stress level (0-1): slower, quieter and darker as stress rises"""
+    stress = min(max(float(stress), 0.0), 1.0)
+    return {
+        "tempo": 100.0 - 40.0 * stress,
+        "loudness": -14.0 - 12.0 * stress,
+        "brightness": np.log2(3000.0 - 2000.0 * stress),
+    }
+
+
+# =========================
+# SIMILARITY INDEX
+# =========================
+
+class SimilarityIndex:
+    """
+    k-nearest-neighbour index over per-track feature vectors.
+
+    Vectors live in one preallocated float32 matrix (grown by doubling) with
+    a path -> row map; removal swaps the last row into the hole, so inserts
+    and deletes are O(1). Queries are one vectorized weighted distance pass
+    plus argpartition - a few ms at 100k tracks, no tree to rebuild.
+    """
+
+    def __init__(self, path=None, capacity=1024):
+        self.path = Path(path) if path else DEFAULT_SIMILARITY_PATH
+        self.lock = threading.Lock()
+        self.vectors = np.zeros((capacity, len(DIMENSIONS)), dtype=np.float32)
+        self.mtimes = np.zeros(capacity, dtype=np.int64)
+        self.paths = []
+        self.rows = {}
+
+    # -------------------------
+    # INSERT / REMOVE
+    # -------------------------
+
+    def _grow(self, needed):
+        capacity = len(self.vectors)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.zeros((capacity, len(DIMENSIONS)), dtype=np.float32)
+        mtimes = np.zeros(capacity, dtype=np.int64)
+        vectors[:len(self.paths)] = self.vectors[:len(self.paths)]
+        mtimes[:len(self.paths)] = self.mtimes[:len(self.paths)]
+        self.vectors, self.mtimes = vectors, mtimes
+
+    def add(self, path, vector, mtime_ns=0):
+        """Insert or replace one track's vector"""
+        with self.lock:
+            row = self.rows.get(path)
+            if row is None:
+                row = len(self.paths)
+                self._grow(row + 1)
+                self.paths.append(path)
+                self.rows[path] = row
+            self.vectors[row] = vector
+            self.mtimes[row] = mtime_ns
+
+    def remove(self, path):
+        with self.lock:
+            row = self.rows.pop(path, None)
+            if row is None:
+                return False
+            last = len(self.paths) - 1
+            if row != last:
+                moved = self.paths[last]
+                self.vectors[row] = self.vectors[last]
+                self.mtimes[row] = self.mtimes[last]
+                self.paths[row] = moved
+                self.rows[moved] = row
+            self.paths.pop()
+            return True
+
+    def sync(self, catalog):
+        """
+        Bring the index in line with the catalog's analyzed tracks
+        Returns: dict with added, updated, removed counts
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        seen = set()
+
+        for row in catalog.analyzed_tracks():
+            path = row["path"]
+            seen.add(path)
+            known = self.rows.get(path)
+            if known is not None and self.mtimes[known] == row["mtime_ns"]:
+                continue
+            stats["updated" if known is not None else "added"] += 1
+            self.add(path, feature_vector(row), row["mtime_ns"])
+
+        for path in [p for p in self.paths if p not in seen]:
+            self.remove(path)
+            stats["removed"] += 1
+        return stats
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        return path in self.rows
+
+    # -------------------------
+    # QUERIES
+    # -------------------------
+
+    def vector(self, path):
+        with self.lock:
+            return self.vectors[self.rows[path]].copy()
+
+    def target(self, tempo=None, loudness=None, brightness=None, energy=None):
+        """
+        Build a query point from raw units (bpm, LUFS, log2 Hz, dBFS)
+        Returns: (vector, weights) - unset dimensions get weight 0
+        """
+        values = (tempo, loudness, brightness, energy)
+        vector = np.array([v or 0.0 for v in values], dtype=np.float32) / SCALES
+        weights = np.array([v is not None for v in values], dtype=np.float32)
+        return vector, weights
+
+    def nearest(self, vector, k=10, weights=None, exclude=()):
+        """
+        The k tracks closest to `vector` (weighted squared distance)
+        Returns: list of (path, distance), closest first
+        """
+        with self.lock:
+            count = len(self.paths)
+            if count == 0:
+                return []
+            diff = self.vectors[:count] - vector
+            diff *= diff
+            distance = diff @ (weights if weights is not None else np.ones(len(DIMENSIONS), np.float32))
+
+            excluded = [self.rows[p] for p in exclude if p in self.rows]
+            if excluded:
+                distance[excluded] = np.inf
+
+            k = min(k, count - len(excluded))
+            if k <= 0:
+                return []
+            best = np.argpartition(distance, k - 1)[:k]
+            best = best[np.argsort(distance[best])]
+            return [(self.paths[i], float(distance[i])) for i in best]
+
+    def like(self, path, k=10, energy_shift=0.0, tempo_shift=0.0, exclude=()):
+        """
+        Tracks similar to `path`, optionally moved in energy (LU) or tempo (bpm)
+        e.g. energy_shift=-6 -> "like this one but quieter"
+        """
+        vector = self.vector(path)
+        vector[0] += tempo_shift / SCALES[0]
+        vector[1] += energy_shift / SCALES[1]
+        vector[3] += energy_shift / SCALES[3]
+        return self.nearest(vector, k, exclude=(path, *exclude))
+
+    def for_stress(self, stress, k=10, exclude=()):
+        vector, weights = self.target(**stress_target(stress))
+        return self.nearest(vector, k, weights=weights, exclude=exclude)
+
+    # -------------------------
+    # LOAD / SAVE
+    # -------------------------
+
+    def save(self):
+        with self.lock:
+            count = len(self.paths)
+            arrays = {
+                "vectors": self.vectors[:count].copy(),
+                "mtimes": self.mtimes[:count].copy(),
+                "paths": np.array(self.paths, dtype=str),
+            }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".similarity-", suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def load(self):
+        """
+        Replace the contents with the saved index, if any
+        Returns: True if loaded
+        """
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                vectors, mtimes, paths = data["vectors"], data["mtimes"], data["paths"].tolist()
+        except (OSError, KeyError, ValueError):
+            return False
+        if vectors.shape[1:] != (len(DIMENSIONS),):
+            return False  # saved with other dimensions; rebuild from the catalog
+
+        with self.lock:
+            self.vectors = np.zeros((max(len(paths) * 2, 1024), len(DIMENSIONS)), dtype=np.float32)
+            self.mtimes = np.zeros(len(self.vectors), dtype=np.int64)
+            self.vectors[:len(paths)] = vectors
+            self.mtimes[:len(paths)] = mtimes
+            self.paths = paths
+            self.rows = {p: i for i, p in enumerate(paths)}
+        return True
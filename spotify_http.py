@@ -0,0 +1,114 @@
+import threading
+import weakref
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import IDEMPOTENT_METHODS, PRIORITY_CUE, RequestScheduler
+
+
+# =========================
+# SPOTIFY HTTP SESSION
+# =========================
+
+class SpotifySession:
+    """
+    Pooled keep-alive transport shared by every SpotifyPlayer call.
+
+    One requests.Session is kept per player so TLS connections to
+    accounts.spotify.com and api.spotify.com stay warm between cues.
+    Every request is paced by `scheduler`; share one scheduler between
+    sessions that use the same Spotify app so they share its rate limit.
+    """
+
+    def __init__(self, token_getter=None, pool_size=10, timeout=10.0, scheduler=None):
+        self.token_getter = token_getter
+        self.timeout = timeout
+        self.scheduler = scheduler or RequestScheduler()
+
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+
+        # Cumulative connection counters, so they survive the pool manager
+        # evicting a host's pool (it keeps at most pool_connections of them)
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "connections_opened": 0}
+        self.counted = weakref.WeakKeyDictionary()  # pool -> (requests, connections) already counted
+        self.session.hooks["response"].append(self._count_connections)
+
+    # -------------------------
+    # REQUESTS
+    # -------------------------
+
+    def request(self, method, url, auth=True, headers=None, timeout=None,
+                priority=PRIORITY_CUE, **kwargs):
+        """
+        Send a request over the pooled session, paced by the scheduler
+        auth=True injects the player's current bearer token
+        """
+        def send():
+            request_headers = dict(headers or {})
+
+            # Read the token per attempt so a retry picks up a refreshed one
+            if auth and self.token_getter and "Authorization" not in request_headers:
+                token = self.token_getter()
+                if token:
+                    request_headers["Authorization"] = f"Bearer {token}"
+
+            return self.session.request(
+                method,
+                url,
+                headers=request_headers,
+                timeout=timeout if timeout is not None else self.timeout,
+                **kwargs,
+            )
+
+        # 429s are always safe to retry (nothing was processed); 5xx only
+        # for idempotent methods, so a POST like the auth-code exchange is sent once
+        return self.scheduler.execute(
+            send, priority=priority, retry_server_errors=method.upper() in IDEMPOTENT_METHODS,
+        )
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    # -------------------------
+    # CONNECTION STATS
+    # -------------------------
+
+    def _count_connections(self, response, **kwargs):
+        """Response hook: add what the response's pool did since it was last seen"""
+        url = urlparse(response.url)
+        pools = self.adapter.poolmanager.pools
+        with self.lock:
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None or (key.key_scheme, key.key_host) != (url.scheme, url.hostname):
+                    continue
+                requests_seen, opened_seen = self.counted.get(pool, (0, 0))
+                self.counters["requests"] += pool.num_requests - requests_seen
+                self.counters["connections_opened"] += pool.num_connections - opened_seen
+                self.counted[pool] = (pool.num_requests, pool.num_connections)
+
+    def connection_stats(self):
+        """
+        Report how many requests went out and how many reused a warm connection
+        Returns: dict with requests, connections_opened and connections_reused
+        """
+        with self.lock:
+            stats = dict(self.counters)
+        stats["connections_reused"] = max(stats["requests"] - stats["connections_opened"], 0)
+        return stats
+
+    def close(self):
+        self.session.close()
@@ -2,14 +2,30 @@ import os
 import subprocess
 from pathlib import Path
 
+from audio_features import analyze_catalog
+from library_index import LibraryIndex
+from library_watcher import LibraryWatcher
+from loudness import update_gains
+from playback_engine import PlaybackEngine, playback_available
+from playback_queue import PlaybackQueue
+from similarity_index import SimilarityIndex
+from track_catalog import DEFAULT_CATALOG_PATH, TrackCatalog
+
 
 # =========================
 # LOCAL MUSIC PLAYER
 # =========================
 
 class LocalMusicPlayer:
-    def __init__(self, music_directory=None):
+    def __init__(self, music_directory=None, index_path=None, catalog_path=None, similarity_path=None):
         self.music_directory = music_directory or self.find_music_directory()
+        self.index = LibraryIndex(self.music_directory, path=index_path)
+        self.catalog_path = catalog_path
+        self.catalog = None
+        self.similarity = SimilarityIndex(similarity_path)
+        self.similarity.load()
+        self.watcher = None
+        self.engine = None
 
     # -------------------------
     # FIND MUSIC DIRECTORY
@@ -36,31 +52,162 @@ class LocalMusicPlayer:
             print(f"❌ Directory not found: {search_dir}")
             return []
         
-        # All supported audio formats
-        audio_extensions = ['.mp3', '.wav', '.flac', '.m4a', '.aac', '.wma', '.ogg', '.opus', '.mp4', '.m4b']
-        
-        music_files = []
         print(f"\n🔍 Scanning: {search_dir}")
         
-        for ext in audio_extensions:
-            found_files = list(search_dir.glob(f'**/*{ext}'))
-            music_files.extend(found_files)
+        # One scandir pass over all supported formats; unchanged directories
+        # are served from the persistent index
+        stats = self.index.scan()
+        if stats["dirs_listed"] or self.index.last_changes["removed"]:
+            self.index.save()  # an unchanged library leaves the saved index as is
+        print(f"   {stats['dirs_listed']} directories listed, {stats['dirs_reused']} unchanged")
         
-        return sorted(music_files)
+        return self.index.tracks()
+
+    # -------------------------
+    # BUILD CATALOG
+    # -------------------------
+
+    def build_catalog(self, workers=None):
+        """Scan the library and read metadata for new or changed files into the catalog"""
+        if self.catalog is None:
+            self.catalog = TrackCatalog(self.catalog_path)
+
+        self.scan_all_audio_files()
+        stats = self.catalog.build(self.index.entries(), workers=workers)
+        print(f"✓ Catalog: {stats['added']} added, {stats['updated']} updated, "
+              f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+        return stats
+
+    def analyze_features(self, workers=None, limit=None):
+        """
+        Compute tempo/energy/loudness for tracks not analyzed since they last
+        changed (build the catalog first)
+        """
+        if self.catalog is None:
+            self.catalog = TrackCatalog(self.catalog_path)
+
+        stats = analyze_catalog(self.catalog, workers=workers, limit=limit)
+        print(f"✓ Features: {stats['analyzed']} analyzed, {stats['failed']} failed, "
+              f"{stats['unchanged']} unchanged ({stats['seconds']:.1f}s)")
+        return stats
+
+    def analyze_loudness(self, workers=None):
+        """
+        Compute ReplayGain-style track/album gains, decoding only new or
+        changed files (build the catalog first)
+        """
+        if self.catalog is None:
+            self.catalog = TrackCatalog(self.catalog_path)
+
+        stats = update_gains(self.catalog, workers=workers)
+        print(f"✓ Loudness: {stats['tracks']} tracks in {stats['albums']} albums "
+              f"({stats['analyzed']} analyzed, {stats['unchanged']} unchanged)")
+        return stats
+
+    def saved_catalog(self):
+        """
+        Open the catalog if an earlier run built one, without creating it
+        Returns: the TrackCatalog, or None if no catalog database exists yet
+        """
+        if self.catalog is None and Path(self.catalog_path or DEFAULT_CATALOG_PATH).exists():
+            self.catalog = TrackCatalog(self.catalog_path)
+        return self.catalog
+
+    def playback_gain(self, path, mode="album"):
+        """dB gain for the playback engine; None (unity) before analysis"""
+        catalog = self.saved_catalog()
+        if catalog is None:
+            return None
+        return catalog.gain(path, mode)
+
+    def build_similarity(self):
+        """Index analyzed tracks for nearest-neighbour selection (incremental)"""
+        if self.catalog is None:
+            self.catalog = TrackCatalog(self.catalog_path)
+
+        stats = self.similarity.sync(self.catalog)
+        self.similarity.save()
+        print(f"✓ Similarity index: {len(self.similarity)} tracks "
+              f"({stats['added']} added, {stats['updated']} updated, {stats['removed']} removed)")
+        return stats
+
+    # -------------------------
+    # SELECTION STRATEGIES
+    # -------------------------
+
+    def select_tracks(self, strategy="path", limit=50, stress=0.5, seed=None, energy_shift=-6.0):
+        """
+        Pick what to play:
+          "path"   - every scanned file, sorted by path
+          "stress" - nearest tracks to the calming target for `stress` (0-1)
+          "like"   - tracks like `seed`, shifted by `energy_shift` LU
+        Returns: list of Paths
+        """
+        if strategy == "path":
+            return self.scan_all_audio_files()
+        if strategy == "stress":
+            ranked = self.similarity.for_stress(stress, k=limit)
+        elif strategy == "like":
+            ranked = self.similarity.like(str(seed), k=limit, energy_shift=energy_shift)
+        else:
+            raise ValueError(f"Unknown selection strategy '{strategy}'")
+        return [Path(path) for path, _ in ranked]
+
+    def rerank_for_stress(self, stress, limit=50):
+        """
+        Re-rank what plays next for a new stress reading, without
+        interrupting the current track
+        Returns: the new upcoming list
+        """
+        playing = self.engine.now_playing if self.engine else None
+        ranked = self.similarity.for_stress(stress, k=limit, exclude=[playing] if playing else ())
+        upcoming = [Path(path) for path, _ in ranked]
+        if self.engine:
+            self.engine.queue.replace(upcoming)
+        return upcoming
+
+    def find_tracks(self, **filters):
+        """Query the catalog (see TrackCatalog.query) without touching audio files"""
+        if self.catalog is None:
+            self.catalog = TrackCatalog(self.catalog_path)
+        return [Path(row["path"]) for row in self.catalog.query(**filters)]
+
+    # -------------------------
+    # WATCH LIBRARY
+    # -------------------------
+
+    def watch(self, on_change=None, **watcher_options):
+        """
+        Keep the index (and the catalog, if built) current from filesystem
+        events instead of periodic full rescans
+        Returns: the running LibraryWatcher
+        """
+        if not self.index.dirs:
+            self.scan_all_audio_files()
+
+        def handle(changes):
+            if self.catalog is not None:
+                self.catalog.update(changes["added"], changes["removed"], workers=1)
+            if on_change:
+                on_change(changes)
+
+        self.watcher = LibraryWatcher(self.index, on_change=handle, **watcher_options).start()
+        print(f"👀 Watching {self.music_directory} ({self.watcher.mode})")
+        return self.watcher
 
     # -------------------------
     # PLAY ALL FILES
     # -------------------------
 
-    def play_all(self):
-        """Find and play all audio files"""
+    def play_all(self, strategy="path", **selection):
+        """Find and play audio files chosen by a selection strategy (see select_tracks)"""
         print("=" * 60)
         print("🎵 Local Music Player")
         print("=" * 60)
         print(f"\n📁 Music directory: {self.music_directory}")
         
-        # Scan for all audio files
-        music_files = self.scan_all_audio_files()
+        # Scan for all audio files, or rank analyzed ones by similarity
+        music_files = self.select_tracks(strategy, **selection)
         
         if not music_files:
             print("\n⚠️  No audio files found!")
@@ -79,17 +226,34 @@ class LocalMusicPlayer:
         if len(music_files) > 10:
             print(f"   ... and {len(music_files) - 10} more")
         
-        # Play all files
+        # Play all files through one queue instead of one process per file
         print(f"\n🎵 Playing all {len(music_files)} files...")
         
         try:
+            if playback_available():
+                # Gains and play history live in the catalog a previous run
+                # built; open it here rather than from the decoder thread
+                self.saved_catalog()
+                try:
+                    self.engine = PlaybackEngine(
+                        PlaybackQueue(music_files),
+                        on_track_start=self.track_started,
+                        gain_for=self.playback_gain,
+                    ).play()
+                except Exception as e:
+                    print(f"⚠️  Audio output unavailable ({e}), using the default media player")
+                else:
+                    print("✓ Playback started!")
+                    self.engine.wait()
+                    return True
+
+            # No in-process audio stack: hand the whole queue to the default
+            # media player as a single playlist (one process, not one per file)
+            playlist = self.write_playlist(music_files)
             if os.name == 'nt':  # Windows
-                # On Windows, add all files to default media player queue
-                for file_path in music_files:
-                    os.startfile(str(file_path))
+                os.startfile(str(playlist))
             else:  # macOS/Linux
-                for file_path in music_files:
-                    subprocess.Popen(['xdg-open', str(file_path)])
+                subprocess.Popen(['xdg-open', str(playlist)])
             
             print("✓ Music started playing in your default media player!")
             print("\n💡 Tip: Use your media player controls to:")
@@ -101,6 +265,26 @@ class LocalMusicPlayer:
         except Exception as e:
             print(f"\n❌ Error playing files: {e}")
             return False
+        finally:
+            if self.engine:
+                self.engine.stop()
+
+    def track_started(self, path):
+        """Engine callback: announce the track and record the play in the catalog"""
+        print(f"▶️  {Path(path).name}")
+        catalog = self.saved_catalog()
+        if catalog is not None:
+            catalog.mark_played(path)
+
+    def write_playlist(self, music_files):
+        """Write the queue as an M3U playlist next to the library index"""
+        playlist = Path(self.index.path).with_name("queue.m3u")
+        playlist.parent.mkdir(parents=True, exist_ok=True)
+        with open(playlist, "w", encoding="utf-8") as f:
+            f.write("#EXTM3U\n")
+            for file_path in music_files:
+                f.write(f"{file_path}\n")
+        return playlist
 
 
 # =========================
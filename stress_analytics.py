@@ -0,0 +1,330 @@
+"""
+Server-side stress statistics (what the dashboard's calculateStats shows),
+kept up to date from StressIngestor batches.
+
+    python stress_analytics.py stress_reading.txt --granularity day
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from stress_ingest import StressIngestor
+
+
+# Zone upper bounds: calm < 0.25 <= mild < 0.5 <= moderate < 0.75 <= high
+ZONES = ("calm", "mild", "moderate", "high")
+ZONE_EDGES = np.array([0.25, 0.5, 0.75], dtype=np.float32)
+SPIKE_THRESHOLD = 0.7
+ROLLING_WINDOW = 10
+ROLLING_HISTORY = 120
+
+GRANULARITIES = {"minute": "m", "hour": "h", "day": "D"}
+
+
+# =========================
+# TIME BUCKETS
+# =========================
+
+class BucketStats:
+    """
+    Running count / sum / sum of squares per calendar bucket (minute, hour
+    or day), kept as sorted NumPy arrays that grow by doubling. A batch is
+    grouped with np.unique + bincount; in-order batches append at the end
+    (O(batch)) and only out-of-order ones pay for a full merge.
+    """
+
+    def __init__(self, unit, capacity=256):
+        self.unit = unit
+        self.size = 0
+        self._keys = np.zeros(capacity, dtype=np.int64)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._sum = np.zeros(capacity, dtype=np.float64)
+        self._sumsq = np.zeros(capacity, dtype=np.float64)
+
+    @property
+    def keys(self):
+        return self._keys[:self.size]
+
+    def _resize(self, needed):
+        capacity = len(self._keys)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_keys", "_count", "_sum", "_sumsq"):
+            old = getattr(self, name)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:self.size] = old[:self.size]
+            setattr(self, name, grown)
+
+    def add(self, times, values):
+        if len(times) == 0:
+            return
+        keys = times.astype(f"datetime64[{self.unit}]").astype(np.int64)
+        values = values.astype(np.float64)
+        batch_keys, inverse = np.unique(keys, return_inverse=True)
+        count = np.bincount(inverse, minlength=len(batch_keys))
+        total = np.bincount(inverse, weights=values, minlength=len(batch_keys))
+        sumsq = np.bincount(inverse, weights=values * values, minlength=len(batch_keys))
+
+        if self.size == 0 or batch_keys[0] >= self._keys[self.size - 1]:
+            # Usual case: readings arrive in time order, so at most the last
+            # bucket is shared and the rest are appended
+            first = self.size - 1 if self.size and batch_keys[0] == self._keys[self.size - 1] else self.size
+            self._resize(first + len(batch_keys))
+            end = first + len(batch_keys)
+            self._keys[first:end] = batch_keys
+            self._count[self.size:end] = 0
+            self._sum[self.size:end] = 0.0
+            self._sumsq[self.size:end] = 0.0
+            self.size = end
+            at = slice(first, end)
+        else:
+            merged = np.union1d(self.keys, batch_keys)
+            old = np.searchsorted(merged, self.keys)
+            arrays = []
+            for source in (self._count, self._sum, self._sumsq):
+                target = np.zeros(max(len(merged), len(self._keys)), dtype=source.dtype)
+                target[old] = source[:self.size]
+                arrays.append(target)
+            self._keys = np.zeros(len(arrays[0]), dtype=np.int64)
+            self._keys[:len(merged)] = merged
+            self._count, self._sum, self._sumsq = arrays
+            self.size = len(merged)
+            at = np.searchsorted(self.keys, batch_keys)
+
+        self._count[at] += count
+        self._sum[at] += total
+        self._sumsq[at] += sumsq
+
+    def select(self, start=None, end=None):
+        """
+        Buckets in [start, end) (datetime64 or None)
+        Returns: dict with datetime64 bucket starts, count, mean and std arrays
+        """
+        keys = self.keys
+        lo = 0 if start is None else np.searchsorted(
+            keys, np.datetime64(start, self.unit).astype(np.int64))
+        hi = self.size if end is None else np.searchsorted(
+            keys, np.datetime64(end, self.unit).astype(np.int64))
+        count = self._count[lo:hi]
+        mean = self._sum[lo:hi] / np.maximum(count, 1)
+        variance = np.maximum(self._sumsq[lo:hi] / np.maximum(count, 1) - mean * mean, 0.0)
+        return {
+            "start": keys[lo:hi].astype(f"datetime64[{self.unit}]"),
+            "count": count,
+            "mean": mean,
+            "std": np.sqrt(variance),
+        }
+
+    def __len__(self):
+        return self.size
+
+
+# =========================
+# STRESS ANALYTICS
+# =========================
+
+class StressAnalytics:
+    """
+    Dashboard statistics over ingested stress readings, updated per batch.
+
+    Every statistic is a running aggregate, so update() costs O(batch):
+    zone counts (digitize + bincount), minute/hour/day buckets, hour-of-day
+    means, spike runs (>= 0.7) with a run that may continue into the next
+    batch, and a rolling standard deviation from cumulative sums over the
+    batch plus the last window-1 readings of the previous one. Only the last
+    `history` rolling values are kept, in a fixed-size ring.
+    """
+
+    def __init__(self, window=ROLLING_WINDOW, spike_threshold=SPIKE_THRESHOLD,
+                 history=ROLLING_HISTORY):
+        self.window = window
+        self.history = history
+        self.spike_threshold = spike_threshold
+
+        self.total = 0
+        self.zone_counts = np.zeros(len(ZONES), dtype=np.int64)
+        self.buckets = {name: BucketStats(unit) for name, unit in GRANULARITIES.items()}
+        self.hour_count = np.zeros(24, dtype=np.int64)
+        self.hour_sum = np.zeros(24, dtype=np.float64)
+        self.latest = None
+
+        self.spike_starts = []
+        self.spike_lengths = []
+        self.spike_seconds = []
+        self.spike_max = []
+        self.open_spike = None  # [start time, length, max] of a run still >= threshold
+
+        self.tail = np.zeros(0, dtype=np.float64)
+        self.rolling_times = np.zeros(history, dtype="datetime64[us]")
+        self.rolling_std = np.zeros(history, dtype=np.float32)
+        self.rolling_next = 0  # ring slot the next value goes to
+        self.rolling_filled = 0
+
+    # -------------------------
+    # UPDATE
+    # -------------------------
+
+    def update(self, times, values):
+        """Fold a batch of new readings (in time order) into every statistic"""
+        if len(times) == 0:
+            return self
+        times = np.asarray(times, dtype="datetime64[us]")
+        values = np.asarray(values, dtype=np.float32)
+
+        self.total += len(values)
+        self.zone_counts += np.bincount(np.digitize(values, ZONE_EDGES), minlength=len(ZONES))
+        for buckets in self.buckets.values():
+            buckets.add(times, values)
+
+        hours = times.astype("datetime64[h]").astype(np.int64) % 24
+        self.hour_count += np.bincount(hours, minlength=24)
+        self.hour_sum += np.bincount(hours, weights=values, minlength=24)
+        self.latest = (times[-1], float(values[-1]))
+
+        self._update_spikes(times, values)
+        self._update_rolling(times, values)
+        return self
+
+    def _update_spikes(self, times, values):
+        above = values >= self.spike_threshold
+        edges = np.diff(above.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)  # index of the first reading back below threshold
+
+        # A run that was open at the end of the last batch either continues
+        # into this one (starting at index 0) or ended just before it
+        if self.open_spike is not None:
+            if len(starts) and starts[0] == 0:
+                run_max = float(values[:ends[0]].max())
+                self.open_spike[1] += int(ends[0])
+                self.open_spike[2] = max(self.open_spike[2], run_max)
+                if ends[0] == len(values):
+                    return
+                self._close_spike(*self.open_spike, end_time=times[ends[0]])
+                starts, ends = starts[1:], ends[1:]
+            else:
+                self._close_spike(*self.open_spike, end_time=times[0])
+            self.open_spike = None
+
+        if len(starts) == 0:
+            return
+        maxima = np.maximum.reduceat(values, starts)
+        for start, end, peak in zip(starts, ends, maxima):
+            if end == len(values):
+                self.open_spike = [times[start], int(end - start), float(peak)]
+            else:
+                self._close_spike(times[start], int(end - start), float(peak), end_time=times[end])
+
+    def _close_spike(self, start, length, peak, end_time):
+        self.spike_starts.append(start)
+        self.spike_lengths.append(length)
+        self.spike_seconds.append(float((end_time - start) / np.timedelta64(1, "s")))
+        self.spike_max.append(peak)
+
+    def _update_rolling(self, times, values):
+        w = self.window
+        series = np.concatenate([self.tail, values.astype(np.float64)])
+        if len(series) >= w:
+            csum = np.concatenate([[0.0], np.cumsum(series)])
+            csq = np.concatenate([[0.0], np.cumsum(series * series)])
+            mean = (csum[w:] - csum[:-w]) / w
+            variance = np.maximum((csq[w:] - csq[:-w]) / w - mean * mean, 0.0)
+            std = np.sqrt(variance).astype(np.float32)
+            # Window i ends at series[i + w - 1]; map it back to this batch's times
+            ends = np.arange(w - 1, len(series)) - len(self.tail)
+            self._push_rolling(times[ends[-self.history:]], std[-self.history:])
+        self.tail = series[-(w - 1):] if w > 1 else series[:0]
+
+    def _push_rolling(self, times, std):
+        slots = (self.rolling_next + np.arange(len(std))) % self.history
+        self.rolling_times[slots] = times
+        self.rolling_std[slots] = std
+        self.rolling_next = (self.rolling_next + len(std)) % self.history
+        self.rolling_filled = min(self.rolling_filled + len(std), self.history)
+
+    # -------------------------
+    # RESULTS
+    # -------------------------
+
+    def zones(self):
+        """Returns: percentage of readings in each zone"""
+        total = max(self.total, 1)
+        return {zone: round(100.0 * count / total, 1) for zone, count in zip(ZONES, self.zone_counts)}
+
+    def series(self, granularity="hour", start=None, end=None):
+        """
+        Mean and standard deviation per minute/hour/day bucket
+        Returns: dict with ISO labels, mean, std and count lists
+        """
+        if granularity not in self.buckets:
+            raise ValueError(f"Unknown granularity '{granularity}'. Choose from: {', '.join(GRANULARITIES)}")
+        selected = self.buckets[granularity].select(start, end)
+        return {
+            "granularity": granularity,
+            "labels": [str(t) for t in selected["start"]],
+            "mean": selected["mean"].round(4).tolist(),
+            "std": selected["std"].round(4).tolist(),
+            "count": selected["count"].tolist(),
+        }
+
+    def hour_of_day(self):
+        """Returns: 24 mean stress values (0 for hours with no readings)"""
+        means = np.where(self.hour_count > 0, self.hour_sum / np.maximum(self.hour_count, 1), 0.0)
+        return means.round(4).tolist()
+
+    def spikes(self):
+        """Returns: finished spike runs with start, length (readings), seconds and max"""
+        spikes = [
+            {"start": str(start), "readings": length, "seconds": seconds, "max": round(peak, 4)}
+            for start, length, seconds, peak in zip(
+                self.spike_starts, self.spike_lengths, self.spike_seconds, self.spike_max)
+        ]
+        return {
+            "count": len(spikes),
+            "avg_readings": float(np.mean(self.spike_lengths)) if spikes else 0.0,
+            "avg_seconds": float(np.mean(self.spike_seconds)) if spikes else 0.0,
+            "in_spike": self.open_spike is not None,
+            "spikes": spikes,
+        }
+
+    def variability(self, last=120):
+        """Returns: the last `last` (at most `history`) rolling-window standard deviations with their times"""
+        count = min(last, self.rolling_filled)
+        slots = (self.rolling_next - count + np.arange(count)) % self.history
+        return {
+            "window": self.window,
+            "labels": [str(t) for t in self.rolling_times[slots]],
+            "std": self.rolling_std[slots].round(4).tolist(),
+        }
+
+    def summary(self, granularity="hour"):
+        latest_time, latest_value = self.latest if self.latest else (None, None)
+        return {
+            "readings": self.total,
+            "latest": {"time": str(latest_time) if latest_time is not None else None,
+                       "stress": latest_value},
+            "zones": self.zones(),
+            "series": self.series(granularity),
+            "hour_of_day": self.hour_of_day(),
+            "spikes": self.spikes(),
+            "variability": self.variability(),
+        }
+
+
+# =========================
+# RUN
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize stress_reading.txt")
+    parser.add_argument("path", help="path to stress_reading.txt")
+    parser.add_argument("--granularity", choices=list(GRANULARITIES), default="hour")
+    args = parser.parse_args()
+
+    ingestor = StressIngestor(args.path)
+    analytics = StressAnalytics().update(*ingestor.poll(final=True))
+    print(json.dumps(analytics.summary(args.granularity), indent=2))
@@ -0,0 +1,226 @@
+"""
+Incremental ingestion of stress_reading.txt ("<ISO timestamp> <stress>" lines).
+
+    python stress_ingest.py stress_reading.txt --follow
+"""
+
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+
+
+TIME_DTYPE = "datetime64[us]"
+EMPTY_TIMES = np.zeros(0, dtype=TIME_DTYPE)
+EMPTY_VALUES = np.zeros(0, dtype=np.float32)
+
+
+# =========================
+# PARSING
+# =========================
+
+def _parse_one(timestamp, stress):
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # "+01:00" offsets are converted to UTC
+            moment = np.datetime64(timestamp.decode("ascii"), "us")
+        value = np.float32(stress)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if np.isnat(moment) or not np.isfinite(value):
+        return None
+    return moment, value
+
+
+def parse_lines(data):
+    """
+    Parse complete lines of "<ISO timestamp> <stress>"
+    Returns: (times datetime64[us], values float32, invalid line count)
+    """
+    fields = [line.split() for line in data.splitlines()]
+    fields = [f for f in fields if f]
+    pairs = [f for f in fields if len(f) >= 2]
+    invalid = len(fields) - len(pairs)
+    if not pairs:
+        return EMPTY_TIMES, EMPTY_VALUES, invalid
+
+    # Fast path: NumPy converts the whole chunk in C; only a chunk that
+    # contains a bad line falls back to line-by-line parsing
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            times = np.array([f[0] for f in pairs]).astype(TIME_DTYPE)
+        values = np.array([f[1] for f in pairs]).astype(np.float32)
+    except ValueError:
+        parsed = [_parse_one(f[0], f[1]) for f in pairs]
+        good = [p for p in parsed if p is not None]
+        invalid += len(parsed) - len(good)
+        if not good:
+            return EMPTY_TIMES, EMPTY_VALUES, invalid
+        times = np.array([p[0] for p in good], dtype=TIME_DTYPE)
+        values = np.array([p[1] for p in good], dtype=np.float32)
+        return times, values, invalid
+
+    ok = ~np.isnat(times) & np.isfinite(values)
+    if not ok.all():
+        invalid += int((~ok).sum())
+        times, values = times[ok], values[ok]
+    return times, values, invalid
+
+
+# =========================
+# STRESS INGESTOR
+# =========================
+
+class StressIngestor:
+    """
+    Reads a growing stress_reading.txt incrementally.
+
+    poll() resumes at the byte offset where the last read stopped, reads
+    only the new bytes (in `chunk_size` pieces) and parses complete lines; a
+    trailing partial line is left for the next poll. A truncated or replaced
+    file starts over. Readings accumulate in datetime64/float32 arrays that
+    grow by doubling, so ingest cost follows new data, not total history.
+    """
+
+    def __init__(self, path, chunk_size=1 << 20, offset=0):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.offset = offset
+        self.inode = None
+        self.count = 0
+        self._times = np.zeros(1024, dtype=TIME_DTYPE)
+        self._values = np.zeros(1024, dtype=np.float32)
+        self.counters = {"polls": 0, "bytes": 0, "readings": 0, "invalid": 0, "resets": 0}
+
+    # -------------------------
+    # STORAGE
+    # -------------------------
+
+    @property
+    def times(self):
+        return self._times[:self.count]
+
+    @property
+    def values(self):
+        return self._values[:self.count]
+
+    def _append(self, times, values):
+        needed = self.count + len(times)
+        if needed > len(self._times):
+            capacity = len(self._times)
+            while capacity < needed:
+                capacity *= 2
+            grown_times = np.zeros(capacity, dtype=TIME_DTYPE)
+            grown_values = np.zeros(capacity, dtype=np.float32)
+            grown_times[:self.count] = self.times
+            grown_values[:self.count] = self.values
+            self._times, self._values = grown_times, grown_values
+
+        self._times[self.count:needed] = times
+        self._values[self.count:needed] = values
+        self.count = needed
+
+    def reset(self):
+        self.offset = 0
+        self.count = 0
+        self.counters["resets"] += 1
+
+    # -------------------------
+    # INGEST
+    # -------------------------
+
+    def poll(self, final=False):
+        """
+        Ingest whatever was appended since the last poll
+        final=True also takes a last line that has no trailing newline
+        (e.g. a finished file); while following, it waits for the newline
+        Returns: (times, values) of the new readings only
+        """
+        self.counters["polls"] += 1
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return EMPTY_TIMES, EMPTY_VALUES
+
+        if stat.st_size < self.offset or (self.inode is not None and stat.st_ino != self.inode):
+            self.reset()  # truncated or rotated: the old offset means nothing now
+        self.inode = stat.st_ino
+        if stat.st_size == self.offset:
+            return EMPTY_TIMES, EMPTY_VALUES
+
+        start = self.count
+        carry = b""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                self.counters["bytes"] += len(chunk)
+                data = carry + chunk
+                end = data.rfind(b"\n") + 1
+                carry = data[end:]
+                if end:
+                    self._ingest(data[:end])
+                    self.offset += end
+
+        if final and carry.strip():
+            self._ingest(carry)
+            self.offset += len(carry)
+
+        return self.times[start:], self.values[start:]
+
+    def _ingest(self, data):
+        times, values, invalid = parse_lines(data)
+        self.counters["invalid"] += invalid
+        self.counters["readings"] += len(times)
+        if len(times):
+            self._append(times, values)
+
+    def follow(self, interval=1.0, stop=None):
+        """
+        tail -f: yield (times, values) batches as the file grows
+        `stop` is an optional threading.Event that ends the loop
+        """
+        while stop is None or not stop.is_set():
+            times, values = self.poll()
+            if len(times):
+                yield times, values
+            if stop is not None:
+                stop.wait(interval)
+            else:
+                time.sleep(interval)
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["offset"] = self.offset
+        stats["count"] = self.count
+        return stats
+
+
+# =========================
+# RUN
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest stress_reading.txt incrementally")
+    parser.add_argument("path", help="path to stress_reading.txt")
+    parser.add_argument("--follow", action="store_true", help="keep reading as the file grows")
+    parser.add_argument("--interval", type=float, default=1.0, help="poll interval for --follow (s)")
+    args = parser.parse_args()
+
+    ingestor = StressIngestor(args.path)
+    times, values = ingestor.poll(final=not args.follow)
+    print(f"✓ {len(times)} readings, {ingestor.counters['invalid']} invalid lines")
+    if len(times):
+        print(f"   {times[0]} → {times[-1]}, mean stress {values.mean():.2f}")
+
+    if args.follow:
+        try:
+            for times, values in ingestor.follow(args.interval):
+                print(f"📈 +{len(times)} readings, latest {times[-1]} {values[-1]:.2f}")
+        except KeyboardInterrupt:
+            print("\nStopped.")
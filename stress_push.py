@@ -0,0 +1,327 @@
+"""
+Live push of new stress readings over Server-Sent Events.
+
+    python stress_push.py stress_reading.txt --port 8001
+
+    GET /events   text/event-stream with "snapshot", "readings",
+                  "aggregates" and "dropped" events
+
+In the dashboard: new EventSource("http://localhost:8001/events")
+"""
+
+import argparse
+import asyncio
+import json
+from collections import deque
+
+import numpy as np
+
+from stress_analytics import StressAnalytics
+from stress_ingest import StressIngestor
+
+
+QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 15.0
+POLL_INTERVAL = 0.25
+DELTA_GRANULARITIES = ("minute", "hour", "day")
+
+
+def sse_message(event, data, event_id=None):
+    """Encode one SSE event (data is JSON-encoded once and shared by all clients)"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def readings_payload(times, values):
+    return {
+        "time_ms": (times.astype("datetime64[us]").astype(np.int64) // 1000).tolist(),
+        "stress": np.asarray(values, dtype=np.float32).round(4).tolist(),
+    }
+
+
+def aggregate_delta(analytics, first_time):
+    """
+    What changed after a batch starting at `first_time`: the buckets it
+    touched at each granularity, plus zones and spike totals
+    Returns: dict ready to send as an "aggregates" event
+    """
+    delta = {
+        "readings": analytics.total,
+        "zones": analytics.zones(),
+        "spikes": len(analytics.spike_starts),
+        "in_spike": analytics.open_spike is not None,
+        "buckets": {},
+    }
+    for granularity in DELTA_GRANULARITIES:
+        series = analytics.series(granularity, start=first_time)
+        delta["buckets"][granularity] = {
+            "start": series["labels"], "mean": series["mean"],
+            "std": series["std"], "count": series["count"],
+        }
+    return delta
+
+
+# =========================
+# PUSH HUB
+# =========================
+
+class PushClient:
+    """
+    One connected client: a bounded deque of encoded events (appending to a
+    full deque drops the oldest) and an Event that wakes its writer. An idle
+    client costs a deque, an Event and one suspended coroutine.
+    """
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue = deque(maxlen=queue_size)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.unreported = 0
+        self.sent = 0
+
+    def put(self, message):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+            self.unreported += 1
+        self.queue.append(message)
+        self.ready.set()
+
+    async def next_batch(self, timeout=None):
+        """
+        Wait for queued events
+        Returns: bytes of every pending event (b"" on timeout)
+        """
+        if not self.queue:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return b""
+
+        messages = list(self.queue)
+        self.queue.clear()
+        if self.unreported:
+            # Tell the client it missed events so it can refetch /stats
+            messages.insert(0, sse_message("dropped", {"count": self.unreported}))
+            self.unreported = 0
+        self.sent += len(messages)
+        return b"".join(messages)
+
+
+class PushHub:
+    """Fan-out of encoded events to every connected PushClient"""
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.clients = set()
+        self.sequence = 0
+        self.counters = {"events": 0, "connected": 0, "disconnected": 0}
+
+    def connect(self):
+        client = PushClient(self.queue_size)
+        self.clients.add(client)
+        self.counters["connected"] += 1
+        return client
+
+    def disconnect(self, client):
+        if client in self.clients:
+            self.clients.discard(client)
+            self.counters["disconnected"] += 1
+
+    def publish(self, event, data):
+        """Encode once and queue for every client (call on the event loop)"""
+        self.sequence += 1
+        message = sse_message(event, data, self.sequence)
+        for client in self.clients:
+            client.put(message)
+        self.counters["events"] += 1
+        return message
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["clients"] = len(self.clients)
+        stats["dropped"] = sum(client.dropped for client in self.clients)
+        return stats
+
+
+# =========================
+# SSE SERVER
+# =========================
+
+class StressPushServer:
+    """
+    asyncio SSE server: follows stress_reading.txt, folds each new batch
+    into StressAnalytics (and an optional StressStore) and pushes the new
+    readings plus the aggregate buckets they changed. Nothing is sent when
+    nothing changes except a comment line every `heartbeat` seconds to keep
+    proxies from closing idle connections.
+    """
+
+    def __init__(self, ingestor=None, analytics=None, store=None, host="localhost", port=8001,
+                 interval=POLL_INTERVAL, queue_size=QUEUE_SIZE, heartbeat=HEARTBEAT_SECONDS):
+        self.ingestor = ingestor
+        self.analytics = analytics or StressAnalytics()
+        self.store = store
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.hub = PushHub(queue_size)
+        self.server = None
+        self.follower = None
+        self.handlers = set()
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        if self.ingestor is not None:
+            # History already in the file goes into the snapshot, not the stream
+            times, values = await loop.run_in_executor(None, self.ingestor.poll)
+            if self.store is not None:
+                await loop.run_in_executor(None, self.store.append, times, values)
+            self.analytics.update(times, values)
+            self.follower = asyncio.create_task(self.follow())
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        if self.follower is not None:
+            self.follower.cancel()
+            try:
+                await self.follower
+            except asyncio.CancelledError:
+                pass
+        if self.server is not None:
+            self.server.close()
+            for task in list(self.handlers):
+                task.cancel()
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+            await self.server.wait_closed()
+
+    # -------------------------
+    # INGEST
+    # -------------------------
+
+    async def follow(self):
+        """Poll the ingestor (file I/O off the loop) and push every new batch"""
+        loop = asyncio.get_running_loop()
+        while True:
+            times, values = await loop.run_in_executor(None, self.ingestor.poll)
+            if len(times):
+                if self.store is not None:
+                    await loop.run_in_executor(None, self.store.append, times, values)
+                self.ingest(times, values)
+            await asyncio.sleep(self.interval)
+
+    def ingest(self, times, values):
+        """Update analytics with a batch and push readings + aggregate deltas"""
+        if len(times) == 0:
+            return
+        self.analytics.update(times, values)
+        self.hub.publish("readings", readings_payload(times, values))
+        self.hub.publish("aggregates", aggregate_delta(self.analytics, times[0]))
+
+    # -------------------------
+    # CONNECTIONS
+    # -------------------------
+
+    async def handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError):
+            writer.close()
+            return
+
+        method, path = (request.split(b"\r\n", 1)[0].decode("latin-1").split(" ") + ["", ""])[:2]
+        if method != "GET" or path.split("?", 1)[0] != "/events":
+            body = b'{"error": {"status": 404, "message": "Not found"}}'
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body))
+            await self._close(writer)
+            return
+
+        client = self.hub.connect()
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Connection: keep-alive\r\n"
+                b"Access-Control-Allow-Origin: *\r\n\r\n"
+                b"retry: 2000\n\n"
+                + sse_message("snapshot", self.snapshot())
+            )
+            await writer.drain()
+            while True:
+                batch = await client.next_batch(self.heartbeat)
+                writer.write(batch or b": keepalive\n\n")
+                await writer.drain()  # a slow client waits here while its queue drops oldest
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.handlers.discard(task)
+            self.hub.disconnect(client)
+            await self._close(writer)
+
+    async def _close(self, writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    def snapshot(self):
+        """Current state sent on connect, so clients need no initial full download"""
+        latest_time, latest_value = self.analytics.latest or (None, None)
+        return {
+            "readings": self.analytics.total,
+            "latest": {"time": str(latest_time) if latest_time is not None else None,
+                       "stress": latest_value},
+            "zones": self.analytics.zones(),
+            "hour_of_day": self.analytics.hour_of_day(),
+            "spikes": self.analytics.spikes()["count"],
+        }
+
+    def stats(self):
+        return self.hub.stats()
+
+
+# =========================
+# RUN
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Push new stress readings over Server-Sent Events")
+    parser.add_argument("path", help="stress_reading.txt to follow")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="poll interval (s)")
+    args = parser.parse_args()
+
+    server = StressPushServer(StressIngestor(args.path), host=args.host, port=args.port,
+                              interval=args.interval)
+    print(f"📈 Live stress events at {server.base_url}/events")
+    print("Press Ctrl+C to stop")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n\nExiting...")
@@ -0,0 +1,366 @@
+"""
+Local stress-analytics HTTP service.
+
+    python stress_service.py --follow stress_reading.txt --port 8000
+
+    GET /stats?granularity=minute|hour|day&from=<ISO>&to=<ISO>
+    GET /readings?from=<ISO>&to=<ISO>
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from hello_world import HelloWorldHandler
+from stress_ingest import StressIngestor
+from stress_store import ROLLUP_UNITS, StressStore, to_micros
+
+
+DEFAULT_READINGS_WINDOW = np.timedelta64(1, "h")
+GZIP_MIN_BYTES = 512
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def parse_time(query, name):
+    value = query.get(name, [None])[0]
+    if not value:
+        return None
+    try:
+        return to_micros(value, None)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be an ISO timestamp, got '{value}'")
+
+
+# =========================
+# RESPONSE CACHE
+# =========================
+
+class ResponseCache:
+    """
+    LRU of encoded responses keyed by (endpoint, query, data version).
+
+    A range that ends before the newest time bucket cannot change, so its
+    version is constant and it stays cached; a range reaching the open bucket
+    is keyed by the newest reading, so new data invalidates only those.
+    Each entry keeps the JSON body and its gzip encoding, compressed once.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_or_build(self, key, build):
+        """Returns: (etag, body, gzipped body or None)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry
+            self.counters["misses"] += 1
+
+        body = json.dumps(build(), separators=(",", ":")).encode()
+        compressed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+        entry = (etag_for(key), body, compressed)
+
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+        return entry
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self.entries)
+            return stats
+
+
+def etag_for(key):
+    return '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:20] + '"'
+
+
+def gzip_etag(etag):
+    """Returns: the strong ETag of the gzip-encoded variant of `etag`'s body"""
+    return etag[:-1] + '-gzip"'
+
+
+# =========================
+# STRESS HANDLER
+# =========================
+
+class StressHandler(HelloWorldHandler):
+    """
+    HelloWorldHandler grown into the analytics API: "/" still serves the
+    hello page, /stats and /readings return JSON with ETags (304 on
+    If-None-Match), gzip when the client accepts it (under its own ETag),
+    and byte ranges of the identity body.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        service = self.server
+
+        if url.path == "/":
+            return self.send_page(send_body)
+
+        try:
+            if url.path == "/stats":
+                key, build, sealed = service.stats_request(query)
+            elif url.path == "/readings":
+                key, build, sealed = service.readings_request(query)
+            else:
+                return self.send_error_json(404, f"Unknown path {url.path}")
+        except BadRequest as e:
+            return self.send_error_json(400, str(e))
+
+        etag, body, compressed = service.cache.get_or_build(key, build)
+        self.send_cached(etag, body, compressed, sealed, send_body)
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def send_cached(self, etag, body, compressed, sealed, send_body):
+        byte_range = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        # Ranges address the identity (uncompressed) representation; the
+        # gzip one is a different byte sequence, so it gets its own ETag
+        ranged = bool(byte_range) and (if_range is None or if_range == etag)
+        gzipped = (not ranged and compressed is not None
+                   and "gzip" in self.headers.get("Accept-Encoding", ""))
+        headers = {
+            "ETag": gzip_etag(etag) if gzipped else etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "public, max-age=3600" if sealed else "no-cache",
+            "Accept-Ranges": "bytes",
+        }
+
+        if headers["ETag"] in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            return self.send_body(304, b"", headers, send_body=False)
+
+        if ranged:
+            span = parse_range(byte_range, len(body))
+            if span is None:
+                headers["Content-Range"] = f"bytes */{len(body)}"
+                return self.send_body(416, b"", headers, send_body)
+            start, end = span
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(body)}"
+            return self.send_body(206, body[start:end], headers, send_body)
+
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+            return self.send_body(200, compressed, headers, send_body)
+        return self.send_body(200, body, headers, send_body)
+
+    def send_body(self, status, body, headers, send_body=True):
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        body = json.dumps({"error": {"status": status, "message": message}}).encode()
+        self.send_body(status, body, {})
+
+    def log_message(self, format, *args):
+        # Suppress per-request logs
+        pass
+
+
+def parse_range(header, size):
+    """
+    Parse a single "bytes=start-end" / "bytes=start-" / "bytes=-suffix" range
+    Returns: (start, end exclusive), or None if unsatisfiable
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if start >= size or end <= start:
+        return None
+    return start, min(end, size)
+
+
+# =========================
+# STRESS SERVICE
+# =========================
+
+class StressService(ThreadingHTTPServer):
+    """
+    Multi-threaded server over a StressStore. Answers come from the store's
+    rollups and memory-mapped raw segments; encoded responses are cached
+    per time bucket (see ResponseCache). follow() keeps the store fed from
+    a growing stress_reading.txt in a background thread.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, store=None, host="localhost", port=8000, cache_entries=256):
+        super().__init__((host, port), StressHandler)
+        self.store = store or StressStore()
+        self.cache = ResponseCache(cache_entries)
+        self.thread = None
+        self.follower = None
+        self.stop_event = threading.Event()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # -------------------------
+    # REQUESTS
+    # -------------------------
+
+    def _version(self, end, unit):
+        """
+        Data version for a range ending at `end`: constant once the range
+        is wholly before the newest (still filling) bucket, until retention
+        removes history
+        """
+        newest = self.store.last_time
+        epoch = self.store.counters["retention_epoch"]
+        if newest is not None and end is not None and end <= newest // unit * unit:
+            return ("sealed", epoch), True
+        return ("open", newest, epoch), False
+
+    def stats_request(self, query):
+        """Returns: (cache key, build function, sealed)"""
+        granularity = query.get("granularity", ["hour"])[0]
+        if granularity not in ROLLUP_UNITS:
+            raise BadRequest(f"granularity must be one of: {', '.join(ROLLUP_UNITS)}")
+        start, end = parse_time(query, "from"), parse_time(query, "to")
+        version, sealed = self._version(end, ROLLUP_UNITS[granularity])
+
+        def build():
+            buckets = self.store.rollup(granularity, start, end)
+            return {
+                "granularity": granularity,
+                "buckets": {
+                    "start": [str(t) for t in buckets["start"]],
+                    "count": buckets["count"].tolist(),
+                    "mean": buckets["mean"].round(4).tolist(),
+                    "std": buckets["std"].round(4).tolist(),
+                    "min": buckets["min"].round(4).tolist(),
+                    "max": buckets["max"].round(4).tolist(),
+                },
+                "summary": self.store.aggregate(start, end, granularity),
+            }
+
+        return ("stats", granularity, start, end, version), build, sealed
+
+    def readings_request(self, query):
+        """
+        Raw readings; without `from` it returns the last hour before `to`
+        (or before the newest reading)
+        Returns: (cache key, build function, sealed)
+        """
+        start, end = parse_time(query, "from"), parse_time(query, "to")
+        if start is None:
+            anchor = end if end is not None else self.store.last_time
+            if anchor is not None:
+                start = anchor - int(DEFAULT_READINGS_WINDOW / np.timedelta64(1, "us"))
+                if end is None:
+                    start += 1  # the window includes the newest reading
+        version, sealed = self._version(end, 1)
+
+        def build():
+            times, values = self.store.readings(start, end)
+            return {
+                "count": len(times),
+                "time_ms": (times.astype(np.int64) // 1000).tolist(),
+                "stress": values.round(4).tolist(),
+            }
+
+        return ("readings", start, end, version), build, sealed
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+
+    def follow(self, ingestor, interval=1.0):
+        """Append new lines of the ingestor's file to the store in the background"""
+        def run():
+            for times, values in ingestor.follow(interval, self.stop_event):
+                self.store.append(times, values)
+
+        self.follower = threading.Thread(target=run, daemon=True)
+        self.follower.start()
+        return self
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.shutdown()
+        self.server_close()
+        if self.follower is not None:
+            self.follower.join(timeout=5)
+
+
+# =========================
+# RUN
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve stress analytics over HTTP")
+    parser.add_argument("--store", default=None, help="StressStore directory")
+    parser.add_argument("--follow", metavar="PATH", help="stress_reading.txt to ingest as it grows")
+    parser.add_argument("--interval", type=float, default=1.0, help="poll interval for --follow (s)")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    server = StressService(StressStore(args.store), host=args.host, port=args.port)
+    if args.follow:
+        server.follow(StressIngestor(args.follow), args.interval)
+    print(f"📈 Stress analytics at {server.base_url}/stats?granularity=hour")
+    print("Press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\nExiting...")
+        server.stop_event.set()
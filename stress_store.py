@@ -0,0 +1,427 @@
+"""
+Append-only columnar store for stress history.
+
+    python stress_store.py stress_reading.txt --raw-days 30
+
+Layout under the store root:
+
+    raw/2026-02-14/time.col     int64 epoch microseconds, sorted
+    raw/2026-02-14/stress.col   float32 stress
+    rollups/minute/*.col        start, count, sum, sumsq, min, max per bucket
+    rollups/hour/*.col
+    rollups/day/*.col
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from stress_ingest import StressIngestor
+
+
+DEFAULT_STORE_PATH = Path.home() / ".musicqueue" / "stress"
+
+MINUTE_US = 60 * 1_000_000
+HOUR_US = 60 * MINUTE_US
+DAY_US = 24 * HOUR_US
+
+RAW_SCHEMA = {"time": np.int64, "stress": np.float32}
+ROLLUP_SCHEMA = {
+    "start": np.int64,
+    "count": np.int64,
+    "sum": np.float64,
+    "sumsq": np.float64,
+    "min": np.float32,
+    "max": np.float32,
+}
+ROLLUP_UNITS = {"minute": MINUTE_US, "hour": HOUR_US, "day": DAY_US}
+ROLLUP_DATETIME = {"minute": "datetime64[m]", "hour": "datetime64[h]", "day": "datetime64[D]"}
+
+
+def to_micros(moment, default):
+    """datetime64 / ISO string / None -> int64 epoch microseconds"""
+    if moment is None:
+        return default
+    return int(np.datetime64(moment, "us").astype(np.int64))
+
+
+def day_name(day):
+    return str(np.datetime64(int(day), "D"))
+
+
+# =========================
+# COLUMN FILES
+# =========================
+
+class ColumnSet:
+    """
+    A directory of append-only columns, one flat binary file per field,
+    read through np.memmap. Columns are appended one after another, so a
+    crash can leave them at different lengths; opening trims every column
+    back to the shortest complete row count.
+    """
+
+    def __init__(self, directory, schema):
+        self.directory = Path(directory)
+        self.schema = schema
+        self._maps = {}
+        self.rows = self._repair()
+
+    def _path(self, name):
+        return self.directory / f"{name}.col"
+
+    def _repair(self):
+        if not self.directory.is_dir():
+            return 0
+        sizes = {}
+        for name, dtype in self.schema.items():
+            path = self._path(name)
+            sizes[name] = path.stat().st_size if path.exists() else 0
+        rows = min(sizes[name] // np.dtype(dtype).itemsize for name, dtype in self.schema.items())
+        for name, dtype in self.schema.items():
+            length = rows * np.dtype(dtype).itemsize
+            if sizes[name] != length:
+                with open(self._path(name), "ab") as f:
+                    f.truncate(length)
+        return rows
+
+    def append(self, columns):
+        count = len(next(iter(columns.values())))
+        if count == 0:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, dtype in self.schema.items():
+            with open(self._path(name), "ab") as f:
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        self.rows += count
+
+    def replace_last(self, row):
+        """Overwrite the newest row in place (open memmaps see the change)"""
+        for name, dtype in self.schema.items():
+            itemsize = np.dtype(dtype).itemsize
+            with open(self._path(name), "r+b") as f:
+                f.seek((self.rows - 1) * itemsize)
+                f.write(np.array([row[name]], dtype=dtype).tobytes())
+
+    def column(self, name):
+        """Returns: read-only memmap view of the first `rows` entries"""
+        dtype = self.schema[name]
+        if self.rows == 0:
+            return np.zeros(0, dtype=dtype)
+        mapped = self._maps.get(name)
+        if mapped is None or len(mapped) < self.rows:
+            # Appends land past the end of an existing mapping; map again
+            mapped = np.memmap(self._path(name), dtype=dtype, mode="r")
+            self._maps[name] = mapped
+        return mapped[:self.rows]
+
+    def last(self):
+        return {name: self.column(name)[-1] for name in self.schema}
+
+    def drop_before(self, index):
+        """Rewrite every column without its first `index` rows (atomic per file)"""
+        if index <= 0:
+            return 0
+        index = min(index, self.rows)
+        for name, dtype in self.schema.items():
+            kept = np.array(self.column(name)[index:])
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{name}-", suffix=".col")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(kept.tobytes())
+                os.replace(tmp_path, self._path(name))
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+        self._maps.clear()
+        self.rows -= index
+        return index
+
+    def nbytes(self):
+        return sum(self.rows * np.dtype(dtype).itemsize for dtype in self.schema.values())
+
+    def close(self):
+        self._maps.clear()
+
+
+# =========================
+# STRESS STORE
+# =========================
+
+class StressStore:
+    """
+    Time-partitioned raw readings (one segment directory per UTC day) plus
+    minute/hour/day rollups maintained at ingest.
+
+    Readings are 12 bytes each (int64 µs + float32) instead of ~36 bytes of
+    text. Range queries pick the day segments that overlap and binary-search
+    the memory-mapped time column, so cost follows the result size, not the
+    history. Rollups are small enough to answer whole-year queries from
+    directly, and retention can drop raw days while keeping them.
+
+    retention: days to keep per level, e.g. {"raw": 30, "minute": 365};
+    measured back from the newest reading and applied whenever a new day
+    segment opens (or on enforce_retention()).
+    """
+
+    def __init__(self, root=None, retention=None):
+        self.root = Path(root) if root else DEFAULT_STORE_PATH
+        self.retention = dict(retention or {})
+        self.lock = threading.RLock()
+        self.rollups = {
+            name: ColumnSet(self.root / "rollups" / name, ROLLUP_SCHEMA) for name in ROLLUP_UNITS
+        }
+        self.segments = {}
+        raw = self.root / "raw"
+        self.days = sorted(
+            int(np.datetime64(p.name, "D").astype(np.int64)) for p in raw.iterdir() if p.is_dir()
+        ) if raw.is_dir() else []
+        # retention_epoch counts enforce_retention runs that removed anything,
+        # so readers caching old ranges can tell history changed
+        self.counters = {"appended": 0, "late": 0, "segments_dropped": 0,
+                         "buckets_dropped": 0, "retention_epoch": 0}
+        self.last_time = self._newest()
+
+    def _segment(self, day):
+        segment = self.segments.get(day)
+        if segment is None:
+            segment = ColumnSet(self.root / "raw" / day_name(day), RAW_SCHEMA)
+            self.segments[day] = segment
+        return segment
+
+    def _newest(self):
+        for day in reversed(self.days):
+            segment = self._segment(day)
+            if segment.rows:
+                return int(segment.column("time")[-1])
+        starts = self.rollups["minute"].column("start")
+        return int(starts[-1]) if len(starts) else None
+
+    # -------------------------
+    # INGEST
+    # -------------------------
+
+    def append(self, times, values):
+        """
+        Append readings (datetime64 times, stress values). A batch is sorted
+        if needed; readings at or before the newest stored one are dropped,
+        since the store is append-only (re-importing a file adds nothing).
+        Returns: number of readings stored
+        """
+        times = np.asarray(times, dtype="datetime64[us]").astype(np.int64)
+        values = np.asarray(values, dtype=np.float32)
+        if len(times) == 0:
+            return 0
+        if np.any(times[1:] < times[:-1]):
+            order = np.argsort(times, kind="stable")
+            times, values = times[order], values[order]
+
+        with self.lock:
+            if self.last_time is not None:
+                fresh = np.searchsorted(times, self.last_time, side="right")
+                self.counters["late"] += int(fresh)
+                times, values = times[fresh:], values[fresh:]
+                if len(times) == 0:
+                    return 0
+
+            days = times // DAY_US
+            cuts = np.flatnonzero(np.diff(days)) + 1
+            new_day = False
+            for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, len(times)]):
+                day = int(days[lo])
+                if not self.days or day > self.days[-1]:
+                    self.days.append(day)
+                    new_day = True
+                self._segment(day).append({"time": times[lo:hi], "stress": values[lo:hi]})
+
+            for name, unit in ROLLUP_UNITS.items():
+                self._roll_up(self.rollups[name], unit, times, values)
+
+            self.last_time = int(times[-1])
+            self.counters["appended"] += len(times)
+            if new_day and self.retention:
+                self.enforce_retention()
+            return len(times)
+
+    def _roll_up(self, columns, unit, times, values):
+        keys = times // unit
+        firsts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        values64 = values.astype(np.float64)
+        rows = {
+            "start": keys[firsts] * unit,
+            "count": np.diff(np.r_[firsts, len(times)]),
+            "sum": np.add.reduceat(values64, firsts),
+            "sumsq": np.add.reduceat(values64 * values64, firsts),
+            "min": np.minimum.reduceat(values, firsts),
+            "max": np.maximum.reduceat(values, firsts),
+        }
+
+        # The first bucket may continue the newest stored one
+        if columns.rows and columns.column("start")[-1] == rows["start"][0]:
+            last = columns.last()
+            columns.replace_last({
+                "start": last["start"],
+                "count": last["count"] + rows["count"][0],
+                "sum": last["sum"] + rows["sum"][0],
+                "sumsq": last["sumsq"] + rows["sumsq"][0],
+                "min": min(last["min"], rows["min"][0]),
+                "max": max(last["max"], rows["max"][0]),
+            })
+            rows = {name: column[1:] for name, column in rows.items()}
+        columns.append(rows)
+
+    def enforce_retention(self, now=None):
+        """
+        Drop raw segments and rollup buckets older than the retention policy
+        Returns: dict of dropped segments / buckets per level
+        """
+        with self.lock:
+            now = to_micros(now, self.last_time)
+            dropped = {}
+            if now is None:
+                return dropped
+
+            raw_days = self.retention.get("raw")
+            if raw_days is not None:
+                cutoff = (now - int(raw_days * DAY_US)) // DAY_US
+                old = [day for day in self.days if day < cutoff]
+                for day in old:
+                    segment = self.segments.pop(day, None)
+                    if segment is not None:
+                        segment.close()
+                    shutil.rmtree(self.root / "raw" / day_name(day), ignore_errors=True)
+                self.days = [day for day in self.days if day >= cutoff]
+                self.counters["segments_dropped"] += len(old)
+                dropped["raw"] = len(old)
+
+            for name, columns in self.rollups.items():
+                keep_days = self.retention.get(name)
+                if keep_days is None:
+                    continue
+                cutoff = (now - int(keep_days * DAY_US)) // DAY_US * DAY_US  # whole days, like raw
+                dropped[name] = columns.drop_before(
+                    int(np.searchsorted(columns.column("start"), cutoff, side="left")))
+                self.counters["buckets_dropped"] += dropped[name]
+
+            if any(dropped.values()):
+                self.counters["retention_epoch"] += 1
+            return dropped
+
+    # -------------------------
+    # QUERIES
+    # -------------------------
+
+    def readings(self, start=None, end=None):
+        """
+        Raw readings in [start, end)
+        Returns: (times datetime64[us], values float32)
+        """
+        lo = to_micros(start, np.iinfo(np.int64).min)
+        hi = to_micros(end, np.iinfo(np.int64).max)
+        times, values = [], []
+        with self.lock:
+            days = [day for day in self.days if lo // DAY_US <= day <= (hi - 1) // DAY_US]
+            for day in days:
+                segment = self._segment(day)
+                column = segment.column("time")
+                i = np.searchsorted(column, lo, side="left")
+                j = np.searchsorted(column, hi, side="left")
+                if j > i:
+                    times.append(column[i:j])
+                    values.append(segment.column("stress")[i:j])
+
+        if not times:
+            return np.zeros(0, dtype="datetime64[us]"), np.zeros(0, dtype=np.float32)
+        return np.concatenate(times).view("datetime64[us]"), np.concatenate(values)
+
+    def rollup(self, granularity="hour", start=None, end=None):
+        """
+        Buckets whose start is in [start, end)
+        Returns: dict of arrays: start, count, mean, std, min, max
+        """
+        if granularity not in self.rollups:
+            raise ValueError(f"Unknown granularity '{granularity}'. Choose from: {', '.join(ROLLUP_UNITS)}")
+        columns = self.rollups[granularity]
+        with self.lock:
+            starts = columns.column("start")
+            i = np.searchsorted(starts, to_micros(start, np.iinfo(np.int64).min), side="left")
+            j = np.searchsorted(starts, to_micros(end, np.iinfo(np.int64).max), side="left")
+            picked = {name: np.array(columns.column(name)[i:j]) for name in ROLLUP_SCHEMA}
+
+        count = np.maximum(picked["count"], 1)
+        mean = picked["sum"] / count
+        return {
+            "start": picked["start"].view("datetime64[us]").astype(ROLLUP_DATETIME[granularity]),
+            "count": picked["count"],
+            "mean": mean,
+            "std": np.sqrt(np.maximum(picked["sumsq"] / count - mean * mean, 0.0)),
+            "min": picked["min"],
+            "max": picked["max"],
+        }
+
+    def aggregate(self, start=None, end=None, granularity="minute"):
+        """
+        Totals over [start, end) combined from rollup buckets (bucket-aligned)
+        Returns: dict with count, mean, std, min, max
+        """
+        buckets = self.rollup(granularity, start, end)
+        count = int(buckets["count"].sum())
+        if count == 0:
+            return {"count": 0, "mean": None, "std": None, "min": None, "max": None}
+        total = float((buckets["mean"] * buckets["count"]).sum())
+        sumsq = float(((buckets["std"] ** 2 + buckets["mean"] ** 2) * buckets["count"]).sum())
+        mean = total / count
+        return {
+            "count": count,
+            "mean": mean,
+            "std": float(np.sqrt(max(sumsq / count - mean * mean, 0.0))),
+            "min": float(buckets["min"].min()),
+            "max": float(buckets["max"].max()),
+        }
+
+    def stats(self):
+        with self.lock:
+            raw_rows = sum(self._segment(day).rows for day in self.days)
+            stats = dict(self.counters)
+            stats["segments"] = len(self.days)
+            stats["raw_readings"] = raw_rows
+            stats["raw_bytes"] = sum(self._segment(day).nbytes() for day in self.days)
+            stats["rollup_bytes"] = sum(columns.nbytes() for columns in self.rollups.values())
+            for name, columns in self.rollups.items():
+                stats[f"{name}_buckets"] = columns.rows
+            return stats
+
+    def close(self):
+        with self.lock:
+            for columns in (*self.segments.values(), *self.rollups.values()):
+                columns.close()
+
+
+# =========================
+# RUN
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import stress_reading.txt into the columnar store")
+    parser.add_argument("path", help="path to stress_reading.txt")
+    parser.add_argument("--root", default=None, help=f"store directory (default {DEFAULT_STORE_PATH})")
+    parser.add_argument("--raw-days", type=float, default=None, help="days of raw readings to keep")
+    args = parser.parse_args()
+
+    retention = {"raw": args.raw_days} if args.raw_days is not None else None
+    store = StressStore(args.root, retention=retention)
+    ingestor = StressIngestor(args.path)
+    stored = store.append(*ingestor.poll(final=True))
+    stats = store.stats()
+    print(f"✓ Stored {stored} readings ({stats['late']} older than the store were skipped)")
+    print(f"   {stats['segments']} day segments, {stats['raw_bytes'] / 1e6:.1f} MB raw, "
+          f"{stats['rollup_bytes'] / 1e6:.1f} MB rollups "
+          f"(text was {os.path.getsize(args.path) / 1e6:.1f} MB)")
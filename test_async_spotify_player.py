@@ -0,0 +1,104 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import MagicMock
+from async_spotify_player import AsyncSpotifyPlayer
+from focus_background import SpotifyPlayer
+from token_store import TokenStore
+
+
+DELAY = 0.2
+
+
+def slow(value):
+    def call(*args, **kwargs):
+        time.sleep(DELAY)
+        return value
+    return call
+
+
+class TestAsyncSpotifyPlayer:
+    """Test suite for concurrent prerequisite checks and cues."""
+
+    def make_player(self, tmp_path):
+        player = SpotifyPlayer(
+            "id", "secret", "http://localhost:8888/callback",
+            token_store=TokenStore(tmp_path / "token.json"),
+        )
+        player.access_token = "token"
+        player.http = MagicMock()
+        return player
+
+    def test_login_status_fetches_concurrently(self, tmp_path):
+        """Test that profile and devices are fetched at the same time."""
+        player = self.make_player(tmp_path)
+        profile = MagicMock(status_code=200)
+        profile.json.return_value = {"display_name": "Test", "product": "premium"}
+        player.http.get.side_effect = slow(profile)
+        player.devices.fetch = slow([{"id": "d1", "name": "Laptop", "type": "Computer"}])
+
+        start = time.perf_counter()
+        status = asyncio.run(AsyncSpotifyPlayer(player).test_login_status())
+        elapsed = time.perf_counter() - start
+
+        assert status["logged_in"] is True
+        assert status["device_count"] == 1
+        assert elapsed < DELAY * 1.8
+
+    def test_login_status_reports_device_errors(self, tmp_path):
+        """Test that a failed device fetch surfaces as a login error."""
+        player = self.make_player(tmp_path)
+        profile = MagicMock(status_code=200)
+        profile.json.return_value = {"product": "premium"}
+        player.http.get.return_value = profile
+        player.devices.fetch = MagicMock(side_effect=RuntimeError("boom"))
+
+        status = asyncio.run(AsyncSpotifyPlayer(player).test_login_status())
+
+        assert status["logged_in"] is False
+        assert "boom" in status["error"]
+
+    def test_prerequisites_check_login_and_device_together(self, tmp_path):
+        """Test that the login check and the device wait overlap instead of running in turn."""
+        player = self.make_player(tmp_path)
+        profile = MagicMock(status_code=200)
+        profile.json.return_value = {"display_name": "Test", "product": "premium"}
+        player.http.get.side_effect = slow(profile)
+        player.devices.fetch = slow([{"id": "d1", "name": "Laptop", "type": "Computer", "is_active": True}])
+
+        start = time.perf_counter()
+        ready = asyncio.run(AsyncSpotifyPlayer(player).verify_prerequisites())
+        elapsed = time.perf_counter() - start
+
+        assert ready is True
+        assert elapsed < DELAY * 1.8
+
+    def test_prerequisites_never_prompt(self, tmp_path, monkeypatch):
+        """Test that a missing device fails after the timeout instead of blocking on input()."""
+        player = self.make_player(tmp_path)
+        profile = MagicMock(status_code=200)
+        profile.json.return_value = {"product": "premium"}
+        player.http.get.return_value = profile
+        player.devices.fetch = MagicMock(return_value=[])
+        monkeypatch.setattr("builtins.input", MagicMock(side_effect=AssertionError("prompted")))
+
+        assert asyncio.run(AsyncSpotifyPlayer(player).verify_prerequisites(device_timeout=0.1)) is False
+
+    def test_play_query_overlaps_search_and_device(self, tmp_path):
+        """Test that search and device lookup run concurrently before playback."""
+        player = self.make_player(tmp_path)
+        player.fetch_search = slow([{"name": "Lofi", "uri": "spotify:playlist:1"}])
+        player.devices.fetch = slow([{"id": "d1", "is_active": True}])
+        player.http.put.return_value = MagicMock(status_code=204)
+
+        start = time.perf_counter()
+        result = asyncio.run(AsyncSpotifyPlayer(player).play_query("lofi beats focus"))
+        elapsed = time.perf_counter() - start
+
+        assert result is True
+        assert player.http.put.call_args.kwargs["params"] == {"device_id": "d1"}
+        assert elapsed < DELAY * 1.8
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
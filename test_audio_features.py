@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+
+from audio_features import analyze_catalog, analyze_track, k_weighting_power
+from track_catalog import TrackCatalog
+
+
+def write_clicks(path, bpm, seconds=20, samplerate=44100, channels=1, seed=0):
+    rng = np.random.default_rng(seed)
+    data = np.zeros(int(seconds * samplerate), dtype=np.float32)
+    step = int(samplerate * 60 / bpm)
+    for start in range(0, len(data) - 256, step):
+        data[start:start + 256] = rng.standard_normal(256) * 0.5
+    sf.write(str(path), np.repeat(data[:, None], channels, axis=1), samplerate)
+    return str(path)
+
+
+def write_sine(path, freq=997, amplitude=0.1, seconds=10, samplerate=48000):
+    t = np.arange(int(seconds * samplerate)) / samplerate
+    sf.write(str(path), (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32), samplerate)
+    return str(path)
+
+
+class TestAnalyzeTrack:
+    """Test suite for per-track feature extraction."""
+
+    def test_k_weighting_reference_points(self):
+        """Test that K-weighting is ~0.7 dB at 1 kHz, ~+4 dB up high and rolls off in the bass."""
+        gain = 10 * np.log10(k_weighting_power(np.array([20.0, 1000.0, 10000.0]), 48000))
+        assert gain[0] < -10
+        assert gain[1] == pytest.approx(0.7, abs=0.05)
+        assert gain[2] == pytest.approx(4.0, abs=0.1)
+
+    def test_sine_loudness_and_centroid(self, tmp_path):
+        """Test that a -20 dBFS 997 Hz sine measures about -23 LUFS with its centroid at 997 Hz."""
+        features = analyze_track(write_sine(tmp_path / "sine.wav"))
+        assert features["error"] is None
+        assert features["loudness"] == pytest.approx(-23.0, abs=0.1)
+        assert features["rms"] == pytest.approx(0.1 / np.sqrt(2), rel=1e-3)
+        assert features["centroid"] == pytest.approx(997, rel=0.05)
+
+    @pytest.mark.parametrize("bpm", [60, 90, 128])
+    def test_tempo_of_click_track(self, tmp_path, bpm):
+        """Test that tempo is recovered from a click track across blocks."""
+        path = write_clicks(tmp_path / f"{bpm}.wav", bpm, channels=2)
+        assert analyze_track(path, block_seconds=3.0)["tempo"] == pytest.approx(bpm, rel=0.02)
+
+    def test_undecodable_file_reports_error(self, tmp_path):
+        """Test that a broken file yields an error instead of raising."""
+        path = tmp_path / "broken.mp3"
+        path.write_bytes(b"not audio")
+        assert analyze_track(str(path))["error"]
+
+
+class TestAnalyzeCatalog:
+    """Test suite for cached batch analysis."""
+
+    def test_only_new_or_changed_tracks_are_analyzed(self, tmp_path):
+        """Test that features are cached by path + mtime and removed with the track."""
+        catalog = TrackCatalog(tmp_path / "catalog.db")
+        paths = [write_clicks(tmp_path / f"{i}.wav", 80 + 10 * i, seconds=5, seed=i) for i in range(3)]
+        catalog.build([(p, 1, 1) for p in paths], workers=1)
+
+        assert analyze_catalog(catalog, workers=1)["analyzed"] == 3
+        assert analyze_catalog(catalog, workers=1)["analyzed"] == 0
+
+        catalog.build([(paths[0], 1, 2), (paths[1], 1, 1)], workers=1)
+        stats = analyze_catalog(catalog, workers=1)
+        assert (stats["analyzed"], stats["unchanged"]) == (1, 1)
+        assert catalog.features(paths[2]) is None
+        assert catalog.features(paths[0])["mtime_ns"] == 2
+
+    def test_process_pool_matches_inline(self, tmp_path):
+        """Test that pooled analysis stores the same features as inline analysis."""
+        paths = [write_clicks(tmp_path / f"{i}.wav", 100, seconds=3, seed=i) for i in range(10)]
+        pooled = TrackCatalog(tmp_path / "pooled.db")
+        pooled.build([(p, 1, 1) for p in paths], workers=1)
+        analyze_catalog(pooled, workers=2)
+
+        for path in paths:
+            expected = analyze_track(path)
+            assert pooled.features(path)["loudness"] == pytest.approx(expected["loudness"])
+
+    def test_calm_by_features(self, tmp_path):
+        """Test that slow, quiet tracks are selected and loud fast ones are not."""
+        catalog = TrackCatalog(tmp_path / "catalog.db")
+        calm = write_sine(tmp_path / "calm.wav", freq=220, amplitude=0.05)
+        busy = write_clicks(tmp_path / "busy.wav", 160)
+        catalog.build([(calm, 1, 1), (busy, 1, 1)], workers=1)
+        analyze_catalog(catalog, workers=1)
+
+        assert [row["path"] for row in catalog.calm_by_features()] == [calm]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
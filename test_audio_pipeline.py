@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+import pytest
+
+from audio_pipeline import PcmRingBuffer, RingBufferOutput
+
+
+class TestPcmRingBuffer:
+    """Test suite for the preallocated PCM ring buffer."""
+
+    def test_wraparound_preserves_order(self):
+        """Test that frames come out in order across the end of the ring."""
+        ring = PcmRingBuffer(8, 1)
+        out = np.empty((5, 1), dtype=np.float32)
+
+        ring.write(np.arange(6, dtype=np.float32)[:, None])
+        assert ring.read_into(out) == 5
+        ring.write(np.arange(6, 12, dtype=np.float32)[:, None])
+
+        out = np.empty((8, 1), dtype=np.float32)
+        assert ring.read_into(out) == 7
+        assert out[:7, 0].tolist() == [5, 6, 7, 8, 9, 10, 11]
+
+    def test_write_blocks_until_space(self):
+        """Test that a full ring applies backpressure to the producer."""
+        ring = PcmRingBuffer(4, 1)
+        ring.write(np.ones((4, 1), dtype=np.float32))
+        assert ring.write(np.ones((1, 1), dtype=np.float32), timeout=0.05) == 0
+
+        done = threading.Event()
+        threading.Thread(target=lambda: (ring.write(np.ones((2, 1), dtype=np.float32)), done.set())).start()
+        assert not done.wait(0.05)
+        ring.read_into(np.empty((2, 1), dtype=np.float32))
+        assert done.wait(1)
+
+    def test_close_releases_writer(self):
+        """Test that close unblocks a waiting producer."""
+        ring = PcmRingBuffer(2, 1)
+        ring.write(np.ones((2, 1), dtype=np.float32))
+        result = []
+        writer = threading.Thread(target=lambda: result.append(ring.write(np.ones((3, 1), dtype=np.float32))))
+        writer.start()
+        ring.close()
+        writer.join(1)
+        assert result == [0]
+
+
+class TestRingBufferOutput:
+    """Test suite for the audio callback."""
+
+    def test_underrun_is_silence_and_counted(self):
+        """Test that a short ring pads with silence and records one underrun."""
+        ring = PcmRingBuffer(16, 2)
+        ring.write(np.full((3, 2), 0.5, dtype=np.float32))
+        output = RingBufferOutput(ring)
+        outdata = np.full((8, 2), 9.0, dtype=np.float32)
+
+        output(outdata, 8, None, None)
+
+        assert np.all(outdata[:3] == 0.5) and np.all(outdata[3:] == 0)
+        assert ring.stats()["underruns"] == 1
+        assert ring.stats()["underrun_frames"] == 5
+
+    def test_finished_and_paused_are_not_underruns(self):
+        """Test that silence after the end or while paused is not counted."""
+        ring = PcmRingBuffer(16, 1)
+        output = RingBufferOutput(ring)
+        outdata = np.empty((4, 1), dtype=np.float32)
+
+        output.paused = True
+        output(outdata, 4, None, None)
+        output.paused = False
+        output.finished = True
+        output(outdata, 4, None, None)
+
+        assert ring.stats()["underruns"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,96 @@
+import pytest
+from unittest.mock import MagicMock
+from device_registry import DeviceRegistry
+from focus_background import SpotifyPlayer
+from token_store import TokenStore
+
+
+DEVICES = [
+    {"id": "phone", "name": "Phone", "type": "Smartphone", "is_active": False},
+    {"id": "laptop", "name": "Laptop", "type": "Computer", "is_active": True},
+]
+
+
+class TestDeviceRegistry:
+    """Test suite for the shared device cache."""
+
+    def test_fetches_once_within_ttl(self):
+        """Test that repeated lookups reuse one fetch."""
+        fetch = MagicMock(return_value=DEVICES)
+        registry = DeviceRegistry(fetch, ttl=60)
+
+        registry.get_devices()
+        registry.get_devices()
+        registry.select_device()
+
+        assert fetch.call_count == 1
+        assert registry.stats() == {"fetches": 1, "hits": 2, "invalidations": 0}
+
+    def test_prefers_active_device(self):
+        """Test that the active device wins over list order."""
+        registry = DeviceRegistry(lambda: DEVICES)
+        assert registry.select_device() == "laptop"
+
+    def test_falls_back_to_first_device(self):
+        """Test that the first device is used when none is active."""
+        devices = [dict(d, is_active=False) for d in DEVICES]
+        registry = DeviceRegistry(lambda: devices)
+        assert registry.select_device() == "phone"
+
+    def test_empty_list_returns_none(self):
+        """Test that no devices selects nothing."""
+        assert DeviceRegistry(lambda: []).select_device() is None
+
+    def test_invalidate_and_refresh_refetch(self):
+        """Test that invalidate() and refresh=True both force a new fetch."""
+        fetch = MagicMock(return_value=DEVICES)
+        registry = DeviceRegistry(fetch, ttl=60)
+
+        registry.get_devices()
+        registry.invalidate()
+        registry.get_devices()
+        registry.get_devices(refresh=True)
+
+        assert fetch.call_count == 3
+
+
+class TestSpotifyPlayerDevices:
+    """Test suite for device lookups inside SpotifyPlayer."""
+
+    def make_player(self, tmp_path):
+        player = SpotifyPlayer(
+            "id", "secret", "http://localhost:8888/callback",
+            token_store=TokenStore(tmp_path / "token.json"),
+        )
+        player.access_token = "token"
+        player.http = MagicMock()
+        return player
+
+    def test_login_check_and_device_lookup_share_one_fetch(self, tmp_path):
+        """Test that test_login_status and get_active_device hit /devices once."""
+        player = self.make_player(tmp_path)
+        profile = MagicMock(status_code=200)
+        profile.json.return_value = {"display_name": "Test", "product": "premium"}
+        devices = MagicMock(status_code=200)
+        devices.json.return_value = {"devices": DEVICES}
+        player.http.get.side_effect = [profile, devices]
+
+        status = player.test_login_status()
+        device_id = player.get_active_device()
+
+        assert status["device_count"] == 2
+        assert device_id == "laptop"
+        assert player.http.get.call_count == 2
+
+    def test_rejected_playback_invalidates_devices(self, tmp_path):
+        """Test that a 404 from /me/player/play drops the cached devices."""
+        player = self.make_player(tmp_path)
+        player.devices.devices = DEVICES
+        player.http.put.return_value = MagicMock(status_code=404, text="")
+
+        assert player.start_playback("laptop", "spotify:playlist:1") is False
+        assert player.devices.devices is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,88 @@
+import pytest
+from bench_cue_latency import run_benchmark
+from fake_spotify_server import FakeSpotifyConfig, FakeSpotifyServer
+from focus_background import SpotifyPlayer
+from rate_limiter import RequestScheduler
+from token_store import TokenStore
+
+
+class TestAgainstFakeSpotify:
+    """End-to-end tests of SpotifyPlayer against the local fake API."""
+
+    def setup_method(self):
+        self.server = FakeSpotifyServer().start()
+
+    def teardown_method(self):
+        self.server.stop()
+
+    def make_player(self, tmp_path, **kwargs):
+        store = TokenStore(tmp_path / "token.json")
+        store.save("token", None)
+        player = SpotifyPlayer("id", "secret", "http://localhost:8888/callback",
+                               token_store=store, **kwargs)
+        return self.server.configure(player)
+
+    def test_cue_round_trips(self, tmp_path):
+        """Test that a cue does one search, one device fetch and one play call."""
+        player = self.make_player(tmp_path)
+
+        result = player.cue("focus", open_app_fallback=False)
+
+        assert result["success"] is True
+        assert self.server.hits == {
+            ("GET", "/v1/search"): 1,
+            ("GET", "/v1/me/player/devices"): 1,
+            ("PUT", "/v1/me/player/play"): 1,
+        }
+        assert player.http.connection_stats()["connections_reused"] == 2
+
+    def test_repeat_cue_skips_search(self, tmp_path):
+        """Test that a repeated cue is served from the search and device caches."""
+        player = self.make_player(tmp_path)
+
+        player.cue("calm", open_app_fallback=False)
+        player.cue("calm", open_app_fallback=False)
+
+        assert self.server.hits[("GET", "/v1/search")] == 1
+        assert self.server.hits[("GET", "/v1/me/player/devices")] == 1
+        assert self.server.hits[("PUT", "/v1/me/player/play")] == 2
+
+    def test_rate_limited_cue_still_succeeds(self, tmp_path):
+        """Test that 429s are retried instead of failing the cue."""
+        self.server.config.rate_limit_ratio = 0.5
+        self.server.config.retry_after = 0.01
+        player = self.make_player(tmp_path, scheduler=RequestScheduler(rate=100, max_retries=20))
+
+        result = player.cue("energize", open_app_fallback=False)
+
+        assert result["success"] is True
+
+    def test_refresh_token_grant(self, tmp_path):
+        """Test that an expired cached token is renewed through /api/token."""
+        store = TokenStore(tmp_path / "token.json")
+        store.save("stale", "fake-refresh", expires_in=0)
+        player = self.server.configure(SpotifyPlayer(
+            "id", "secret", "http://localhost:8888/callback", token_store=store,
+        ))
+
+        assert player.load_cached_token() is True
+        player.refresher.stop()
+
+        assert player.access_token.startswith("fake-access-")
+        assert self.server.hits[("POST", "/api/token")] == 1
+
+
+class TestCueBenchmark:
+    """Smoke test for the cue latency benchmark."""
+
+    def test_small_run(self):
+        """Test that a tiny benchmark run completes every cue."""
+        result = run_benchmark(users=5, cues_per_user=2, config=FakeSpotifyConfig(latency=0.001))
+
+        assert result["cues"] == 10
+        assert result["failures"] == 0
+        assert result["p50_ms"] <= result["p99_ms"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
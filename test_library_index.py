@@ -0,0 +1,116 @@
+import os
+import pytest
+from pathlib import Path
+from library_index import LibraryIndex
+from spotify_player import LocalMusicPlayer
+
+
+def make_library(root):
+    (root / "albums" / "calm").mkdir(parents=True)
+    (root / "albums" / "calm" / "01 rain.mp3").write_bytes(b"x" * 10)
+    (root / "albums" / "calm" / "02 waves.FLAC").write_bytes(b"x" * 20)
+    (root / "albums" / "calm" / "cover.jpg").write_bytes(b"x")
+    (root / "singles").mkdir()
+    (root / "singles" / "focus.ogg").write_bytes(b"x" * 30)
+    (root / "notes.txt").write_text("not music")
+
+
+def touch_dir(path, offset):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + offset))
+
+
+class TestLibraryIndex:
+    """Test suite for the single-pass incremental library indexer."""
+
+    def test_finds_all_extensions_in_one_pass(self, tmp_path):
+        """Test that every audio extension is matched, case-insensitively."""
+        make_library(tmp_path / "music")
+        index = LibraryIndex(tmp_path / "music", path=tmp_path / "index.json")
+
+        index.scan()
+
+        names = [p.name for p in index.tracks()]
+        assert names == ["01 rain.mp3", "02 waves.FLAC", "focus.ogg"]
+        assert index.tracks() == sorted(index.tracks())
+
+    def test_unchanged_library_lists_nothing(self, tmp_path):
+        """Test that a rescan from the saved index only stats directories."""
+        make_library(tmp_path / "music")
+        index = LibraryIndex(tmp_path / "music", path=tmp_path / "index.json")
+        index.scan()
+        index.save()
+
+        reloaded = LibraryIndex(tmp_path / "music", path=tmp_path / "index.json")
+        stats = reloaded.scan()
+
+        assert stats == {"dirs_listed": 0, "dirs_reused": 4, "files": 3}
+        assert reloaded.tracks() == index.tracks()
+
+    def test_only_changed_directory_is_relisted(self, tmp_path):
+        """Test that adding a file re-lists just its directory."""
+        make_library(tmp_path / "music")
+        index = LibraryIndex(tmp_path / "music", path=tmp_path / "index.json")
+        index.scan()
+
+        singles = tmp_path / "music" / "singles"
+        (singles / "new.wav").write_bytes(b"x")
+        touch_dir(singles, 1_000_000)
+        stats = index.scan()
+
+        assert stats["dirs_listed"] == 1
+        assert stats["files"] == 4
+
+    def test_removed_directory_drops_tracks(self, tmp_path):
+        """Test that deleting a subtree removes its files from the index."""
+        make_library(tmp_path / "music")
+        index = LibraryIndex(tmp_path / "music", path=tmp_path / "index.json")
+        index.scan()
+
+        for f in (tmp_path / "music" / "singles").iterdir():
+            f.unlink()
+        (tmp_path / "music" / "singles").rmdir()
+        touch_dir(tmp_path / "music", 1_000_000)
+        index.scan()
+
+        assert [p.name for p in index.tracks()] == ["01 rain.mp3", "02 waves.FLAC"]
+
+    def test_index_for_other_root_is_ignored(self, tmp_path):
+        """Test that an index saved for another directory is not reused."""
+        make_library(tmp_path / "music")
+        index = LibraryIndex(tmp_path / "music", path=tmp_path / "index.json")
+        index.scan()
+        index.save()
+
+        assert LibraryIndex(tmp_path / "other", path=tmp_path / "index.json").dirs == {}
+
+
+class TestLocalMusicPlayerScan:
+    """Test suite for LocalMusicPlayer.scan_all_audio_files."""
+
+    def test_scan_returns_sorted_paths(self, tmp_path):
+        """Test that the player returns the indexed tracks as Paths."""
+        make_library(tmp_path / "music")
+        player = LocalMusicPlayer(str(tmp_path / "music"), index_path=tmp_path / "index.json")
+
+        files = player.scan_all_audio_files()
+
+        assert all(isinstance(f, Path) for f in files)
+        assert len(files) == 3
+        assert (tmp_path / "index.json").exists()
+
+    def test_unchanged_scan_does_not_rewrite_index(self, tmp_path):
+        """Test that a scan which lists no directory leaves the saved index untouched."""
+        make_library(tmp_path / "music")
+        LocalMusicPlayer(str(tmp_path / "music"), index_path=tmp_path / "index.json").scan_all_audio_files()
+        before = (tmp_path / "index.json").stat().st_mtime_ns
+        os.utime(tmp_path / "index.json", ns=(before - 10**9, before - 10**9))
+
+        player = LocalMusicPlayer(str(tmp_path / "music"), index_path=tmp_path / "index.json")
+        assert len(player.scan_all_audio_files()) == 3
+        assert player.index.last_scan["dirs_listed"] == 0
+        assert (tmp_path / "index.json").stat().st_mtime_ns == before - 10**9
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+import os
+import queue
+import shutil
+import pytest
+from library_index import LibraryIndex
+from library_watcher import LibraryWatcher
+from spotify_player import LocalMusicPlayer
+
+
+def make_index(tmp_path):
+    music = tmp_path / "music"
+    (music / "album").mkdir(parents=True)
+    (music / "album" / "a.mp3").write_bytes(b"a")
+    index = LibraryIndex(music, path=tmp_path / "index.json")
+    index.scan()
+    return music, index
+
+
+class TestLibraryIndexRefresh:
+    """Test suite for applying directory-level changes to the index."""
+
+    def test_refresh_reports_added_and_removed(self, tmp_path):
+        """Test that re-listing one directory yields a file diff."""
+        music, index = make_index(tmp_path)
+        (music / "album" / "b.flac").write_bytes(b"b")
+        (music / "album" / "a.mp3").unlink()
+
+        changes = index.refresh([str(music / "album")])
+
+        assert [p for p, _, _ in changes["added"]] == [str(music / "album" / "b.flac")]
+        assert changes["removed"] == [str(music / "album" / "a.mp3")]
+
+    def test_refresh_walks_new_and_drops_old_subtrees(self, tmp_path):
+        """Test that a moved directory is dropped at its old path and added at the new one."""
+        music, index = make_index(tmp_path)
+        os.rename(music / "album", music / "renamed")
+
+        changes = index.refresh([str(music)])
+
+        assert [p for p, _, _ in changes["added"]] == [str(music / "renamed" / "a.mp3")]
+        assert changes["removed"] == [str(music / "album" / "a.mp3")]
+        assert [p.name for p in index.tracks()] == ["a.mp3"]
+
+
+class TestLibraryWatcher:
+    """Test suite for the live library watcher."""
+
+    @pytest.mark.parametrize("use_inotify", [True, False])
+    def test_burst_is_coalesced(self, tmp_path, use_inotify):
+        """Test that a burst of copies arrives as one batch, via inotify or polling."""
+        music, index = make_index(tmp_path)
+        batches = queue.Queue()
+        watcher = LibraryWatcher(index, on_change=batches.put, debounce=0.2,
+                                 poll_interval=0.3, use_inotify=use_inotify).start()
+        try:
+            new_album = music / "new album"
+            new_album.mkdir()
+            for i in range(20):
+                (new_album / f"{i:02d}.ogg").write_bytes(b"x")
+            if not use_inotify:
+                os.utime(music, ns=(0, os.stat(music).st_mtime_ns + 1_000_000))
+
+            changes = batches.get(timeout=5)
+        finally:
+            watcher.stop()
+
+        assert len(changes["added"]) == 20
+        assert batches.empty()
+        assert len(index) == 21
+        assert LibraryIndex(music, path=tmp_path / "index.json").dirs == index.dirs
+
+    def test_delete_updates_catalog(self, tmp_path):
+        """Test that LocalMusicPlayer.watch removes deleted tracks from the catalog."""
+        music, _ = make_index(tmp_path)
+        player = LocalMusicPlayer(str(music), index_path=tmp_path / "index.json",
+                                  catalog_path=tmp_path / "catalog.db")
+        player.build_catalog(workers=1)
+        batches = queue.Queue()
+        player.watch(on_change=batches.put, debounce=0.2)
+        try:
+            shutil.rmtree(music / "album")
+            batches.get(timeout=5)
+        finally:
+            player.watcher.stop()
+
+        assert len(player.catalog) == 0
+        assert player.index.tracks() == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+
+import playback_engine
+import spotify_player
+from loudness import REFERENCE_LUFS, compute_gains, update_gains
+from playback_engine import TrackDecoder
+from spotify_player import LocalMusicPlayer
+from test_playback_engine import FakeOutputStream
+from track_catalog import TrackCatalog
+
+
+def write_sine(path, amplitude, seconds=2.0, samplerate=48000):
+    t = np.arange(int(seconds * samplerate)) / samplerate
+    sf.write(str(path), (amplitude * np.sin(2 * np.pi * 997 * t)).astype(np.float32), samplerate)
+    return str(path)
+
+
+def row(path, loudness, peak, album=None, duration=60.0):
+    return {"path": path, "album": album, "loudness": loudness, "peak": peak, "duration": duration}
+
+
+class TestComputeGains:
+    """Test suite for vectorized track and album gain computation."""
+
+    def test_track_and_album_gains(self):
+        """Test that album loudness is the duration-weighted power mean of its tracks."""
+        gains = compute_gains([
+            row("/a/1.flac", -12.0, 0.5, duration=100),
+            row("/a/2.flac", -22.0, 0.1, duration=100),
+            row("/b/1.flac", -30.0, 0.01),
+        ])
+        by_path = {g[0]: g for g in gains}
+
+        assert by_path["/a/1.flac"][2] == pytest.approx(REFERENCE_LUFS + 12)
+        album = 10 * np.log10((10 ** -1.2 + 10 ** -2.2) / 2)
+        assert by_path["/a/2.flac"][4] == pytest.approx(REFERENCE_LUFS - album)
+        assert by_path["/a/1.flac"][4] == by_path["/a/2.flac"][4]
+        assert by_path["/a/1.flac"][5] == 0.5
+        assert by_path["/b/1.flac"][1] != by_path["/a/1.flac"][1]
+
+    def test_gain_is_limited_by_peak(self):
+        """Test that a quiet track with a hot peak is not boosted into clipping."""
+        (_, _, track_gain, _, _, _), = compute_gains([row("/x.flac", -30.0, 0.9)])
+        assert track_gain == pytest.approx(-20 * np.log10(0.9))
+
+
+class TestLoudnessNormalization:
+    """Test suite for cached gains applied by the decoder."""
+
+    def test_gains_equalize_playback_level(self, tmp_path):
+        """Test that a quiet and a loud track decode at the same level once normalized."""
+        catalog = TrackCatalog(tmp_path / "catalog.db")
+        quiet = write_sine(tmp_path / "quiet.wav", 0.05)
+        loud = write_sine(tmp_path / "loud.wav", 0.4)
+        catalog.build([(quiet, 1, 1), (loud, 1, 1)], workers=1)
+
+        stats = update_gains(catalog, workers=1)
+        assert (stats["analyzed"], stats["tracks"]) == (2, 2)
+
+        levels = []
+        for path in (quiet, loud):
+            decoder = TrackDecoder(path, 48000, 1, gain_db=catalog.gain(path, mode="track"))
+            levels.append(float(np.sqrt(np.mean(decoder.read(48000) ** 2))))
+            decoder.close()
+        assert levels[0] == pytest.approx(levels[1], rel=0.02)
+
+        assert update_gains(catalog, workers=1)["analyzed"] == 0
+
+    def test_unanalyzed_track_has_no_gain(self, tmp_path):
+        """Test that gain() returns None before analysis so playback stays at unity."""
+        catalog = TrackCatalog(tmp_path / "catalog.db")
+        assert catalog.gain(str(tmp_path / "missing.wav")) is None
+
+
+class TestLocalMusicPlayerGains:
+    """Test suite for gains reaching playback through LocalMusicPlayer."""
+
+    def test_fresh_player_uses_saved_catalog(self, tmp_path, monkeypatch):
+        """Test that a new player instance applies gains and records plays from an existing catalog."""
+        music = tmp_path / "music"
+        music.mkdir()
+        quiet = write_sine(music / "quiet.wav", 0.05, seconds=0.5)
+        loud = write_sine(music / "loud.wav", 0.4, seconds=0.5)
+        paths = {"index_path": tmp_path / "index.json", "catalog_path": tmp_path / "catalog.db"}
+        builder = LocalMusicPlayer(str(music), **paths)
+        builder.build_catalog(workers=1)
+        builder.analyze_loudness(workers=1)
+        expected = {path: builder.catalog.gain(path) for path in (quiet, loud)}
+
+        applied = {}
+
+        class RecordingDecoder(TrackDecoder):
+            def __init__(self, path, samplerate, channels, gain_db=0.0):
+                applied[path] = gain_db
+                super().__init__(path, samplerate, channels, gain_db=gain_db)
+
+        monkeypatch.setattr(playback_engine, "TrackDecoder", RecordingDecoder)
+        monkeypatch.setattr(playback_engine, "open_output_stream", FakeOutputStream)
+        monkeypatch.setattr(spotify_player, "playback_available", lambda: True)
+
+        player = LocalMusicPlayer(str(music), **paths)
+        assert player.catalog is None
+        assert player.play_all() is True
+
+        assert applied == pytest.approx(expected)
+        assert all(gain is not None and gain != 0.0 for gain in expected.values())
+        assert all(row["last_played"] is not None for row in player.catalog.query())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from lyria_cache import (FakeLiveMusicSession, LyriaCache, RecordingSession, ReplaySource,
+                         SegmentRecorder, cache_key)
+from lyria_controller import LyriaController
+from lyria_stream import StreamingPlayer
+
+
+def make_cache(tmp_path, **kwargs):
+    kwargs.setdefault("min_seconds", 0.1)
+    return LyriaCache(tmp_path / "cache", **kwargs)
+
+
+async def record(cache, prompts, config, chunks=10):
+    """Run a fake session through a RecordingSession until it stops sending"""
+    recording = RecordingSession(FakeLiveMusicSession(max_chunks=chunks), cache)
+    await recording.set_weighted_prompts(prompts=prompts)
+    await recording.set_music_generation_config(config=config)
+    await recording.play()
+    received = [m.server_content.audio_chunks[0].data async for m in recording.receive()]
+    await recording.close()
+    return b"".join(received)
+
+
+class TestCacheKey:
+    """Test suite for content addressing of generation settings."""
+
+    def test_key_ignores_order_and_representation(self):
+        """Test that equivalent prompts and configs share one key."""
+        a = cache_key([("rain", 0.5), ("piano", 1.0)], {"bpm": 70, "temperature": 1.0})
+        b = cache_key([{"text": "piano", "weight": 1.0}, {"text": "rain", "weight": 0.5}],
+                      {"temperature": 1.0, "bpm": 70, "density": None})
+        assert a == b
+        assert a != cache_key([("rain", 0.5), ("piano", 1.0)], {"bpm": 71, "temperature": 1.0})
+
+
+class TestLyriaCache:
+    """Test suite for recording, replaying and evicting generated audio."""
+
+    def test_record_then_replay_without_api_calls(self, tmp_path):
+        """Test that a recorded setting replays byte-for-byte from the memory map."""
+        cache = make_cache(tmp_path)
+        prompts, config = [("calm piano", 1.0)], {"bpm": 70}
+        recorded = asyncio.run(record(cache, prompts, config))
+
+        replay = LyriaCache(tmp_path / "cache").lookup(prompts, config)
+        assert isinstance(replay, ReplaySource)
+        replay.loop = False
+
+        async def drain():
+            return b"".join([bytes(m.server_content.audio_chunks[0].data) async for m in replay.receive()])
+
+        assert asyncio.run(drain()) == recorded
+        assert isinstance(replay.frames, np.memmap)
+        assert replay.api_calls == 0
+
+    def test_short_recordings_are_discarded(self, tmp_path):
+        """Test that segments under min_seconds are not stored."""
+        cache = make_cache(tmp_path, min_seconds=60)
+        asyncio.run(record(cache, [("x", 1.0)], {"bpm": 90}))
+        assert cache.stats()["segments"] == 0
+        assert not list((tmp_path / "cache").glob("*.part"))
+
+    def test_lru_eviction_respects_size_bound(self, tmp_path):
+        """Test that the least recently used segment goes first when over budget."""
+        segment_bytes = 10 * 4800 * 4
+        cache = make_cache(tmp_path, max_bytes=2 * segment_bytes)
+
+        asyncio.run(record(cache, [("a", 1.0)], {"bpm": 60}))
+        asyncio.run(record(cache, [("b", 1.0)], {"bpm": 60}))
+        assert cache.lookup([("a", 1.0)], {"bpm": 60}) is not None
+        asyncio.run(record(cache, [("c", 1.0)], {"bpm": 60}))
+
+        assert cache.lookup([("b", 1.0)], {"bpm": 60}) is None
+        assert cache.lookup([("a", 1.0)], {"bpm": 60}) is not None
+        assert cache.stats()["bytes"] <= 2 * segment_bytes
+        assert cache.stats()["evictions"] == 1
+        assert len(list((tmp_path / "cache").glob("*.pcm"))) == 2
+
+    def test_writes_run_off_the_event_loop(self, tmp_path, monkeypatch):
+        """Test that segment writes happen on a worker thread, not the loop's thread."""
+        threads = set()
+        original = SegmentRecorder.write
+
+        def write(self, data):
+            threads.add(threading.get_ident())
+            original(self, data)
+
+        monkeypatch.setattr(SegmentRecorder, "write", write)
+        cache = make_cache(tmp_path)
+        recorded = asyncio.run(record(cache, [("calm", 1.0)], {"bpm": 70}))
+
+        assert threads and threading.get_ident() not in threads
+        assert cache.stats()["bytes"] == len(recorded)
+
+    def test_failed_write_discards_only_its_segment(self, tmp_path, monkeypatch):
+        """Test that a write error drops that segment's .part file and later segments still land."""
+        cache = make_cache(tmp_path)
+        bad = cache_key([("bad", 1.0)], {"bpm": 60})
+        original = SegmentRecorder.write
+
+        def write(self, data):
+            if self.key == bad:
+                raise OSError("disk full")
+            original(self, data)
+
+        monkeypatch.setattr(SegmentRecorder, "write", write)
+
+        async def scenario():
+            recording = RecordingSession(FakeLiveMusicSession(max_chunks=20), cache)
+            await recording.set_weighted_prompts(prompts=[("bad", 1.0)])
+            await recording.set_music_generation_config(config={"bpm": 60})
+            await recording.play()
+            received = 0
+            async for _ in recording.receive():
+                received += 1
+                if received == 10:
+                    await recording.set_weighted_prompts(prompts=[("good", 1.0)])
+            await recording.close()
+
+        asyncio.run(scenario())
+        assert cache.lookup([("bad", 1.0)], {"bpm": 60}) is None
+        assert cache.lookup([("good", 1.0)], {"bpm": 60}) is not None
+        assert not list((tmp_path / "cache").glob("*.part"))
+
+
+class TestReplayPlayback:
+    """Test suite for driving the player and controller from a replay."""
+
+    def test_controller_switches_between_cached_settings(self, tmp_path):
+        """Test that steering a replay jumps to another cached setting offline."""
+        cache = make_cache(tmp_path)
+        asyncio.run(record(cache, [("calm", 1.0)], {"bpm": 60}))
+        asyncio.run(record(cache, [("focus", 1.0)], {"bpm": 90}))
+        target = cache_key([("focus", 1.0)], {"bpm": 90})
+
+        async def scenario():
+            replay = cache.lookup([("calm", 1.0)], {"bpm": 60})
+            player = StreamingPlayer(buffer_seconds=0.5, prefill_seconds=0)
+            controller = LyriaController(replay, player, min_interval=0)
+            await controller.start([("calm", 1.0)], bpm=60)
+            controller.submit(prompts=[("focus", 1.0)], bpm=90)
+            await asyncio.sleep(0.05)
+            player.buffer.ring.read_into(np.empty((24000, 2), dtype=np.float32))
+            await asyncio.sleep(0.05)
+            await controller.stop()
+            return replay
+
+        assert asyncio.run(scenario()).key == target
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
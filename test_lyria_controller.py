@@ -0,0 +1,133 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from audio_pipeline import PcmRingBuffer
+from lyria_controller import LyriaController
+from lyria_stream import StreamingPlayer
+
+
+class RecordingSession:
+    """Records every call a LyriaController makes; audio is steady silence"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def set_weighted_prompts(self, prompts):
+        self.calls.append(("prompts", prompts))
+
+    async def set_music_generation_config(self, config):
+        self.calls.append(("config", config))
+
+    async def reset_context(self):
+        self.calls.append(("reset", None))
+
+    async def play(self):
+        self.calls.append(("play", None))
+
+    async def receive(self):
+        while True:
+            await asyncio.sleep(3600)
+            yield None
+
+    def named(self, name):
+        return [arg for call, arg in self.calls if call == name]
+
+
+def make_controller(**kwargs):
+    session = RecordingSession()
+    player = StreamingPlayer(samplerate=1000, buffer_seconds=1.0, prefill_seconds=0)
+    return session, player, LyriaController(session, player, **kwargs)
+
+
+class TestCrossfade:
+    """Test suite for crossfading new audio over the buffered tail."""
+
+    def test_mix_tail_fades_old_into_new(self):
+        """Test that the overlap ramps from the old audio to the new audio."""
+        ring = PcmRingBuffer(16, 1)
+        ring.write(np.ones((10, 1), dtype=np.float32))
+        ring.truncate(5)
+
+        mixed = ring.mix_tail(np.zeros((5, 1), dtype=np.float32))
+        out = np.empty((16, 1), dtype=np.float32)
+        count = ring.read_into(out)
+
+        assert mixed == 5 and count == 5
+        assert np.allclose(out[:5, 0], [1.0, 0.75, 0.5, 0.25, 0.0])
+
+    def test_jitter_buffer_crossfades_next_put(self):
+        """Test that begin_crossfade keeps a short tail and blends the next chunk over it."""
+        async def scenario():
+            player = StreamingPlayer(samplerate=1000, channels=1, buffer_seconds=1.0, prefill_seconds=0)
+            await player.buffer.put(np.ones((800, 1), dtype=np.float32))
+            player.buffer.begin_crossfade(100)
+            await player.buffer.put(np.zeros((300, 1), dtype=np.float32))
+            return player.buffer.ring
+
+        ring = asyncio.run(scenario())
+        out = np.empty((1000, 1), dtype=np.float32)
+        count = ring.read_into(out)
+
+        assert count == 100 + 200
+        assert out[0, 0] == 1.0 and out[99, 0] == 0.0
+        assert np.all(np.diff(out[:100, 0]) < 0)
+
+
+class TestLyriaController:
+    """Test suite for live steering of one warm session."""
+
+    def test_updates_are_coalesced_and_rate_limited(self):
+        """Test that a burst of updates becomes one call with the latest values merged."""
+        async def scenario():
+            session, player, controller = make_controller(min_interval=0.2)
+            await controller.start([("elevator music", 1.0)], bpm=90, temperature=1.0)
+
+            for stress in (0.1, 0.5, 0.9):
+                controller.steer_for_stress(stress)
+            controller.submit(temperature=1.3)
+            await asyncio.sleep(0.4)
+            await controller.stop()
+            return session, controller
+
+        session, controller = asyncio.run(scenario())
+
+        assert len(session.named("play")) == 1
+        assert len(session.named("prompts")) == 2
+        assert session.named("prompts")[-1][0]["weight"] == 0.9
+        assert session.named("config")[-1] == {"bpm": 67, "temperature": 1.3}
+        assert controller.counters["applied"] == 1
+        assert controller.counters["coalesced"] == 3
+        assert controller.counters["context_resets"] == 1
+
+    def test_unchanged_update_is_not_sent(self):
+        """Test that re-submitting the current state makes no session calls."""
+        async def scenario():
+            session, player, controller = make_controller(min_interval=0)
+            await controller.start([("calm piano", 1.0)], bpm=70)
+            calls = len(session.calls)
+            controller.submit(prompts=[("calm piano", 1.0)], bpm=70)
+            await asyncio.sleep(0.05)
+            await controller.stop()
+            return session, calls, controller
+
+        session, calls, controller = asyncio.run(scenario())
+        assert len(session.calls) == calls
+        assert controller.counters["applied"] == 0
+
+    def test_stop_applies_pending_updates(self):
+        """Test that stop() flushes queued updates before shutting down."""
+        async def scenario():
+            session, player, controller = make_controller(min_interval=10)
+            await controller.start([("calm piano", 1.0)], bpm=70)
+            controller.last_applied = None
+            controller.submit(temperature=0.5)
+            await controller.stop()
+            return session
+
+        assert asyncio.run(scenario()).named("config")[-1] == {"bpm": 70, "temperature": 0.5}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
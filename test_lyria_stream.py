@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from lyria_stream import JitterBuffer, StreamingPlayer
+
+
+class FakeCallbackStream:
+    """Pulls from the callback on its own thread at roughly real time"""
+
+    def __init__(self, samplerate, channels, blocksize, latency, callback, dtype="float32"):
+        self.channels = channels
+        self.blocksize = blocksize or 480
+        self.period = self.blocksize / samplerate
+        self.callback = callback
+        self.dtype = dtype
+        self.blocks = []
+        self.running = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.running.set()
+        self.thread = threading.Thread(target=self.pump, daemon=True)
+        self.thread.start()
+
+    def pump(self):
+        while self.running.is_set():
+            outdata = np.empty((self.blocksize, self.channels), dtype=self.dtype)
+            self.callback(outdata, self.blocksize, None, None)
+            self.blocks.append(outdata)
+            time.sleep(self.period)
+
+    def stop(self):
+        self.running.clear()
+        self.thread.join()
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, chunks):
+        self.turns = [chunks]
+
+    async def receive(self):
+        chunks = self.turns.pop(0) if self.turns else []
+        for data in chunks:
+            yield SimpleNamespace(server_content=SimpleNamespace(
+                audio_chunks=[SimpleNamespace(data=data)]))
+
+
+def pcm_chunk(frames, value, channels=2):
+    return np.full((frames, channels), value, dtype=np.int16).tobytes()
+
+
+def split_unevenly(data, sizes=(1, 3, 5, 7)):
+    """Cut a byte stream so chunk edges land mid-sample and mid-frame"""
+    pieces, start, i = [], 0, 0
+    while start < len(data):
+        size = sizes[i % len(sizes)] * 97
+        pieces.append(data[start:start + size])
+        start += size
+        i += 1
+    return pieces
+
+
+class TestJitterBuffer:
+    """Test suite for the async-to-callback jitter buffer."""
+
+    def test_put_waits_for_space(self):
+        """Test that put() suspends on a full buffer and resumes once the callback drains."""
+        async def scenario():
+            buffer = JitterBuffer(100, channels=1)
+            await buffer.put(np.ones((100, 1), dtype=np.float32))
+
+            pending = asyncio.ensure_future(buffer.put(np.ones((50, 1), dtype=np.float32)))
+            await asyncio.sleep(0.05)
+            assert not pending.done()
+
+            outdata = np.empty((60, 1), dtype=np.float32)
+            await asyncio.to_thread(buffer, outdata, 60, None, None)
+            return await asyncio.wait_for(pending, 1)
+
+        assert asyncio.run(scenario()) == 50
+
+    def test_waiting_receiver_is_idle(self):
+        """Test that a receiver blocked on a full buffer uses almost no CPU."""
+        async def scenario():
+            buffer = JitterBuffer(10, channels=1)
+            await buffer.put(np.ones((10, 1), dtype=np.float32))
+            pending = asyncio.ensure_future(buffer.put(np.ones((10, 1), dtype=np.float32)))
+            started = time.process_time()
+            await asyncio.sleep(0.3)
+            used = time.process_time() - started
+            buffer.close()
+            await pending
+            return used
+
+        assert asyncio.run(scenario()) < 0.05
+
+    def test_prefill_and_underrun(self):
+        """Test that playback waits for prefill and an underrun is silence, counted once."""
+        async def scenario():
+            buffer = JitterBuffer(100, channels=1, prefill=20)
+            outdata = np.full((10, 1), 7, dtype=np.float32)
+
+            await buffer.put(np.ones((10, 1), dtype=np.float32))
+            buffer(outdata, 10, None, None)
+            assert np.all(outdata == 0) and buffer.ring.available == 10
+
+            await buffer.put(np.ones((15, 1), dtype=np.float32))
+            outdata = np.empty((30, 1), dtype=np.float32)
+            buffer(outdata, 30, None, None)
+            assert np.all(outdata[:25] == 1) and np.all(outdata[25:] == 0)
+            return buffer.stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["underruns"] == 1
+        assert stats["underrun_frames"] == 5
+        assert not stats["primed"]
+
+
+class TestStreamingPlayer:
+    """Test suite for streaming a live session to a callback output."""
+
+    def test_session_audio_plays_in_order(self):
+        """Test that every received chunk reaches the output, in order, without underruns."""
+        chunks = split_unevenly(b"".join(pcm_chunk(480, (i + 1) * 1024) for i in range(20)))
+
+        async def scenario():
+            player = StreamingPlayer(buffer_seconds=0.05, prefill_seconds=0.02,
+                                     output_factory=FakeCallbackStream).start()
+            await player.receive(FakeSession(chunks))
+            await player.drain(timeout=5)
+            stream = player.stream
+            player.close()
+            return player, stream
+
+        player, stream = asyncio.run(scenario())
+
+        left = np.concatenate(stream.blocks)[:, 0]
+        audible = left[left != 0]
+        assert audible.tolist() == [v / 32 for v in range(1, 21) for _ in range(480)]
+        assert player.stats()["chunks"] == len(chunks)
+        assert player.stats()["underruns"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
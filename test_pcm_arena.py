@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from bench_chunk_assembly import run_benchmark
+from pcm_arena import ChunkAssembler, apply_gain
+
+
+def interleaved(frames, channels=2):
+    return np.arange(frames * channels, dtype=np.int16).reshape(frames, channels)
+
+
+class TestChunkAssembler:
+    """Test suite for assembling PCM chunks in a preallocated arena."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 4, 7, 1000])
+    def test_split_samples_and_frames(self, chunk_size):
+        """Test that chunk edges inside a sample or frame lose nothing."""
+        source = interleaved(600)
+        data = source.tobytes()
+        assembler = ChunkAssembler(channels=2, capacity_frames=64)
+
+        pieces = []
+        for start in range(0, len(data), chunk_size):
+            pieces.append(assembler.push(data[start:start + chunk_size]).copy())
+
+        assembled = np.concatenate(pieces)
+        assert assembler.carry == 0
+        assert np.allclose(assembled * 32768, source)
+
+    def test_gain_applied_during_conversion(self):
+        """Test that gain is folded into the int16 -> float32 pass."""
+        assembler = ChunkAssembler(channels=1, gain=0.5)
+        frames = assembler.push(np.full(8, 16384, dtype=np.int16).tobytes())
+        assert frames.dtype == np.float32
+        assert np.allclose(frames, 0.25)
+
+        assembler.set_gain(2.0)
+        assert np.allclose(assembler.push(np.full(8, 8192, dtype=np.int16).tobytes()), 0.5)
+
+    def test_output_is_a_view_into_the_arena(self):
+        """Test that push() returns arena memory and only grows for an oversized chunk."""
+        assembler = ChunkAssembler(channels=2, capacity_frames=16)
+        first = assembler.push(interleaved(8).tobytes())
+        assert np.shares_memory(first, assembler.output)
+
+        assembler.push(interleaved(100).tobytes())
+        assert assembler.counters["grows"] == 1
+        assembler.push(interleaved(100).tobytes())
+        assert assembler.counters["grows"] == 1
+
+    def test_apply_gain_in_place(self):
+        """Test that apply_gain scales without a new array."""
+        frames = np.ones((4, 2), dtype=np.float32)
+        assert apply_gain(frames, 0.5) is frames
+        assert np.all(frames == 0.5)
+
+
+class TestChunkAllocations:
+    """Test suite for the tracemalloc allocation benchmark."""
+
+    def test_no_per_chunk_allocations(self):
+        """Test that the assembled path allocates no chunk-sized buffers while streaming."""
+        assembled = run_benchmark(chunks=500, chunk_bytes=3841, path="assembled")
+        naive = run_benchmark(chunks=500, chunk_bytes=3841, path="naive")
+
+        assert assembled["peak_per_chunk_bytes"] < 0.5
+        assert assembled["net_bytes"] < 1024
+        assert naive["peak_bytes"] > 4 * assembled["peak_bytes"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,268 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+
+import playback_engine
+from playback_engine import PlaybackEngine, TrackDecoder
+from playback_queue import PlaybackQueue
+
+
+class FakeOutputStream:
+    """Drives the engine's callback from a thread, like a sounddevice stream"""
+
+    def __init__(self, samplerate, channels, blocksize, latency, callback, period=0.0005):
+        self.period = period
+        self.channels = channels
+        self.blocksize = blocksize
+        self.callback = callback
+        self.blocks = []
+        self.started = False
+        self.closed = False
+        self.running = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.started = True
+        self.running.set()
+        self.thread = threading.Thread(target=self.pump, daemon=True)
+        self.thread.start()
+
+    def pump(self):
+        while self.running.is_set():
+            outdata = np.empty((self.blocksize, self.channels), dtype=np.float32)
+            self.callback(outdata, self.blocksize, None, None)
+            self.blocks.append(outdata)
+            time.sleep(self.period)
+
+    def stop(self):
+        self.running.clear()
+        if self.thread:
+            self.thread.join()
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def frames(self):
+        frames = np.concatenate(self.blocks) if self.blocks else np.zeros((0, self.channels))
+        return frames[np.any(frames != 0, axis=1)]
+
+
+def write_tone(path, seconds, samplerate=8000, channels=1, value=0.5):
+    data = np.full((int(seconds * samplerate), channels), value, dtype=np.float32)
+    sf.write(str(path), data, samplerate)
+    return str(path)
+
+
+class TestPlaybackQueue:
+    """Test suite for queue ordering operations."""
+
+    def test_advance_skip_and_peek(self):
+        """Test that advance, skip and peek follow queue order."""
+        queue = PlaybackQueue(["a", "b", "c", "d"], lookahead=2)
+        assert queue.advance() == "a"
+        assert queue.peek() == ["b", "c"]
+        assert queue.skip(2) == "c"
+        assert queue.peek() == ["d"]
+        assert queue.advance() == "d"
+        assert queue.advance() is None
+
+    def test_shuffle_keeps_tracks(self):
+        """Test that shuffle only reorders upcoming tracks."""
+        queue = PlaybackQueue([str(i) for i in range(50)])
+        queue.advance()
+        queue.shuffle(seed=1)
+        assert sorted(queue.upcoming, key=int) == [str(i) for i in range(1, 50)]
+        assert list(queue.upcoming) != [str(i) for i in range(1, 50)]
+
+    def test_enqueue_next(self):
+        """Test that enqueue_next jumps the line."""
+        queue = PlaybackQueue(["a", "b"])
+        queue.enqueue_next("urgent")
+        assert queue.advance() == "urgent"
+
+
+class TestTrackDecoder:
+    """Test suite for format conversion while decoding."""
+
+    def test_mono_to_stereo(self, tmp_path):
+        """Test that mono files are duplicated onto both channels."""
+        decoder = TrackDecoder(write_tone(tmp_path / "m.wav", 0.1), 8000, 2)
+        block = decoder.read(400)
+        assert block.shape == (400, 2)
+        assert np.allclose(block, 0.5, atol=1e-3)
+        decoder.close()
+
+    def test_resampled_length(self, tmp_path):
+        """Test that a 1 s file at 8 kHz yields about 1 s at 16 kHz."""
+        decoder = TrackDecoder(write_tone(tmp_path / "r.wav", 1.0), 16000, 1)
+        total = 0
+        while True:
+            block = decoder.read(1000)
+            if len(block) == 0:
+                break
+            total += len(block)
+        decoder.close()
+        assert abs(total - 16000) <= 4
+
+
+class TestPlaybackEngine:
+    """Test suite for the single-output playback engine."""
+
+    def run_engine(self, queue, **kwargs):
+        streams = []
+
+        def factory(*args):
+            streams.append(FakeOutputStream(*args))
+            return streams[-1]
+
+        engine = PlaybackEngine(queue, samplerate=8000, channels=2, blocksize=256,
+                                output_factory=factory, **kwargs)
+        engine.play().wait(timeout=10)
+        return engine, streams
+
+    def test_plays_queue_on_one_stream(self, tmp_path):
+        """Test that every track goes through a single output stream."""
+        tracks = [write_tone(tmp_path / f"{i}.wav", 0.25) for i in range(5)]
+        started = []
+
+        engine, streams = self.run_engine(PlaybackQueue(tracks), on_track_start=started.append)
+
+        assert len(streams) == 1
+        assert streams[0].closed
+        assert started == tracks
+        assert len(streams[0].frames) == 5 * 2000
+
+    def test_at_most_two_files_open(self, tmp_path, monkeypatch):
+        """Test that only the current and next track are open at once."""
+        tracks = [write_tone(tmp_path / f"{i}.wav", 0.05) for i in range(20)]
+        open_files = set()
+        peak = []
+        real_soundfile = sf.SoundFile
+
+        class CountingSoundFile(real_soundfile):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                open_files.add(id(self))
+                peak.append(len(open_files))
+
+            def close(self):
+                open_files.discard(id(self))
+                super().close()
+
+        monkeypatch.setattr(playback_engine.sf, "SoundFile", CountingSoundFile)
+        self.run_engine(PlaybackQueue(tracks))
+
+        assert max(peak) <= 2
+        assert not open_files
+
+    def test_undecodable_track_is_skipped(self, tmp_path):
+        """Test that a broken file is skipped instead of stopping playback."""
+        broken = tmp_path / "broken.mp3"
+        broken.write_bytes(b"not audio")
+        good = write_tone(tmp_path / "good.wav", 0.1)
+
+        engine, streams = self.run_engine(PlaybackQueue([str(broken), good]))
+
+        assert engine.counters["decode_errors"] == 1
+        assert engine.counters["tracks_played"] == 1
+
+    def test_tracks_are_gapless(self, tmp_path):
+        """Test that consecutive tracks reach the callback with no silence between them."""
+        tracks = [write_tone(tmp_path / f"{i}.wav", 0.2, value=0.1 * (i + 1)) for i in range(3)]
+
+        engine, streams = self.run_engine(PlaybackQueue(tracks), buffer_seconds=1.0)
+
+        output = np.concatenate(streams[0].blocks)[:, 0]
+        audible = np.flatnonzero(output)
+        assert len(audible) == 3 * 1600
+        assert audible[-1] - audible[0] == len(audible) - 1
+        assert engine.stats()["underruns"] == 0
+
+    def test_pause_outputs_silence(self, tmp_path):
+        """Test that pause keeps the stream running but stops draining the ring."""
+        track = write_tone(tmp_path / "long.wav", 1.0)
+        streams = []
+
+        def factory(*args):
+            streams.append(FakeOutputStream(*args))
+            return streams[-1]
+
+        engine = PlaybackEngine(PlaybackQueue([track]), samplerate=8000, channels=2,
+                                blocksize=256, buffer_seconds=0.5, output_factory=factory)
+        engine.pause()
+        engine.play()
+        time.sleep(0.2)
+        assert engine.stats()["frames_read"] == 0
+        engine.resume()
+        engine.wait(timeout=10)
+
+        assert engine.stats()["frames_read"] == 8000
+        assert streams[0].closed
+
+    def test_skip_drops_buffered_audio(self, tmp_path):
+        """Test that skip moves on without playing out the buffered remainder."""
+        tracks = [write_tone(tmp_path / "a.wav", 2.0), write_tone(tmp_path / "b.wav", 0.1)]
+        started = []
+
+        def realtime(*args):
+            return FakeOutputStream(*args, period=256 / 8000)
+
+        engine = PlaybackEngine(PlaybackQueue(tracks), samplerate=8000, channels=2, blocksize=256,
+                                buffer_seconds=0.5, on_track_start=started.append,
+                                output_factory=realtime)
+        engine.play()
+        time.sleep(0.05)
+        engine.skip()
+        engine.wait(timeout=10)
+
+        assert started == tracks
+        assert engine.counters["tracks_skipped"] == 1
+        assert engine.stats()["frames_read"] < 16000 + 800
+
+    def test_missing_output_device_raises_from_play(self, tmp_path):
+        """Test that an output that cannot be opened raises to the caller of play()."""
+        def unavailable(*args):
+            raise OSError("Error querying device -1")
+
+        engine = PlaybackEngine(PlaybackQueue([write_tone(tmp_path / "a.wav", 0.1)]),
+                                samplerate=8000, output_factory=unavailable)
+        with pytest.raises(OSError):
+            engine.play()
+        assert engine.thread is None
+
+
+class TestLocalMusicPlayerPlayback:
+    """Test suite for LocalMusicPlayer.play_all's output fallback."""
+
+    def test_falls_back_to_playlist_without_device(self, tmp_path, monkeypatch):
+        """Test that play_all hands the queue to the media player when no device opens."""
+        import spotify_player
+
+        music = tmp_path / "music"
+        music.mkdir()
+        write_tone(music / "a.wav", 0.1)
+
+        def unavailable(*args):
+            raise OSError("no default output device")
+
+        launched = []
+        monkeypatch.setattr(playback_engine, "open_output_stream", unavailable)
+        monkeypatch.setattr(spotify_player, "playback_available", lambda: True)
+        monkeypatch.setattr(spotify_player.os, "name", "posix")
+        monkeypatch.setattr(spotify_player.subprocess, "Popen", launched.append)
+
+        player = spotify_player.LocalMusicPlayer(str(music), index_path=tmp_path / "index.json",
+                                                 catalog_path=tmp_path / "catalog.db",
+                                                 similarity_path=tmp_path / "similarity.npz")
+        assert player.play_all() is True
+        assert launched == [["xdg-open", str(tmp_path / "queue.m3u")]]
+        assert player.engine is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
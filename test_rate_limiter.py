@@ -0,0 +1,98 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from rate_limiter import PRIORITY_BACKGROUND, PRIORITY_CUE, RequestScheduler
+
+
+def response(status, headers=None):
+    return MagicMock(status_code=status, headers=headers or {})
+
+
+class TestRequestScheduler:
+    """Test suite for token-bucket pacing and retries."""
+
+    def test_burst_then_paced(self):
+        """Test that requests beyond the burst wait for the refill rate."""
+        scheduler = RequestScheduler(rate=20, burst=2)
+        start = time.perf_counter()
+        for _ in range(4):
+            scheduler.acquire()
+        elapsed = time.perf_counter() - start
+
+        assert elapsed >= 2 / 20 * 0.9
+        assert scheduler.stats()["requests"] == 4
+
+    def test_cue_overtakes_background(self):
+        """Test that a queued cue request is served before an earlier background one."""
+        scheduler = RequestScheduler(rate=10, burst=1)
+        scheduler.acquire()
+        order = []
+
+        def worker(priority, name):
+            scheduler.acquire(priority)
+            order.append(name)
+
+        background = threading.Thread(target=worker, args=(PRIORITY_BACKGROUND, "background"))
+        cue = threading.Thread(target=worker, args=(PRIORITY_CUE, "cue"))
+        background.start()
+        time.sleep(0.02)
+        cue.start()
+        background.join()
+        cue.join()
+
+        assert order == ["cue", "background"]
+
+    def test_retry_after_is_honored(self):
+        """Test that a 429 waits for Retry-After and then succeeds."""
+        scheduler = RequestScheduler(rate=100, burst=10)
+        send = MagicMock(side_effect=[response(429, {"Retry-After": "0.2"}), response(204)])
+
+        start = time.perf_counter()
+        result = scheduler.execute(send)
+        elapsed = time.perf_counter() - start
+
+        assert result.status_code == 204
+        assert elapsed >= 0.18
+        stats = scheduler.stats()
+        assert stats["rate_limited"] == 1
+        assert stats["retries"] == 1
+
+    def test_server_errors_retry_then_give_up(self):
+        """Test that 5xx responses are retried up to max_retries."""
+        scheduler = RequestScheduler(rate=100, burst=10, max_retries=2, backoff_base=0.001)
+        send = MagicMock(return_value=response(503))
+
+        result = scheduler.execute(send)
+
+        assert result.status_code == 503
+        assert send.call_count == 3
+        assert scheduler.stats()["server_errors"] == 2
+
+    def test_server_errors_not_retried_when_disabled(self):
+        """Test that retry_server_errors=False returns a 5xx without resending, but still retries 429."""
+        scheduler = RequestScheduler(rate=100, burst=10, max_retries=2, backoff_base=0.001)
+        send = MagicMock(return_value=response(502))
+        assert scheduler.execute(send, retry_server_errors=False).status_code == 502
+        assert send.call_count == 1
+
+        send = MagicMock(side_effect=[response(429, {"Retry-After": "0"}), response(200)])
+        assert scheduler.execute(send, retry_server_errors=False).status_code == 200
+        assert send.call_count == 2
+
+    def test_client_errors_are_not_retried(self):
+        """Test that 4xx other than 429 return immediately."""
+        scheduler = RequestScheduler()
+        send = MagicMock(return_value=response(404))
+        assert scheduler.execute(send).status_code == 404
+        assert send.call_count == 1
+
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing for seconds and missing values."""
+        assert RequestScheduler.parse_retry_after("3") == 3.0
+        assert RequestScheduler.parse_retry_after(None) is None
+        assert RequestScheduler.parse_retry_after("soon") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,80 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from search_cache import SearchCache
+
+
+class TestSearchCache:
+    """Test suite for the search result memo."""
+
+    def test_key_normalizes_query(self):
+        """Test that case and whitespace do not split cache entries."""
+        assert SearchCache.make_key("  Lofi   Beats Focus ") == SearchCache.make_key("lofi beats focus")
+
+    def test_second_lookup_is_a_hit(self):
+        """Test that a repeated query does not call fetch again."""
+        cache = SearchCache()
+        fetch = MagicMock(return_value=["playlist"])
+        key = SearchCache.make_key("lofi beats focus")
+
+        assert cache.get_or_fetch(key, fetch) == ["playlist"]
+        assert cache.get_or_fetch(key, fetch) == ["playlist"]
+
+        assert fetch.call_count == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = SearchCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get_or_fetch("a", MagicMock())
+        cache.put("c", 3)
+
+        assert "b" not in cache.entries
+        assert list(cache.entries) == ["a", "c"]
+        assert cache.stats()["evictions"] == 1
+
+    def test_stale_entry_served_and_revalidated(self):
+        """Test that a stale entry is returned while a refresh runs in the background."""
+        cache = SearchCache(ttl=10, stale_ttl=100)
+        cache.put("k", "old", stored_at=time.time() - 50)
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return "new"
+
+        assert cache.get_or_fetch("k", fetch) == "old"
+        assert refreshed.wait(2)
+        deadline = time.time() + 2
+        while cache.entries["k"][1] != "new" and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert cache.get_or_fetch("k", MagicMock()) == "new"
+        assert cache.stats()["stale_hits"] == 1
+
+    def test_expired_entry_is_a_miss(self):
+        """Test that entries past the stale window are fetched synchronously."""
+        cache = SearchCache(ttl=10, stale_ttl=10)
+        cache.put("k", "old", stored_at=time.time() - 50)
+        assert cache.get_or_fetch("k", lambda: "new") == "new"
+        assert cache.stats()["misses"] == 1
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test that entries persist to disk and load into a new cache."""
+        path = tmp_path / "search.json"
+        key = SearchCache.make_key("study music concentration")
+        SearchCache(path=path).get_or_fetch(key, lambda: [{"uri": "spotify:playlist:1"}])
+
+        fetch = MagicMock()
+        assert SearchCache(path=path).get_or_fetch(key, fetch) == [{"uri": "spotify:playlist:1"}]
+        fetch.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,108 @@
+import time
+
+import numpy as np
+import pytest
+
+from similarity_index import DIMENSIONS, SimilarityIndex, feature_vector
+from spotify_player import LocalMusicPlayer
+from track_catalog import TrackCatalog
+
+
+def features(tempo, loudness, centroid=1500.0, rms=0.05):
+    return {"tempo": tempo, "loudness": loudness, "centroid": centroid, "rms": rms}
+
+
+def make_index(tmp_path, tracks):
+    index = SimilarityIndex(tmp_path / "similarity.npz", capacity=2)
+    for path, row in tracks.items():
+        index.add(path, feature_vector(row))
+    return index
+
+
+TRACKS = {
+    "slow_quiet": features(68, -26, 800, 0.02),
+    "slow_loud": features(70, -10, 3000, 0.3),
+    "mid": features(100, -16, 2000, 0.1),
+    "fast_loud": features(150, -8, 5000, 0.4),
+}
+
+
+class TestSimilarityIndex:
+    """Test suite for the float32 nearest-neighbour index."""
+
+    def test_target_query_uses_only_given_dimensions(self, tmp_path):
+        """Test that a tempo-only target ignores loudness, and adding loudness breaks the tie."""
+        index = make_index(tmp_path, TRACKS)
+
+        vector, weights = index.target(tempo=70)
+        assert {p for p, _ in index.nearest(vector, k=2, weights=weights)} == {"slow_quiet", "slow_loud"}
+
+        vector, weights = index.target(tempo=70, loudness=-28)
+        assert index.nearest(vector, k=1, weights=weights)[0][0] == "slow_quiet"
+
+    def test_like_with_lower_energy(self, tmp_path):
+        """Test that "like this but quieter" moves toward the quiet neighbour."""
+        index = make_index(tmp_path, TRACKS)
+        assert index.like("slow_loud", k=1)[0][0] == "mid"
+        assert index.like("slow_loud", k=1, energy_shift=-16)[0][0] == "slow_quiet"
+
+    def test_remove_and_reinsert(self, tmp_path):
+        """Test that swap-removal keeps every other track addressable."""
+        index = make_index(tmp_path, TRACKS)
+        assert index.remove("slow_quiet")
+        assert "slow_quiet" not in index and len(index) == 3
+        for path in ("slow_loud", "mid", "fast_loud"):
+            assert np.allclose(index.vector(path), feature_vector(TRACKS[path]))
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test that the npz file restores vectors and paths as float32."""
+        make_index(tmp_path, TRACKS).save()
+        loaded = SimilarityIndex(tmp_path / "similarity.npz")
+
+        assert loaded.load()
+        assert loaded.vectors.dtype == np.float32
+        assert sorted(loaded.paths) == sorted(TRACKS)
+        assert loaded.for_stress(1.0, k=1)[0][0] == "slow_quiet"
+
+    def test_query_under_10ms_at_100k_tracks(self, tmp_path):
+        """Test that a kNN query over 100k tracks stays under 10 ms."""
+        index = SimilarityIndex(tmp_path / "big.npz")
+        rng = np.random.default_rng(0)
+        index._grow(100_000)
+        index.vectors[:100_000] = rng.standard_normal((100_000, len(DIMENSIONS))).astype(np.float32)
+        index.paths = [f"/music/{i}.flac" for i in range(100_000)]
+        index.rows = {p: i for i, p in enumerate(index.paths)}
+
+        timings = []
+        for stress in np.linspace(0, 1, 50):
+            started = time.perf_counter()
+            index.for_stress(stress, k=20)
+            timings.append(time.perf_counter() - started)
+
+        assert sorted(timings)[len(timings) // 2] < 0.010
+
+
+class TestSelectionStrategy:
+    """Test suite for LocalMusicPlayer's similarity-based selection."""
+
+    def test_sync_and_select_for_stress(self, tmp_path):
+        """Test that the index syncs from catalog features and drives select_tracks."""
+        music = tmp_path / "music"
+        music.mkdir()
+        player = LocalMusicPlayer(str(music), index_path=tmp_path / "index.json",
+                                  catalog_path=tmp_path / "catalog.db",
+                                  similarity_path=tmp_path / "similarity.npz")
+        catalog = player.catalog = TrackCatalog(tmp_path / "catalog.db")
+        catalog.build([(p, 1, 1) for p in TRACKS], workers=1)
+        catalog.store_features([(p, 1, {**f, "error": None}) for p, f in TRACKS.items()])
+
+        assert player.build_similarity()["added"] == 4
+        assert [p.name for p in player.select_tracks("stress", limit=2, stress=1.0)][0] == "slow_quiet"
+
+        catalog.build([(p, 1, 1) for p in TRACKS if p != "fast_loud"], workers=1)
+        assert player.build_similarity() == {"added": 0, "updated": 0, "removed": 1}
+        assert len(player.select_tracks("stress", limit=10, stress=0.0)) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,96 @@
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from focus_background import CUE_PRESETS, SpotifyPlayer
+from token_store import TokenStore
+
+
+PLAYLISTS = [{"name": "Calm Piano", "uri": "spotify:playlist:calm"}]
+
+
+class TestSpotifyCue:
+    """Test suite for the headless cue API."""
+
+    def make_player(self, tmp_path, devices):
+        store = TokenStore(tmp_path / "token.json")
+        store.save("token", "refresh")
+        player = SpotifyPlayer("id", "secret", "http://localhost:8888/callback", token_store=store)
+        player.http = MagicMock()
+        player.fetch_search = MagicMock(return_value=PLAYLISTS)
+        player.devices.fetch = MagicMock(return_value=devices)
+        return player
+
+    def test_cue_plays_without_input(self, tmp_path):
+        """Test that a cue starts API playback with no prompts."""
+        player = self.make_player(tmp_path, [{"id": "d1", "is_active": True}])
+        player.http.put.return_value = MagicMock(status_code=204)
+
+        with patch("builtins.input", side_effect=AssertionError("input() called")):
+            result = player.cue("calm", intensity=0.5)
+        player.refresher.stop()
+
+        assert result["success"] is True
+        assert result["method"] == "api"
+        assert result["query"] == CUE_PRESETS["calm"][1]
+        assert result["device_id"] == "d1"
+        assert set(result["timings"]) == {"auth", "search", "device", "playback", "total"}
+
+    def test_intensity_maps_onto_presets(self, tmp_path):
+        """Test that intensity picks the gentlest and most intense queries at the ends."""
+        player = self.make_player(tmp_path, [{"id": "d1"}])
+        player.http.put.return_value = MagicMock(status_code=204)
+
+        assert player.cue("focus", intensity=0.0)["query"] == CUE_PRESETS["focus"][0]
+        assert player.cue("focus", intensity=1.0)["query"] == CUE_PRESETS["focus"][-1]
+        player.refresher.stop()
+
+    def test_no_device_falls_back_after_deadline(self, tmp_path):
+        """Test that a missing device waits only until the deadline, then opens the app."""
+        player = self.make_player(tmp_path, [])
+        player.open_in_spotify_app = MagicMock(return_value=True)
+
+        result = player.cue("focus", device_timeout=0.2)
+        player.refresher.stop()
+
+        assert result["method"] == "app"
+        assert result["device_id"] is None
+        assert result["timings"]["device"] < 1.0
+        player.open_in_spotify_app.assert_called_once_with("spotify:playlist:calm")
+
+    def test_playback_connection_error_falls_back(self, tmp_path):
+        """Test that a failed playback PUT yields a structured result and opens the app."""
+        player = self.make_player(tmp_path, [{"id": "d1", "is_active": True}])
+        player.http.put.side_effect = requests.exceptions.ConnectionError("reset")
+        player.open_in_spotify_app = MagicMock(return_value=True)
+
+        result = player.cue("calm")
+        player.refresher.stop()
+
+        assert result["success"] is True
+        assert result["method"] == "app"
+        assert "Playback failed" in result["error"]
+        assert "playback" in result["timings"]
+        player.open_in_spotify_app.assert_called_once_with("spotify:playlist:calm")
+
+    def test_unauthenticated_cue_does_not_open_browser(self, tmp_path):
+        """Test that a cue without cached tokens fails fast."""
+        player = SpotifyPlayer(
+            "id", "secret", "http://localhost:8888/callback",
+            token_store=TokenStore(tmp_path / "empty.json"),
+        )
+        with patch("focus_background.webbrowser.open") as mock_browser:
+            result = player.cue("focus")
+
+        assert result["success"] is False
+        assert "Not authenticated" in result["error"]
+        mock_browser.assert_not_called()
+
+    def test_unknown_mood_raises(self, tmp_path):
+        """Test that an unknown mood is rejected."""
+        player = self.make_player(tmp_path, [])
+        with pytest.raises(ValueError):
+            player.cue("angry")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,92 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+from spotify_http import SpotifySession
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"authorization": self.headers.get("Authorization")}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSpotifySession:
+    """Test suite for the pooled Spotify transport."""
+
+    def setup_method(self):
+        self.server = ThreadingHTTPServer(("localhost", 0), EchoHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://localhost:{self.server.server_address[1]}"
+
+    def teardown_method(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_injects_bearer_token(self):
+        """Test that the current token is sent as a bearer header."""
+        session = SpotifySession(token_getter=lambda: "abc")
+        response = session.get(f"{self.base}/me")
+        assert response.json()["authorization"] == "Bearer abc"
+        session.close()
+
+    def test_auth_false_skips_token(self):
+        """Test that auth=False leaves the Authorization header alone."""
+        session = SpotifySession(token_getter=lambda: "abc")
+        response = session.get(f"{self.base}/me", auth=False)
+        assert response.json()["authorization"] is None
+        session.close()
+
+    def test_reuses_warm_connection(self):
+        """Test that repeated calls reuse one keep-alive connection."""
+        session = SpotifySession(token_getter=lambda: "abc")
+        for _ in range(5):
+            session.get(f"{self.base}/me").raise_for_status()
+
+        stats = session.connection_stats()
+        assert stats["requests"] == 5
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 4
+        session.close()
+
+    def test_stats_survive_pool_eviction(self):
+        """Test that counts stay cumulative after the pool manager drops a host's pool."""
+        session = SpotifySession(token_getter=lambda: "abc")
+        for _ in range(3):
+            session.get(f"{self.base}/me").raise_for_status()
+        session.adapter.poolmanager.clear()
+        for _ in range(2):
+            session.get(f"{self.base}/me").raise_for_status()
+
+        stats = session.connection_stats()
+        assert stats["requests"] == 5
+        assert stats["connections_opened"] == 2
+        assert stats["connections_reused"] == 3
+        session.close()
+
+    def test_post_is_not_resent_after_server_error(self):
+        """Test that a 5xx to a POST (e.g. the auth-code exchange) is returned, while GET retries."""
+        session = SpotifySession()
+        session.scheduler.backoff_base = 0.001
+        session.session.request = MagicMock(return_value=MagicMock(status_code=503, headers={}))
+
+        assert session.post(f"{self.base}/api/token", auth=False).status_code == 503
+        assert session.session.request.call_count == 1
+
+        session.get(f"{self.base}/me")
+        assert session.session.request.call_count == 1 + 1 + session.scheduler.max_retries
+        session.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
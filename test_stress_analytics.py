@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from stress_analytics import BucketStats, StressAnalytics
+
+
+def minutes(values, start="2026-02-14T10:00"):
+    values = np.asarray(values, dtype=np.float32)
+    times = np.datetime64(start, "us") + np.arange(len(values)) * np.timedelta64(1, "m")
+    return times, values
+
+
+def in_batches(analytics, times, values, sizes):
+    edges = np.cumsum([0, *sizes])
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        analytics.update(times[lo:hi], values[lo:hi])
+    return analytics
+
+
+class TestBucketStats:
+    """Test suite for running per-bucket aggregates."""
+
+    def test_merges_overlapping_batches(self):
+        """Test that a bucket split across batches matches a single pass."""
+        times, values = minutes(np.linspace(0, 1, 150))
+        whole = BucketStats("h")
+        whole.add(times, values)
+        split = BucketStats("h")
+        split.add(times[:45], values[:45])
+        split.add(times[45:], values[45:])
+
+        a, b = whole.select(), split.select()
+        assert b["count"].tolist() == a["count"].tolist() == [60, 60, 30]
+        assert b["mean"] == pytest.approx(a["mean"])
+        assert b["std"] == pytest.approx(a["std"])
+
+    def test_out_of_order_batch(self):
+        """Test that an earlier batch is merged into place, not appended."""
+        times, values = minutes(np.arange(240) / 240.0)
+        buckets = BucketStats("h", capacity=1)
+        buckets.add(times[180:], values[180:])
+        buckets.add(times[:130], values[:130])
+        buckets.add(times[130:180], values[130:180])
+
+        expected = BucketStats("h")
+        expected.add(times, values)
+        assert buckets.keys.tolist() == expected.keys.tolist()
+        assert buckets.select()["count"].tolist() == [60, 60, 60, 60]
+        assert buckets.select()["mean"] == pytest.approx(expected.select()["mean"])
+
+    def test_select_range(self):
+        """Test that select() returns buckets in [start, end)."""
+        buckets = BucketStats("D")
+        times, values = minutes(np.full(3 * 24 * 60, 0.5), start="2026-03-01T00:00")
+        buckets.add(times, values)
+        selected = buckets.select("2026-03-02", "2026-03-03")
+        assert [str(t) for t in selected["start"]] == ["2026-03-02"]
+
+
+class TestStressAnalytics:
+    """Test suite for the vectorized dashboard statistics."""
+
+    def test_zone_percentages(self):
+        """Test that readings are split at 0.25 / 0.5 / 0.75 like the dashboard."""
+        analytics = StressAnalytics().update(*minutes([0.1, 0.25, 0.3, 0.5, 0.74, 0.75, 0.9, 1.0]))
+        assert analytics.zones() == {"calm": 12.5, "mild": 25.0, "moderate": 25.0, "high": 37.5}
+
+    def test_hourly_and_hour_of_day_means(self):
+        """Test that hourly buckets and hour-of-day averages match a direct computation."""
+        values = np.concatenate([np.full(60, 0.2), np.full(60, 0.6)])
+        analytics = StressAnalytics().update(*minutes(values))
+
+        series = analytics.series("hour")
+        assert series["labels"] == ["2026-02-14T10", "2026-02-14T11"]
+        assert series["mean"] == pytest.approx([0.2, 0.6])
+        hours = analytics.hour_of_day()
+        assert hours[10] == pytest.approx(0.2) and hours[11] == pytest.approx(0.6)
+        assert hours[0] == 0.0
+
+    def test_unknown_granularity(self):
+        """Test that an unknown granularity is rejected."""
+        with pytest.raises(ValueError):
+            StressAnalytics().series("week")
+
+    def test_spike_runs(self):
+        """Test that runs >= 0.7 report length, duration and max; an open run is not counted yet."""
+        values = [0.1, 0.8, 0.9, 0.2, 0.7, 0.3, 0.95, 0.99]
+        spikes = StressAnalytics().update(*minutes(values)).spikes()
+
+        assert spikes["count"] == 2
+        assert [s["readings"] for s in spikes["spikes"]] == [2, 1]
+        assert [s["seconds"] for s in spikes["spikes"]] == [120.0, 60.0]
+        assert [s["max"] for s in spikes["spikes"]] == pytest.approx([0.9, 0.7])
+        assert spikes["avg_readings"] == 1.5
+        assert spikes["in_spike"]
+
+    def test_spike_across_batches(self):
+        """Test that a spike spanning batch boundaries is counted once with the right stats."""
+        values = [0.1, 0.8, 0.85, 0.9, 0.99, 0.8, 0.1, 0.75, 0.2]
+        times, values = minutes(values)
+        whole = StressAnalytics().update(times, values).spikes()
+        for sizes in ([2, 1, 1, 5], [6, 3], [1] * 9, [7, 2]):
+            assert in_batches(StressAnalytics(), times, values, sizes).spikes() == whole
+        assert [s["readings"] for s in whole["spikes"]] == [5, 1]
+
+    def test_rolling_std_matches_naive(self):
+        """Test that the cumulative-sum rolling std equals the O(n*w) window loop."""
+        rng = np.random.default_rng(7)
+        times, values = minutes(rng.random(300))
+        analytics = in_batches(StressAnalytics(history=200), times, values, [3, 50, 7, 240])
+
+        naive = [values[i - 9:i + 1].astype(np.float64).std() for i in range(9, len(values))]
+        recent = analytics.variability(last=500)
+        assert recent["std"] == pytest.approx(naive[-200:], abs=1e-4)
+        assert recent["labels"] == [str(t) for t in times[-200:]]
+
+        assert len(analytics.variability(last=120)["std"]) == 120
+
+    def test_rolling_history_is_bounded(self):
+        """Test that the rolling ring keeps its size however many readings arrive."""
+        times, values = minutes(np.random.default_rng(3).random(1000))
+        analytics = in_batches(StressAnalytics(history=50), times, values, [5, 400, 1, 594])
+
+        assert analytics.rolling_std.shape == (50,)
+        recent = analytics.variability()
+        assert len(recent["std"]) == 50
+        assert recent["labels"][0] == str(times[950])
+        assert recent["labels"][-1] == str(times[-1])
+
+    def test_incremental_matches_single_pass(self):
+        """Test that batch-by-batch updates give the same summary as one update."""
+        rng = np.random.default_rng(3)
+        times, values = minutes(rng.random(2000), start="2026-02-14T22:30")
+        whole = StressAnalytics().update(times, values).summary("day")
+        batched = in_batches(StressAnalytics(), times, values, [1, 999, 500, 500]).summary("day")
+
+        assert batched["zones"] == whole["zones"]
+        assert batched["series"]["labels"] == whole["series"]["labels"]
+        assert batched["series"]["mean"] == pytest.approx(whole["series"]["mean"])
+        assert batched["hour_of_day"] == pytest.approx(whole["hour_of_day"])
+        assert batched["spikes"] == whole["spikes"]
+        assert batched["variability"]["std"] == pytest.approx(whole["variability"]["std"], abs=1e-5)
+        assert batched["readings"] == 2000
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from stress_ingest import StressIngestor, parse_lines
+
+
+def reading(second, stress):
+    return f"2026-02-14T16:44:{second:02d}.791408 {stress}\n"
+
+
+class TestParseLines:
+    """Test suite for chunk parsing of stress readings."""
+
+    def test_valid_lines(self):
+        """Test that timestamps and values land in datetime64[us] and float32 arrays."""
+        times, values, invalid = parse_lines((reading(4, 0.26) + reading(5, 0.3)).encode())
+        assert times.dtype == np.dtype("datetime64[us]")
+        assert values.dtype == np.float32
+        assert str(times[0]) == "2026-02-14T16:44:04.791408"
+        assert values.tolist() == pytest.approx([0.26, 0.3])
+        assert invalid == 0
+
+    def test_invalid_lines_are_counted(self):
+        """Test that bad lines are counted and skipped without losing good ones."""
+        data = (reading(1, 0.1) + "garbage\n" + "not-a-date 0.5\n" + reading(2, "nan")
+                + "\r\n" + reading(3, 0.9)).encode()
+        times, values, invalid = parse_lines(data)
+        assert values.tolist() == pytest.approx([0.1, 0.9])
+        assert invalid == 3
+
+
+class TestStressIngestor:
+    """Test suite for incremental, tail-following ingestion."""
+
+    def test_poll_reads_only_new_bytes(self, tmp_path):
+        """Test that each poll resumes at the saved offset."""
+        path = tmp_path / "stress_reading.txt"
+        path.write_text(reading(0, 0.1) + reading(1, 0.2))
+        ingestor = StressIngestor(str(path), chunk_size=16)
+
+        assert len(ingestor.poll()[0]) == 2
+        before = ingestor.counters["bytes"]
+        with open(path, "a") as f:
+            f.write(reading(2, 0.3))
+        times, values = ingestor.poll()
+
+        assert values.tolist() == pytest.approx([0.3])
+        assert ingestor.counters["bytes"] - before == len(reading(2, 0.3))
+        assert ingestor.values.tolist() == pytest.approx([0.1, 0.2, 0.3])
+
+    def test_partial_line_waits_for_newline(self, tmp_path):
+        """Test that a half-written line is picked up once it is complete."""
+        path = tmp_path / "stress_reading.txt"
+        line = reading(7, 0.77)
+        path.write_text(reading(6, 0.66) + line[:10])
+        ingestor = StressIngestor(str(path))
+
+        assert len(ingestor.poll()[0]) == 1
+        with open(path, "a") as f:
+            f.write(line[10:])
+        assert ingestor.poll()[1].tolist() == pytest.approx([0.77])
+        assert ingestor.counters["invalid"] == 0
+
+    def test_final_poll_takes_unterminated_line(self, tmp_path):
+        """Test that final=True ingests a last line without a newline."""
+        path = tmp_path / "stress_reading.txt"
+        path.write_text(reading(1, 0.1) + reading(2, 0.2).strip())
+        assert len(StressIngestor(str(path)).poll(final=True)[0]) == 2
+
+    def test_truncated_file_starts_over(self, tmp_path):
+        """Test that a rewritten, shorter file is re-read from the start."""
+        path = tmp_path / "stress_reading.txt"
+        path.write_text(reading(0, 0.1) + reading(1, 0.2) + reading(2, 0.3))
+        ingestor = StressIngestor(str(path))
+        ingestor.poll()
+
+        path.write_text(reading(9, 0.9))
+        ingestor.poll()
+        assert ingestor.values.tolist() == pytest.approx([0.9])
+        assert ingestor.counters["resets"] == 1
+
+    def test_growth_keeps_history(self, tmp_path):
+        """Test that arrays grow past their initial capacity without losing readings."""
+        path = tmp_path / "stress_reading.txt"
+        with open(path, "w") as f:
+            for i in range(3000):
+                f.write(f"2026-02-14T16:{i // 60 % 60:02d}:{i % 60:02d} {i % 100 / 100}\n")
+        ingestor = StressIngestor(str(path), chunk_size=4096)
+        ingestor.poll()
+        assert ingestor.count == 3000
+        assert np.all(np.diff(ingestor.times[:3000].astype(np.int64)) != 0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+
+from stress_ingest import StressIngestor
+from stress_push import PushClient, PushHub, StressPushServer, sse_message
+
+
+def reading(minute, stress):
+    return f"2026-02-14T10:{minute:02d}:00 {stress}\n"
+
+
+def parse_events(data):
+    """Split an SSE byte stream into (event, data) pairs, skipping comments"""
+    events = []
+    for block in data.decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+async def open_events(server, path="/events"):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    return reader, writer, head
+
+
+async def read_until(reader, event, timeout=2.0):
+    data = b""
+    deadline = time.monotonic() + timeout
+    while not any(name == event for name, _ in parse_events(data)):
+        data += await asyncio.wait_for(reader.read(65536), deadline - time.monotonic())
+    return parse_events(data)
+
+
+class TestPushClient:
+    """Test suite for bounded, drop-oldest client queues."""
+
+    def test_drop_oldest(self):
+        """Test that a full queue drops the oldest events and reports how many."""
+        async def scenario():
+            client = PushClient(queue_size=3)
+            for i in range(5):
+                client.put(sse_message("readings", {"i": i}))
+            return client, await client.next_batch(timeout=0.1)
+
+        client, batch = asyncio.run(scenario())
+        events = parse_events(batch)
+        assert events[0] == ("dropped", {"count": 2})
+        assert [data["i"] for _, data in events[1:]] == [2, 3, 4]
+        assert client.dropped == 2 and client.unreported == 0
+
+    def test_idle_timeout(self):
+        """Test that waiting on an empty queue returns nothing after the timeout."""
+        assert asyncio.run(PushClient().next_batch(timeout=0.01)) == b""
+
+    def test_publish_encodes_once(self):
+        """Test that every client receives the same encoded message object."""
+        async def scenario():
+            hub = PushHub()
+            clients = [hub.connect() for _ in range(3)]
+            message = hub.publish("readings", {"stress": [0.5]})
+            return message, clients
+
+        message, clients = asyncio.run(scenario())
+        assert all(client.queue[0] is message for client in clients)
+        assert b"id: 1\n" in message
+
+
+class TestStressPushServer:
+    """Test suite for the asyncio Server-Sent Events push server."""
+
+    def test_pushes_new_readings(self, tmp_path):
+        """Test that appended lines reach a connected client well under a second."""
+        path = tmp_path / "stress_reading.txt"
+        path.write_text(reading(0, 0.2) + reading(1, 0.3))
+
+        async def scenario():
+            server = await StressPushServer(StressIngestor(str(path)), port=0, interval=0.02).start()
+            try:
+                reader, writer, head = await open_events(server)
+                snapshot = await read_until(reader, "snapshot")
+
+                started = time.monotonic()
+                with open(path, "a") as f:
+                    f.write(reading(2, 0.8))
+                events = await read_until(reader, "aggregates")
+                latency = time.monotonic() - started
+                writer.close()
+                return head, snapshot, events, latency
+            finally:
+                await server.stop()
+
+        head, snapshot, events, latency = asyncio.run(scenario())
+        assert b"text/event-stream" in head
+        assert snapshot[0][1]["readings"] == 2
+        names = [name for name, _ in events]
+        assert names == ["readings", "aggregates"]
+        assert events[0][1]["stress"] == pytest.approx([0.8])
+        aggregates = events[1][1]
+        assert aggregates["readings"] == 3
+        assert (aggregates["spikes"], aggregates["in_spike"]) == (0, True)
+        assert aggregates["buckets"]["minute"]["start"] == ["2026-02-14T10:02"]
+        assert aggregates["buckets"]["hour"]["mean"] == pytest.approx([(0.2 + 0.3 + 0.8) / 3], abs=1e-4)
+        assert latency < 0.5
+
+    def test_heartbeat_when_idle(self):
+        """Test that an idle stream only carries keepalive comments."""
+        async def scenario():
+            server = await StressPushServer(port=0, heartbeat=0.02).start()
+            try:
+                reader, writer, _ = await open_events(server)
+                await read_until(reader, "snapshot")
+                data = await asyncio.wait_for(reader.read(1024), 1.0)
+                writer.close()
+                return data
+            finally:
+                await server.stop()
+
+        assert asyncio.run(scenario()).startswith(b": keepalive\n\n")
+
+    def test_many_idle_clients(self):
+        """Test that hundreds of idle connections all receive a published batch."""
+        async def scenario():
+            server = await StressPushServer(port=0).start()
+            try:
+                connections = [await open_events(server) for _ in range(300)]
+                for reader, _, _ in connections:
+                    await read_until(reader, "snapshot")
+                times = np.array(["2026-02-14T10:00"], dtype="datetime64[us]")
+                server.ingest(times, np.array([0.4], dtype=np.float32))
+                received = [await read_until(reader, "aggregates") for reader, _, _ in connections]
+                stats = server.stats()
+                for _, writer, _ in connections:
+                    writer.close()
+                return received, stats
+            finally:
+                await server.stop()
+
+        received, stats = asyncio.run(scenario())
+        assert stats["clients"] == 300
+        assert all(events[0][1]["stress"] == pytest.approx([0.4]) for events in received)
+
+    def test_unknown_path(self):
+        """Test that anything but GET /events gets a 404."""
+        async def scenario():
+            server = await StressPushServer(port=0).start()
+            try:
+                reader, writer = await asyncio.open_connection(server.host, server.port)
+                writer.write(b"GET /nope HTTP/1.1\r\n\r\n")
+                data = await asyncio.wait_for(reader.read(), 1.0)
+                writer.close()
+                return data
+            finally:
+                await server.stop()
+
+        assert asyncio.run(scenario()).startswith(b"HTTP/1.1 404")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
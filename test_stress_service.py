@@ -0,0 +1,222 @@
+import gzip
+import http.client
+import json
+import time
+
+import numpy as np
+import pytest
+
+from stress_ingest import StressIngestor
+from stress_service import StressService, parse_range
+from stress_store import StressStore
+
+
+def minutes(count, start="2026-02-14T10:00", seed=0):
+    times = np.datetime64(start, "us") + np.arange(count) * np.timedelta64(1, "m")
+    values = np.random.default_rng(seed).random(count).astype(np.float32)
+    return times, values
+
+
+class TestParseRange:
+    """Test suite for single byte-range parsing."""
+
+    def test_forms(self):
+        """Test that closed, open-ended and suffix ranges resolve against the size."""
+        assert parse_range("bytes=0-9", 100) == (0, 10)
+        assert parse_range("bytes=90-", 100) == (90, 100)
+        assert parse_range("bytes=-5", 100) == (95, 100)
+        assert parse_range("bytes=50-500", 100) == (50, 100)
+
+    def test_unsatisfiable(self):
+        """Test that out-of-range, malformed and multi-range headers are rejected."""
+        assert parse_range("bytes=100-", 100) is None
+        assert parse_range("bytes=a-b", 100) is None
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        assert parse_range("items=0-1", 100) is None
+
+
+class TestStressService:
+    """Test suite for the threaded stress analytics HTTP service."""
+
+    def setup_method(self):
+        self.times, self.values = minutes(180)
+
+    def start(self, tmp_path):
+        store = StressStore(tmp_path / "store")
+        store.append(self.times, self.values)
+        self.server = StressService(store, port=0).start()
+        return self.server
+
+    def teardown_method(self):
+        server = getattr(self, "server", None)
+        if server is not None:
+            server.stop()
+
+    def get(self, path, headers=None):
+        host, port = self.server.server_address[:2]
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_hourly_stats(self, tmp_path):
+        """Test that /stats returns hourly buckets from the store's rollups."""
+        self.start(tmp_path)
+        response, body = self.get("/stats?granularity=hour")
+        payload = json.loads(body)
+
+        assert response.status == 200
+        assert payload["buckets"]["start"] == ["2026-02-14T10", "2026-02-14T11", "2026-02-14T12"]
+        assert payload["buckets"]["count"] == [60, 60, 60]
+        assert payload["buckets"]["mean"][0] == pytest.approx(self.values[:60].mean(), abs=1e-4)
+        assert payload["summary"]["count"] == 180
+
+    def test_readings_range(self, tmp_path):
+        """Test that /readings returns exactly the raw readings in [from, to)."""
+        self.start(tmp_path)
+        response, body = self.get("/readings?from=2026-02-14T10:30&to=2026-02-14T10:40")
+        payload = json.loads(body)
+
+        assert payload["count"] == 10
+        expected = self.times[30:40].astype(np.int64) // 1000
+        assert payload["time_ms"] == expected.tolist()
+        assert payload["stress"] == pytest.approx(self.values[30:40].tolist(), abs=1e-4)
+
+    def test_readings_default_to_last_hour(self, tmp_path):
+        """Test that /readings without a range returns the hour up to the newest reading."""
+        self.start(tmp_path)
+        payload = json.loads(self.get("/readings")[1])
+        assert payload["count"] == 60
+        assert payload["time_ms"][-1] == int(self.times[-1].astype(np.int64) // 1000)
+
+    def test_gzip_and_etag(self, tmp_path):
+        """Test that responses are gzipped on request and a matching ETag gets 304."""
+        self.start(tmp_path)
+        response, body = self.get("/stats?granularity=minute", {"Accept-Encoding": "gzip"})
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert json.loads(gzip.decompress(body))["summary"]["count"] == 180
+
+        etag = response.getheader("ETag")
+        response, body = self.get("/stats?granularity=minute",
+                                  {"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        assert response.status == 304
+        assert body == b""
+        assert self.server.cache.stats()["hits"] == 1
+
+    def test_encodings_have_distinct_etags(self, tmp_path):
+        """Test that the gzip and identity bodies never validate each other."""
+        self.start(tmp_path)
+        zipped, _ = self.get("/readings", {"Accept-Encoding": "gzip"})
+        plain, full = self.get("/readings")
+        assert zipped.getheader("ETag") != plain.getheader("ETag")
+
+        response, body = self.get("/readings", {"If-None-Match": zipped.getheader("ETag")})
+        assert response.status == 200
+        assert body == full
+
+        ranged, body = self.get("/readings", {"Range": "bytes=0-9", "If-Range": zipped.getheader("ETag"),
+                                              "Accept-Encoding": "gzip"})
+        assert ranged.status == 200
+        assert ranged.getheader("Content-Encoding") == "gzip"
+        ranged, body = self.get("/readings", {"Range": "bytes=0-9", "If-Range": plain.getheader("ETag")})
+        assert ranged.status == 206
+        assert body == full[:10]
+
+    def test_new_readings_invalidate_open_range(self, tmp_path):
+        """Test that new data changes the ETag of open ranges but not of sealed ones."""
+        self.start(tmp_path)
+        open_etag = self.get("/stats?granularity=hour")[0].getheader("ETag")
+        sealed, _ = self.get("/stats?granularity=hour&to=2026-02-14T12:00")
+        assert sealed.getheader("Cache-Control").startswith("public")
+
+        times, values = minutes(5, start="2026-02-14T13:00", seed=1)
+        self.server.store.append(times, values)
+
+        response, body = self.get("/stats?granularity=hour", {"If-None-Match": open_etag})
+        assert response.status == 200
+        assert json.loads(body)["summary"]["count"] == 185
+        again, _ = self.get("/stats?granularity=hour&to=2026-02-14T12:00",
+                            {"If-None-Match": sealed.getheader("ETag")})
+        assert again.status == 304
+
+    def test_rollup_retention_invalidates_sealed_range(self, tmp_path):
+        """Test that a sealed /stats entry changes once retention drops its rollup buckets."""
+        store = StressStore(tmp_path / "store", retention={"minute": 1})
+        store.append(self.times, self.values)
+        self.server = StressService(store, port=0).start()
+        path = "/stats?granularity=minute&to=2026-02-14T12:00"
+        sealed, body = self.get(path)
+        assert json.loads(body)["buckets"]["count"] == [1] * 120
+
+        times, values = minutes(5, start="2026-02-17T10:00", seed=1)
+        store.append(times, values)
+        assert store.counters["buckets_dropped"] == 180
+
+        response, body = self.get(path, {"If-None-Match": sealed.getheader("ETag")})
+        assert response.status == 200
+        assert json.loads(body)["buckets"]["count"] == []
+
+    def test_byte_range(self, tmp_path):
+        """Test that a Range request returns 206 with the requested slice of the body."""
+        self.start(tmp_path)
+        _, full = self.get("/readings")
+        response, body = self.get("/readings", {"Range": "bytes=10-19", "Accept-Encoding": "gzip"})
+
+        assert response.status == 206
+        assert body == full[10:20]
+        assert response.getheader("Content-Range") == f"bytes 10-19/{len(full)}"
+        assert self.get("/readings", {"Range": f"bytes={len(full)}-"})[0].status == 416
+
+    def test_bad_requests(self, tmp_path):
+        """Test that bad parameters give 400 and unknown paths 404, as JSON."""
+        self.start(tmp_path)
+        response, body = self.get("/stats?granularity=week")
+        assert response.status == 400
+        assert "granularity" in json.loads(body)["error"]["message"]
+        assert self.get("/stats?from=yesterday")[0].status == 400
+        assert self.get("/nope")[0].status == 404
+
+    def test_follow_feeds_store(self, tmp_path):
+        """Test that follow() appends lines from the growing text file to the store."""
+        self.start(tmp_path)
+        path = tmp_path / "stress_reading.txt"
+        path.write_text("2026-02-14T13:00:00 0.5\n2026-02-14T13:01:00 0.7\n")
+        self.server.follow(StressIngestor(str(path)), interval=0.01)
+
+        deadline = time.monotonic() + 5
+        while self.server.store.counters["appended"] < 182 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        payload = json.loads(self.get("/readings?from=2026-02-14T13:00")[1])
+        assert payload["stress"] == pytest.approx([0.5, 0.7])
+
+    def test_head_sends_headers_only(self, tmp_path):
+        """Test that HEAD on every path sends GET's length and no body, keeping the connection usable."""
+        self.start(tmp_path)
+        host, port = self.server.server_address[:2]
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        for path in ("/", "/stats", "/readings"):
+            _, full = self.get(path)
+            connection.request("HEAD", path)
+            response = connection.getresponse()
+            assert response.status == 200
+            assert response.read() == b""
+            assert response.getheader("Content-Length") == str(len(full))
+
+            # A body leaked after the headers would corrupt this next response
+            connection.request("GET", path)
+            response = connection.getresponse()
+            assert response.read() == full
+        connection.close()
+
+    def test_hello_page_still_served(self, tmp_path):
+        """Test that "/" keeps serving the HelloWorldHandler page."""
+        self.start(tmp_path)
+        response, body = self.get("/")
+        assert response.status == 200
+        assert b"Hello World" in body
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from stress_store import ColumnSet, RAW_SCHEMA, StressStore
+
+
+def seconds(count, start="2026-02-14T23:00", step=1, seed=0):
+    times = np.datetime64(start, "us") + np.arange(count) * np.timedelta64(step, "s")
+    values = np.random.default_rng(seed).random(count).astype(np.float32)
+    return times, values
+
+
+class TestColumnSet:
+    """Test suite for append-only memory-mapped columns."""
+
+    def test_append_and_reopen(self, tmp_path):
+        """Test that appended rows are readable through memmap after reopening."""
+        columns = ColumnSet(tmp_path / "seg", RAW_SCHEMA)
+        columns.append({"time": np.arange(3), "stress": np.ones(3)})
+        assert columns.column("time").tolist() == [0, 1, 2]
+        columns.append({"time": np.arange(3, 5), "stress": np.zeros(2)})
+        assert columns.column("time").tolist() == [0, 1, 2, 3, 4]
+
+        reopened = ColumnSet(tmp_path / "seg", RAW_SCHEMA)
+        assert reopened.rows == 5
+        assert reopened.column("stress").tolist() == [1, 1, 1, 0, 0]
+
+    def test_torn_append_is_trimmed(self, tmp_path):
+        """Test that columns of unequal length are cut back to whole rows on open."""
+        columns = ColumnSet(tmp_path / "seg", RAW_SCHEMA)
+        columns.append({"time": np.arange(4), "stress": np.ones(4)})
+        with open(tmp_path / "seg" / "time.col", "ab") as f:
+            f.write(np.arange(2, dtype=np.int64).tobytes() + b"\x01\x02")
+
+        reopened = ColumnSet(tmp_path / "seg", RAW_SCHEMA)
+        assert reopened.rows == 4
+        assert (tmp_path / "seg" / "time.col").stat().st_size == 4 * 8
+
+
+class TestStressStore:
+    """Test suite for the columnar stress store and its rollups."""
+
+    def test_readings_range_across_segments(self, tmp_path):
+        """Test that a range spanning midnight is assembled from both day segments."""
+        store = StressStore(tmp_path)
+        times, values = seconds(7200)
+        store.append(times[:100], values[:100])
+        store.append(times[100:], values[100:])
+
+        assert store.days == [int(np.datetime64("2026-02-14", "D").astype(np.int64)),
+                              int(np.datetime64("2026-02-15", "D").astype(np.int64))]
+        got_times, got_values = store.readings("2026-02-14T23:59:50", "2026-02-15T00:00:10")
+        assert got_times.dtype == np.dtype("datetime64[us]")
+        assert got_times.tolist() == times[3590:3610].tolist()
+        assert got_values.tolist() == values[3590:3610].tolist()
+
+    def test_rollups_match_raw(self, tmp_path):
+        """Test that minute/hour/day rollups agree with statistics of the raw readings."""
+        store = StressStore(tmp_path)
+        times, values = seconds(5000, seed=2)
+        for lo in range(0, 5000, 333):
+            store.append(times[lo:lo + 333], values[lo:lo + 333])
+
+        minutes = store.rollup("minute")
+        assert minutes["count"].sum() == 5000
+        first = values[:60].astype(np.float64)
+        assert str(minutes["start"][0]) == "2026-02-14T23:00"
+        assert minutes["mean"][0] == pytest.approx(first.mean())
+        assert minutes["std"][0] == pytest.approx(first.std())
+        assert minutes["min"][0] == first.min() and minutes["max"][0] == pytest.approx(first.max())
+
+        hours = store.rollup("hour")
+        assert hours["count"].tolist() == [3600, 1400]
+        assert store.aggregate()["mean"] == pytest.approx(values.astype(np.float64).mean())
+        assert store.aggregate(granularity="day")["std"] == pytest.approx(values.astype(np.float64).std())
+
+    def test_late_readings_are_dropped(self, tmp_path):
+        """Test that readings older than the stored history are skipped, not inserted."""
+        store = StressStore(tmp_path)
+        times, values = seconds(10)
+        store.append(times[:5], values[:5])
+        assert store.append(times[2:], values[2:]) == 5
+        assert store.counters["late"] == 3
+        assert store.readings()[0].tolist() == times.tolist()
+        assert store.rollup("minute")["count"].tolist() == [10]
+
+    def test_reopen_continues(self, tmp_path):
+        """Test that a reopened store knows its newest reading and extends the open bucket."""
+        times, values = seconds(90)
+        StressStore(tmp_path).append(times[:30], values[:30])
+        store = StressStore(tmp_path)
+        assert store.last_time == times[29].astype(np.int64)
+        store.append(times[30:], values[30:])
+        assert store.rollup("minute")["count"].tolist() == [60, 30]
+
+    def test_retention_keeps_rollups(self, tmp_path):
+        """Test that dropping old raw days leaves their rollups queryable."""
+        store = StressStore(tmp_path, retention={"raw": 1, "minute": 2})
+        times, values = seconds(5 * 24 * 60, start="2026-03-01", step=60)
+        for day in range(5):
+            chunk = slice(day * 1440, (day + 1) * 1440)
+            store.append(times[chunk], values[chunk])
+
+        assert len(store.days) == 2
+        assert not (tmp_path / "raw" / "2026-03-01").exists()
+        assert len(store.readings("2026-03-01", "2026-03-02")[0]) == 0
+        assert store.rollup("day")["count"].tolist() == [1440] * 5
+        assert str(store.rollup("minute")["start"][0]) == "2026-03-03T00:00"
+        assert store.stats()["segments_dropped"] == 3
+
+    def test_unknown_granularity(self, tmp_path):
+        """Test that an unknown rollup level is rejected."""
+        with pytest.raises(ValueError):
+            StressStore(tmp_path).rollup("week")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,102 @@
+import json
+import time
+import pytest
+from unittest.mock import MagicMock
+from token_store import TokenStore, TokenRefresher
+from focus_background import SpotifyPlayer
+
+
+class TestTokenStore:
+    """Test suite for the file-backed token cache."""
+
+    def test_save_and_reload(self, tmp_path):
+        """Test that tokens survive a new store instance."""
+        path = tmp_path / "token.json"
+        TokenStore(path).save("access", "refresh", expires_in=3600)
+
+        store = TokenStore(path)
+        assert store.access_token() == "access"
+        assert store.refresh_token == "refresh"
+        assert json.loads(path.read_text())["access_token"] == "access"
+
+    def test_expiring_token_is_not_returned(self, tmp_path):
+        """Test that a token inside the leeway window counts as expired."""
+        store = TokenStore(tmp_path / "token.json")
+        store.save("access", "refresh", expires_in=30)
+        assert store.access_token(leeway=60) is None
+        assert store.refresh_token == "refresh"
+
+    def test_refresh_keeps_old_refresh_token(self, tmp_path):
+        """Test that a refresh response without refresh_token keeps the old one."""
+        store = TokenStore(tmp_path / "token.json")
+        store.save("a1", "r1")
+        store.save("a2", None)
+        assert store.refresh_token == "r1"
+        assert store.access_token() == "a2"
+
+    def test_corrupt_file_loads_empty(self, tmp_path):
+        """Test that a corrupt token file is treated as no cache."""
+        path = tmp_path / "token.json"
+        path.write_text("{not json")
+        assert TokenStore(path).access_token() is None
+
+
+class TestTokenRefresher:
+    """Test suite for the background refresher."""
+
+    def test_refreshes_expired_token(self, tmp_path):
+        """Test that an already-expired token is refreshed straight away."""
+        store = TokenStore(tmp_path / "token.json")
+        store.save("old", "refresh", expires_in=0)
+        refresh_fn = MagicMock(side_effect=lambda: store.save("new", None, 3600))
+
+        refresher = TokenRefresher(store, refresh_fn)
+        refresher.start()
+        deadline = time.time() + 2
+        while not refresh_fn.called and time.time() < deadline:
+            time.sleep(0.01)
+        refresher.stop()
+
+        assert refresh_fn.call_count == 1
+        assert store.access_token() == "new"
+
+
+class TestSpotifyPlayerCachedToken:
+    """Test suite for skipping the browser flow with a cached token."""
+
+    def make_player(self, tmp_path):
+        store = TokenStore(tmp_path / "token.json")
+        player = SpotifyPlayer("id", "secret", "http://localhost:8888/callback", token_store=store)
+        player.http = MagicMock()
+        return player, store
+
+    def test_valid_cached_token_skips_browser(self, tmp_path):
+        """Test that a valid cached token is used without any request."""
+        player, store = self.make_player(tmp_path)
+        store.save("cached", None)
+
+        player.authenticate()
+
+        assert player.access_token == "cached"
+        player.http.post.assert_not_called()
+
+    def test_expired_token_is_refreshed(self, tmp_path):
+        """Test that an expired token is renewed with the refresh grant."""
+        player, store = self.make_player(tmp_path)
+        store.save("stale", "refresh", expires_in=0)
+        player.http.post.return_value.json.return_value = {
+            "access_token": "fresh",
+            "expires_in": 3600,
+        }
+
+        player.authenticate()
+        player.refresher.stop()
+
+        assert player.access_token == "fresh"
+        data = player.http.post.call_args.kwargs["data"]
+        assert data == {"grant_type": "refresh_token", "refresh_token": "refresh"}
+        assert store.refresh_token == "refresh"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
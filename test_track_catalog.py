@@ -0,0 +1,125 @@
+import time
+import wave
+import pytest
+from track_catalog import TrackCatalog, read_metadata
+from spotify_player import LocalMusicPlayer
+
+
+def write_wav(path, seconds, rate=8000, channels=1):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * channels * int(rate * seconds))
+
+
+class TestReadMetadata:
+    """Test suite for per-file metadata extraction."""
+
+    def test_wav_stream_info(self, tmp_path):
+        """Test that WAV duration, rate and channels are read without mutagen."""
+        path = tmp_path / "tone.wav"
+        write_wav(path, 2, rate=8000, channels=2)
+
+        meta = read_metadata(str(path))
+
+        assert meta["title"] == "tone"
+        assert meta["duration"] == pytest.approx(2.0)
+        assert meta["sample_rate"] == 8000
+        assert meta["channels"] == 2
+
+
+class TestTrackCatalog:
+    """Test suite for the SQLite track catalog."""
+
+    def test_build_is_incremental(self, tmp_path):
+        """Test that unchanged files are skipped and removed files are deleted."""
+        catalog = TrackCatalog(tmp_path / "catalog.db")
+        for name in ("a", "b", "c"):
+            write_wav(tmp_path / f"{name}.wav", 1)
+        entries = [(str(tmp_path / f"{n}.wav"), 100, 1) for n in ("a", "b", "c")]
+
+        assert catalog.build(entries, workers=1) == {"added": 3, "updated": 0, "removed": 0, "unchanged": 0}
+
+        entries = [entries[0], (entries[1][0], 100, 2)]
+        assert catalog.build(entries, workers=1) == {"added": 0, "updated": 1, "removed": 1, "unchanged": 1}
+        assert len(catalog) == 2
+
+    def test_query_filters(self, tmp_path):
+        """Test genre, duration and recently-played filters."""
+        catalog = TrackCatalog(tmp_path / "catalog.db")
+        now = time.time()
+        catalog._upsert([
+            ("/m/rain.mp3", 1, 1, "Rain", "Nature", None, "ambient", 240.0, 44100, 2),
+            ("/m/short.mp3", 1, 1, "Short", "Nature", None, "ambient", 60.0, 44100, 2),
+            ("/m/rock.mp3", 1, 1, "Rock", "Band", None, "rock", 240.0, 44100, 2),
+            ("/m/piano.mp3", 1, 1, "Piano", "Pianist", None, "piano", 300.0, 44100, 2),
+        ])
+        catalog.mark_played("/m/piano.mp3", when=now - 600)
+
+        calm = [row["path"] for row in catalog.calm_tracks()]
+        assert calm == ["/m/rain.mp3"]
+
+        by_artist = catalog.query(artist="Nature", order_by="duration")
+        assert [row["title"] for row in by_artist] == ["Short", "Rain"]
+
+    def test_rebuild_keeps_last_played(self, tmp_path):
+        """Test that re-reading a changed file keeps its play history."""
+        catalog = TrackCatalog(tmp_path / "catalog.db")
+        write_wav(tmp_path / "a.wav", 1)
+        path = str(tmp_path / "a.wav")
+        catalog.build([(path, 1, 1)], workers=1)
+        catalog.mark_played(path, when=123.0)
+
+        catalog.build([(path, 1, 2)], workers=1)
+
+        assert catalog.query()[0]["last_played"] == 123.0
+
+    def test_parallel_build(self, tmp_path):
+        """Test that the process pool path writes every track."""
+        catalog = TrackCatalog(tmp_path / "catalog.db")
+        entries = []
+        for i in range(40):
+            path = tmp_path / f"t{i:02d}.wav"
+            write_wav(path, 0.1)
+            entries.append((str(path), 1, 1))
+
+        catalog.build(entries, workers=2, batch_size=16)
+
+        assert len(catalog) == 40
+        assert all(row["duration"] == pytest.approx(0.1) for row in catalog.query())
+
+
+class TestLocalMusicPlayerCatalog:
+    """Test suite for LocalMusicPlayer catalog helpers."""
+
+    def test_build_and_find(self, tmp_path):
+        """Test that the player catalogs its library and queries it."""
+        music = tmp_path / "music"
+        music.mkdir()
+        write_wav(music / "long.wav", 3)
+        write_wav(music / "short.wav", 1)
+        player = LocalMusicPlayer(str(music), index_path=tmp_path / "index.json",
+                                  catalog_path=tmp_path / "catalog.db")
+
+        player.build_catalog(workers=1)
+
+        assert [p.name for p in player.find_tracks(min_duration=2)] == ["long.wav"]
+
+    def test_track_start_marks_played(self, tmp_path):
+        """Test that the engine's track-start callback records last_played."""
+        music = tmp_path / "music"
+        music.mkdir()
+        write_wav(music / "a.wav", 1)
+        write_wav(music / "b.wav", 1)
+        player = LocalMusicPlayer(str(music), index_path=tmp_path / "index.json",
+                                  catalog_path=tmp_path / "catalog.db")
+        player.build_catalog(workers=1)
+
+        player.track_started(music / "a.wav")
+
+        assert [p.name for p in player.find_tracks(not_played_within=3600)] == ["b.wav"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+DEFAULT_TOKEN_PATH = Path.home() / ".musicqueue" / "spotify_token.json"
+
+
+# =========================
+# TOKEN STORE
+# =========================
+
+class TokenStore:
+    """
+    File-backed cache of Spotify access/refresh tokens and their expiry.
+
+    Writes go to a temp file in the same directory and are swapped in with
+    os.replace, so a crash mid-write never leaves a half-written token file.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else DEFAULT_TOKEN_PATH
+        self.lock = threading.Lock()
+        self.tokens = self.load()
+
+    # -------------------------
+    # LOAD / SAVE
+    # -------------------------
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save(self, access_token, refresh_token=None, expires_in=3600):
+        """
+        Store a fresh token response
+        Spotify may omit refresh_token on refresh, so the old one is kept
+        """
+        with self.lock:
+            self.tokens = {
+                "access_token": access_token,
+                "refresh_token": refresh_token or self.tokens.get("refresh_token"),
+                "expires_at": time.time() + float(expires_in),
+            }
+            self._write(self.tokens)
+
+    def clear(self):
+        with self.lock:
+            self.tokens = {}
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _write(self, data):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".token-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    # -------------------------
+    # ACCESSORS
+    # -------------------------
+
+    def access_token(self, leeway=60):
+        """Return the cached access token unless it expires within `leeway` seconds"""
+        with self.lock:
+            token = self.tokens.get("access_token")
+            if token and self.tokens.get("expires_at", 0) - leeway > time.time():
+                return token
+            return None
+
+    @property
+    def refresh_token(self):
+        with self.lock:
+            return self.tokens.get("refresh_token")
+
+    def expires_in(self):
+        """Seconds until the access token expires (0 if none or already expired)"""
+        with self.lock:
+            return max(self.tokens.get("expires_at", 0) - time.time(), 0)
+
+
+# =========================
+# TOKEN REFRESHER
+# =========================
+
+class TokenRefresher(threading.Thread):
+    """Background thread that renews the access token `margin` seconds before expiry"""
+
+    def __init__(self, store, refresh_fn, margin=300, retry_delay=30):
+        super().__init__(daemon=True)
+        self.store = store
+        self.refresh_fn = refresh_fn
+        self.margin = margin
+        self.retry_delay = retry_delay
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            remaining = self.store.expires_in()
+            # Short-lived tokens still get half their lifetime before renewing
+            wait = max(remaining - self.margin, remaining / 2)
+            if self.stop_event.wait(wait):
+                break
+
+            try:
+                self.refresh_fn()
+            except Exception as e:
+                print(f"⚠️  Token refresh failed: {e}")
+                self.stop_event.wait(self.retry_delay)
+
+    def stop(self):
+        self.stop_event.set()
@@ -0,0 +1,428 @@
+import os
+import sqlite3
+import threading
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import mutagen
+except ImportError:  # optional: without it only WAV files get duration/format info
+    mutagen = None
+
+
+DEFAULT_CATALOG_PATH = Path.home() / ".musicqueue" / "catalog.db"
+
+# Genres (lower-case) treated as "calm" by calm_tracks()
+CALM_GENRES = ("ambient", "classical", "new age", "lo-fi", "lofi", "piano", "chillout", "acoustic", "meditation")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    title TEXT,
+    artist TEXT,
+    album TEXT,
+    genre TEXT,
+    duration REAL,
+    sample_rate INTEGER,
+    channels INTEGER,
+    last_played REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_duration ON tracks(duration);
+CREATE INDEX IF NOT EXISTS idx_tracks_artist ON tracks(artist);
+CREATE INDEX IF NOT EXISTS idx_tracks_genre ON tracks(genre, duration);
+CREATE INDEX IF NOT EXISTS idx_tracks_last_played ON tracks(last_played);
+
+CREATE TABLE IF NOT EXISTS features (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    rms REAL,
+    peak REAL,
+    loudness REAL,
+    centroid REAL,
+    tempo REAL,
+    error TEXT,
+    analyzed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_features_tempo ON features(tempo, loudness);
+
+CREATE TABLE IF NOT EXISTS gains (
+    path TEXT PRIMARY KEY,
+    album_key TEXT NOT NULL,
+    track_gain REAL,
+    track_peak REAL,
+    album_gain REAL,
+    album_peak REAL
+);
+CREATE INDEX IF NOT EXISTS idx_gains_album ON gains(album_key);
+"""
+
+# Columns added after a table first shipped: (table, column, type)
+MIGRATIONS = (
+    ("features", "peak", "REAL"),
+)
+
+METADATA_FIELDS = ("title", "artist", "album", "genre", "duration", "sample_rate", "channels")
+
+
+# =========================
+# METADATA EXTRACTION
+# =========================
+
+def read_metadata(path):
+    """
+    Read tags and stream info for one file (runs inside worker processes)
+    Returns: dict with METADATA_FIELDS; unknown values are None
+    """
+    meta = dict.fromkeys(METADATA_FIELDS)
+    meta["title"] = Path(path).stem
+
+    if mutagen is not None:
+        try:
+            audio = mutagen.File(path, easy=True)
+        except Exception:
+            audio = None
+
+        if audio is not None:
+            tags = audio.tags or {}
+            for field in ("title", "artist", "album", "genre"):
+                values = tags.get(field) if hasattr(tags, "get") else None
+                if values:
+                    meta[field] = str(values[0])
+            info = getattr(audio, "info", None)
+            meta["duration"] = getattr(info, "length", None)
+            meta["sample_rate"] = getattr(info, "sample_rate", None)
+            meta["channels"] = getattr(info, "channels", None)
+
+    if meta["duration"] is None and path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as w:
+                meta["sample_rate"] = w.getframerate()
+                meta["channels"] = w.getnchannels()
+                meta["duration"] = w.getnframes() / float(w.getframerate())
+        except (OSError, wave.Error, EOFError, ZeroDivisionError):
+            pass
+
+    if meta["genre"]:
+        meta["genre"] = meta["genre"].strip().lower()
+
+    return meta
+
+
+# =========================
+# TRACK CATALOG
+# =========================
+
+class TrackCatalog:
+    """
+    SQLite catalog of local tracks and their metadata.
+
+    build() takes (path, size, mtime_ns) entries (e.g. LibraryIndex.entries()),
+    reads metadata only for new or changed files using a process pool, and
+    writes them in batched transactions. Queries never open audio files.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else DEFAULT_CATALOG_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        for table, column, kind in MIGRATIONS:
+            columns = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+    # -------------------------
+    # BUILD
+    # -------------------------
+
+    def build(self, entries, workers=None, batch_size=500):
+        """
+        Bring the catalog in line with `entries`
+        Returns: dict with added, updated, removed and unchanged counts
+        """
+        with self.lock:
+            known = {
+                row["path"]: (row["size"], row["mtime_ns"])
+                for row in self.conn.execute("SELECT path, size, mtime_ns FROM tracks")
+            }
+
+        current = {}
+        changed = []
+        for path, size, mtime_ns in entries:
+            current[path] = (size, mtime_ns)
+            if known.get(path) != (size, mtime_ns):
+                changed.append(path)
+
+        removed = [path for path in known if path not in current]
+        added = sum(1 for path in changed if path not in known)
+
+        self.update([(path, *current[path]) for path in changed], removed,
+                    workers=workers, batch_size=batch_size)
+
+        return {
+            "added": added,
+            "updated": len(changed) - added,
+            "removed": len(removed),
+            "unchanged": len(current) - len(changed),
+        }
+
+    def update(self, changed, removed=(), workers=None, batch_size=500):
+        """
+        Apply a known diff: re-read metadata for `changed` (path, size, mtime_ns)
+        entries and delete `removed` paths (used by the library watcher)
+        """
+        if removed:
+            self.remove(removed)
+
+        current = {path: (size, mtime_ns) for path, size, mtime_ns in changed}
+        paths = list(current)
+
+        if workers == 1 or len(paths) < 32:
+            results = map(read_metadata, paths)
+            self._write_batches(paths, results, current, batch_size)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(read_metadata, paths, chunksize=64)
+                self._write_batches(paths, results, current, batch_size)
+
+    def _write_batches(self, paths, results, current, batch_size):
+        batch = []
+        for path, meta in zip(paths, results):
+            size, mtime_ns = current[path]
+            batch.append((path, size, mtime_ns, *(meta[f] for f in METADATA_FIELDS)))
+            if len(batch) >= batch_size:
+                self._upsert(batch)
+                batch = []
+        if batch:
+            self._upsert(batch)
+
+    def _upsert(self, rows):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO tracks (path, size, mtime_ns, title, artist, album, genre,
+                                    duration, sample_rate, channels)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    title = excluded.title,
+                    artist = excluded.artist,
+                    album = excluded.album,
+                    genre = excluded.genre,
+                    duration = excluded.duration,
+                    sample_rate = excluded.sample_rate,
+                    channels = excluded.channels
+                """,
+                rows,
+            )
+
+    def remove(self, paths):
+        rows = [(p,) for p in paths]
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM tracks WHERE path = ?", rows)
+            self.conn.executemany("DELETE FROM features WHERE path = ?", rows)
+            self.conn.executemany("DELETE FROM gains WHERE path = ?", rows)
+
+    # -------------------------
+    # AUDIO FEATURES
+    # -------------------------
+
+    def features_pending(self, limit=None):
+        """
+        Tracks with no features yet, or features computed for an older mtime
+        Returns: list of (path, mtime_ns)
+        """
+        sql = """
+            SELECT t.path, t.mtime_ns FROM tracks t
+            LEFT JOIN features f ON f.path = t.path
+            WHERE f.path IS NULL OR f.mtime_ns != t.mtime_ns
+            ORDER BY t.path
+        """
+        params = []
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self.lock:
+            return [(row["path"], row["mtime_ns"]) for row in self.conn.execute(sql, params)]
+
+    def store_features(self, results):
+        """Save (path, mtime_ns, features) results from audio_features.analyze_track"""
+        now = time.time()
+        rows = [
+            (path, mtime_ns, f["rms"], f.get("peak"), f["loudness"], f["centroid"], f["tempo"],
+             f["error"], now)
+            for path, mtime_ns, f in results
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO features (path, mtime_ns, rms, peak, loudness, centroid, tempo, error,
+                                      analyzed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    mtime_ns = excluded.mtime_ns,
+                    rms = excluded.rms,
+                    peak = excluded.peak,
+                    loudness = excluded.loudness,
+                    centroid = excluded.centroid,
+                    tempo = excluded.tempo,
+                    error = excluded.error,
+                    analyzed_at = excluded.analyzed_at
+                """,
+                rows,
+            )
+
+    def features(self, path):
+        """Returns: the features row for one track, or None if not analyzed"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT * FROM features WHERE path = ?", (os.fspath(path),)
+            ).fetchone()
+
+    def analyzed_tracks(self):
+        """Returns: rows (path, mtime_ns, rms, loudness, centroid, tempo) with current features"""
+        with self.lock:
+            return self.conn.execute(
+                """
+                SELECT f.path, f.mtime_ns, f.rms, f.loudness, f.centroid, f.tempo FROM features f
+                JOIN tracks t ON t.path = f.path AND t.mtime_ns = f.mtime_ns
+                WHERE f.error IS NULL
+                """
+            ).fetchall()
+
+    # -------------------------
+    # LOUDNESS NORMALIZATION
+    # -------------------------
+
+    def loudness_rows(self):
+        """Returns: rows (path, album, loudness, peak, duration) for tracks with current features"""
+        with self.lock:
+            return self.conn.execute(
+                """
+                SELECT t.path, t.album, t.duration, f.loudness, f.peak FROM tracks t
+                JOIN features f ON f.path = t.path AND f.mtime_ns = t.mtime_ns
+                WHERE f.error IS NULL AND f.loudness IS NOT NULL
+                """
+            ).fetchall()
+
+    def store_gains(self, rows):
+        """Replace all (path, album_key, track_gain, track_peak, album_gain, album_peak) rows"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM gains")
+            self.conn.executemany("INSERT INTO gains VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def gain(self, path, mode="album"):
+        """
+        Playback gain in dB for one track ("album" falls back to "track")
+        Returns: dB, or None if the track has not been analyzed
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT track_gain, album_gain FROM gains WHERE path = ?", (os.fspath(path),)
+            ).fetchone()
+        if row is None:
+            return None
+        if mode == "album" and row["album_gain"] is not None:
+            return row["album_gain"]
+        return row["track_gain"]
+
+    def calm_by_features(self, max_tempo=90, max_loudness=-14.0, max_centroid=2500.0, limit=None):
+        """Analyzed tracks that are slow, quiet and dark, calmest first"""
+        sql = """
+            SELECT t.*, f.rms, f.loudness, f.centroid, f.tempo FROM tracks t
+            JOIN features f ON f.path = t.path AND f.mtime_ns = t.mtime_ns
+            WHERE f.error IS NULL
+              AND (f.tempo IS NULL OR f.tempo <= ?)
+              AND f.loudness <= ?
+              AND f.centroid <= ?
+            ORDER BY f.loudness, f.centroid
+        """
+        params = [max_tempo, max_loudness, max_centroid]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # -------------------------
+    # QUERIES
+    # -------------------------
+
+    def query(self, genres=None, artist=None, min_duration=None, max_duration=None,
+              not_played_within=None, order_by="path", limit=None):
+        """
+        Filter tracks by indexed fields
+        not_played_within: seconds; excludes tracks played more recently than that
+        Returns: list of sqlite3.Row
+        """
+        clauses = []
+        params = []
+
+        if genres:
+            genres = [g.lower() for g in genres]
+            clauses.append(f"genre IN ({', '.join('?' * len(genres))})")
+            params.extend(genres)
+        if artist:
+            clauses.append("artist = ?")
+            params.append(artist)
+        if min_duration is not None:
+            clauses.append("duration >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            clauses.append("duration <= ?")
+            params.append(max_duration)
+        if not_played_within is not None:
+            clauses.append("(last_played IS NULL OR last_played < ?)")
+            params.append(time.time() - not_played_within)
+
+        if order_by not in ("path", "duration", "artist", "last_played", "random"):
+            raise ValueError(f"Cannot order by '{order_by}'")
+
+        sql = "SELECT * FROM tracks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY " + ("RANDOM()" if order_by == "random" else order_by)
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def calm_tracks(self, min_minutes=3, max_minutes=6, not_played_within=86400, limit=None):
+        """Calm-genre tracks of a given length not played in the last day"""
+        return self.query(
+            genres=CALM_GENRES,
+            min_duration=min_minutes * 60,
+            max_duration=max_minutes * 60,
+            not_played_within=not_played_within,
+            limit=limit,
+        )
+
+    def mark_played(self, path, when=None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE tracks SET last_played = ? WHERE path = ?",
+                (when or time.time(), os.fspath(path)),
+            )
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()